@@ -0,0 +1,415 @@
+import asyncio
+import gc
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from datetime import timedelta
+from functools import partial, wraps
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections, connections
+from django.db.models import Count, Q
+from django.http import Http404, HttpRequest, JsonResponse
+from django.urls import reverse
+from django.utils.timezone import now
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import APIException
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .authentication import CachedJWTAuthentication
+from .caching import get_or_compute
+from .paginations import Pagination
+from .version_stamps import bump_stamps
+from comments.models import Comment
+from likes.models import Like
+from posts.models import Post, Story
+from profiles.models import Profile
+from utils.images import avatar_urls, image_variant
+
+__all__ = [
+    "async_feed", "async_post_detail", "async_story_tray", "async_profile_detail", "async_home", "async_home_seen",
+    "shutdown_query_threads",
+]
+
+_authentication = CachedJWTAuthentication()
+_query_threads = None
+_query_threads_lock = threading.Lock()
+
+
+def _authenticate(request: HttpRequest):
+    """
+    Authenticates the request on the request's thread and keeps the execute
+    wrappers the middleware installed there, for `_concurrently`.
+    """
+    request.execute_wrappers = {alias: list(connections[alias].execute_wrappers) for alias in connections}
+    return _authentication.authenticate(request)
+
+
+def _in_own_thread(request: HttpRequest, query):
+    """
+    Runs `query` on the connections of the current (query) thread, under
+    the request's execute wrappers: query metrics and the SQL log are shared,
+    the statement deadline is applied as a copy and reset afterwards.
+    """
+    close_old_connections()
+    deadlines = []
+    try:
+        with ExitStack() as stack:
+            for alias, wrappers in request.execute_wrappers.items():
+                for wrapper in wrappers:
+                    if hasattr(wrapper, "for_thread"):
+                        wrapper = wrapper.for_thread()
+                        deadlines.append(wrapper)
+                    stack.enter_context(connections[alias].execute_wrapper(wrapper))
+            return query()
+    finally:
+        for deadline in deadlines:
+            deadline.reset()
+        close_old_connections()
+
+
+def _query_executor() -> ThreadPoolExecutor:
+    """
+    The `ASYNC_VIEW_QUERY_THREADS` threads `_concurrently` runs queries on.
+    A pool of their own rather than the event loop's default executor, so each
+    process keeps at most that many extra (persistent) database connections.
+    """
+    global _query_threads
+    with _query_threads_lock:
+        if _query_threads is None:
+            _query_threads = ThreadPoolExecutor(settings.ASYNC_VIEW_QUERY_THREADS, thread_name_prefix="async-query")
+        return _query_threads
+
+
+def shutdown_query_threads():
+    """
+    Stops the query threads, whose database connections close as the threads
+    exit (e.g. before dropping a test database, or after changing
+    `ASYNC_VIEW_QUERY_THREADS`); the pool is started again when needed.
+    """
+    global _query_threads
+    with _query_threads_lock:
+        executor, _query_threads = _query_threads, None
+    if executor is not None:
+        executor.shutdown(wait=True)
+        # The connection wrappers of the exited threads sit in reference cycles.
+        gc.collect()
+
+
+async def _concurrently(request: HttpRequest, *queries) -> list:
+    """
+    Runs independent read-only `queries` (sync callables) at the same time and
+    returns their results in order.
+
+    The async ORM runs every query through a thread-sensitive `sync_to_async`,
+    that is one after another on the request's thread. Here each query runs on
+    one of the query threads (see `_query_executor`) with that thread's own
+    database connection instead. With `ASYNC_VIEW_QUERY_THREADS` at 0 they run
+    in turn on the request's connection.
+    """
+    if not settings.ASYNC_VIEW_QUERY_THREADS:
+        return [await sync_to_async(query)() for query in queries]
+    executor = _query_executor()
+    return await asyncio.gather(*(
+        sync_to_async(partial(_in_own_thread, request, query), thread_sensitive=False, executor=executor)()
+        for query in queries
+    ))
+
+
+def async_api_view(view=None, *, methods=("GET",)):
+    """
+    Turns an async function returning JSON-able data into an API view.
+
+    These views bypass DRF, which has no async request cycle, so the decorator
+    does the parts DRF would: the allowed `methods` (GET only by default), JWT
+    authentication through `CachedJWTAuthentication` (401 when missing or
+    invalid), no CSRF check (the token is not sent by the browser on its own)
+    and 404 handling. Independent queries of a view run at the same time on
+    separate connections, see `_concurrently`.
+    """
+    if view is None:
+        return partial(async_api_view, methods=methods)
+
+    @csrf_exempt
+    @wraps(view)
+    async def wrapper(request: HttpRequest, *args, **kwargs) -> JsonResponse:
+        if request.method not in methods:
+            return JsonResponse({"detail": f'Method "{request.method}" not allowed.'}, status=405)
+        try:
+            result = await sync_to_async(_authenticate)(request)
+        except APIException as exc:
+            return JsonResponse({"detail": str(exc.detail)}, status=exc.status_code)
+        if result is None:
+            return JsonResponse({"detail": "Authentication credentials were not provided."}, status=401)
+        request.user = result[0]
+        try:
+            return JsonResponse(await view(request, *args, **kwargs), safe=False)
+        except Http404 as exc:
+            return JsonResponse({"detail": str(exc) or "Not found."}, status=404)
+    return wrapper
+
+
+def _file_url(field):
+    return field.url if field else None
+
+
+def _post_data(post: Post, hashtags: list, liked: bool, author: dict, image_size: str = "feed") -> dict:
+    """Same fields as `PostSerializer`, plus the viewer's like flag and an author summary."""
+    return {
+        "id": post.id,
+        "profile": post.profile_id,
+        "title": post.title,
+        "content": post.content,
+        "image": _file_url(post.image),
+        "display_image": image_variant(post.image, post.image_variants, image_size),
+        "video": _file_url(post.video),
+        "hashtag_list": hashtags,
+        "created_at": post.created_at,
+        "updated_at": post.updated_at,
+        "likes_count": post.likes_total,
+        "is_liked": liked,
+        "author": author,
+    }
+
+
+def _author_data(profile: Profile) -> dict:
+    return {
+        "id": profile.id,
+        "username": profile.user.username,
+        "profile_picture": _file_url(profile.profile_picture),
+        "display_picture": image_variant(profile.profile_picture, profile.picture_variants, "thumbnail"),
+        "avatar": avatar_urls(profile.profile_picture, profile.picture_variants),
+    }
+
+
+async def _post_extras(request: HttpRequest, posts: list):
+    """
+    Loads hashtags, the viewer's likes and author summaries of `posts` with
+    three concurrent queries, returned as dicts keyed by post or profile id.
+    """
+    post_ids = [post.id for post in posts]
+    tags = Post.hashtags.through.objects.filter(post_id__in=post_ids).values_list("post_id", "hashtag__name")
+    likes = Like.objects.filter(post_id__in=post_ids, profile__user=request.user).values_list("post_id", flat=True)
+    authors = Profile.objects.filter(id__in={post.profile_id for post in posts}).select_related("user")
+    tag_rows, liked_ids, authors = await _concurrently(
+        request, partial(list, tags), partial(list, likes), partial(list, authors)
+    )
+    hashtags = {}
+    for post_id, name in tag_rows:
+        hashtags.setdefault(post_id, []).append(name)
+    return hashtags, set(liked_ids), {profile.id: _author_data(profile) for profile in authors}
+
+
+async def _feed_page(request: HttpRequest, page: int, url: str) -> dict:
+    """One page of posts from the profiles the viewer follows, newest first; `url` is the feed URL for links."""
+    size = Pagination.page_size
+    offset = (page - 1) * size
+    posts = Post.objects.filter(profile__in=request.user.followings.all())
+    count, page_posts = await _concurrently(
+        request,
+        posts.count,
+        partial(list, posts.annotate(likes_total=Count("likes")).order_by("-created_at")[offset:offset + size]),
+    )
+    hashtags, liked, authors = await _post_extras(request, page_posts)
+    return {
+        "count": count,
+        "next": replace_query_param(url, "page", page + 1) if offset + size < count else None,
+        "previous": (
+            None if page == 1 else
+            remove_query_param(url, "page") if page == 2 else replace_query_param(url, "page", page - 1)
+        ),
+        "results": [
+            _post_data(post, hashtags.get(post.id, []), post.id in liked, authors[post.profile_id])
+            for post in page_posts
+        ],
+    }
+
+
+@async_api_view
+async def async_feed(request: HttpRequest) -> dict:
+    """Async version of the feed (`GET posts/`): posts from followed profiles, newest first, paginated."""
+    try:
+        page = max(int(request.GET.get("page", 1)), 1)
+    except ValueError:
+        page = 1
+    return await _feed_page(request, page, request.build_absolute_uri())
+
+
+@async_api_view
+async def async_post_detail(request: HttpRequest, id: int) -> dict:
+    """Async version of `GET post/<id>/`, with the viewer's like flag and the author."""
+    try:
+        post, tags, liked = await _concurrently(
+            request,
+            partial(Post.objects.select_related("profile__user").annotate(likes_total=Count("likes")).get, pk=id),
+            partial(list, Post.hashtags.through.objects.filter(post_id=id).values_list("hashtag__name", flat=True)),
+            Like.objects.filter(post_id=id, profile__user=request.user).exists,
+        )
+    except Post.DoesNotExist:
+        raise Http404("No Post matches the given query.")
+    return _post_data(post, tags, liked, _author_data(post.profile), image_size="full")
+
+
+async def _story_tray(request: HttpRequest) -> list:
+    """
+    Active stories of the viewer and of the profiles they follow, grouped by
+    author, most recently updated author first.
+    """
+    visible = Story.visible_stories().filter(Q(user__followers=request.user) | Q(user__user=request.user))
+    stories, liked_ids = await _concurrently(
+        request,
+        partial(list, (
+            Story.objects.filter(id__in=visible.values("id")).select_related("user__user")
+            .annotate(likes_total=Count("story_likes")).order_by("-created_at")
+        )),
+        partial(list, Like.objects.filter(story__in=visible.values("id"), profile__user=request.user)
+                .values_list("story_id", flat=True)),
+    )
+    liked_ids = set(liked_ids)
+    tray = {}
+    for story in stories:
+        entry = tray.setdefault(story.user_id, {"user": _author_data(story.user), "stories": []})
+        entry["stories"].append({
+            "id": story.id,
+            "caption": story.caption,
+            "image": _file_url(story.image),
+            "display_image": image_variant(story.image, story.image_variants, "full"),
+            "video": _file_url(story.video),
+            "created_at": story.created_at,
+            "likes_count": story.likes_total,
+            "is_liked": story.id in liked_ids,
+        })
+    return list(tray.values())
+
+
+@async_api_view
+async def async_story_tray(request: HttpRequest) -> list:
+    """Async story tray (`Story.visible_stories()` of the viewer and followed profiles)."""
+    return await _story_tray(request)
+
+
+async def _profile_data(request: HttpRequest, user_name: str) -> dict:
+    """Same fields as `ProfileSerializer`, plus the number of posts."""
+    follows = Profile.followers.through.objects
+    try:
+        profile, follower_ids, following_count, posts_count = await _concurrently(
+            request,
+            partial(Profile.objects.select_related("user").get, user__username=user_name),
+            partial(list, follows.filter(profile__user__username=user_name).values_list("user_id", flat=True)),
+            follows.filter(user__username=user_name).count,
+            Post.objects.filter(profile__user__username=user_name).count,
+        )
+    except Profile.DoesNotExist:
+        raise Http404("No Profile matches the given query.")
+    user = profile.user
+    return {
+        "user": {
+            "id": user.id,
+            "username": user.username,
+            "email": user.email,
+            "first_name": user.first_name,
+            "last_name": user.last_name,
+            "date_joined": user.date_joined,
+        },
+        "followers": follower_ids,
+        "followers_count": len(follower_ids),
+        "following_count": following_count,
+        "posts_count": posts_count,
+        "profile_picture": _file_url(profile.profile_picture),
+        "display_picture": image_variant(profile.profile_picture, profile.picture_variants, "thumbnail"),
+        "avatar": avatar_urls(profile.profile_picture, profile.picture_variants),
+        "bio": profile.bio,
+        "website_link": profile.website_link,
+        "created_at": profile.created_at,
+    }
+
+
+@async_api_view
+async def async_profile_detail(request: HttpRequest, user_name: str) -> dict:
+    """Async version of `GET profiles/<user_name>/`, plus the number of posts."""
+    return await _profile_data(request, user_name)
+
+
+async def _profile_summary(request: HttpRequest) -> dict:
+    """The viewer's own profile without the follower id list."""
+    profile = await _profile_data(request, request.user.username)
+    del profile["followers"]
+    return profile
+
+
+# Unread counts never reach further back than this, and the "last seen" marker is kept as long.
+UNREAD_LOOKBACK = timedelta(days=1)
+
+
+def _last_seen_key(user_id) -> str:
+    return f"home:last-seen:{user_id}"
+
+
+async def _unread_counts(request: HttpRequest) -> dict:
+    """
+    Likes and comments on the viewer's posts and new posts in their feed since
+    the viewer last marked them as seen (`async_home_seen`), at most
+    `UNREAD_LOOKBACK` back. Computing the counts does not move that marker, so
+    they keep growing until the viewer acknowledges them.
+    """
+    oldest = now() - UNREAD_LOOKBACK
+    since = max(await cache.aget(_last_seen_key(request.user.id)) or oldest, oldest)
+    likes, comments, posts = await _concurrently(
+        request,
+        Like.objects.filter(post__profile__user=request.user, created_at__gt=since)
+        .exclude(profile__user=request.user).count,
+        Comment.objects.filter(post__profile__user=request.user, created_at__gt=since)
+        .exclude(user__user=request.user).count,
+        Post.objects.filter(profile__in=request.user.followings.all(), created_at__gt=since).count,
+    )
+    return {"likes": likes, "comments": comments, "feed_posts": posts}
+
+
+async def _cached_part(request: HttpRequest, part: str, compute):
+    """
+    Returns a home screen part through `get_or_compute`, cached per user for
+    its `HOME_CACHE_TIMEOUTS` entry in the user's `home-<part>` namespace.
+
+    With `ASYNC_VIEW_QUERY_THREADS` on, the cache lookup (and the wait for
+    another request computing the part) runs on a thread of the event loop's
+    default executor, so the parts do not queue behind each other on the
+    request's thread; their queries still go to the query threads.
+    """
+    return await sync_to_async(get_or_compute, thread_sensitive=not settings.ASYNC_VIEW_QUERY_THREADS)(
+        f"home_{part}", f"home:{part}:{request.user.id}", async_to_sync(compute),
+        timeout=settings.HOME_CACHE_TIMEOUTS[part], namespaces=[(f"home-{part}", request.user.id)],
+    )
+
+
+@async_api_view
+async def async_home(request: HttpRequest) -> dict:
+    """
+    Everything the app shows on launch in one round-trip: the first feed page,
+    the story tray, the viewer's profile summary and unread counts.
+
+    Each part is cached per user for its own `HOME_CACHE_TIMEOUTS` entry, so a
+    part that is still fresh costs no queries. The parts are built at the same
+    time.
+    """
+    feed_url = request.build_absolute_uri(reverse("async-feed"))
+    feed, stories, profile, unread = await asyncio.gather(
+        _cached_part(request, "feed", partial(_feed_page, request, 1, feed_url)),
+        _cached_part(request, "stories", partial(_story_tray, request)),
+        _cached_part(request, "profile", partial(_profile_summary, request)),
+        _cached_part(request, "unread", partial(_unread_counts, request)),
+    )
+    return {"feed": feed, "stories": stories, "profile": profile, "unread": unread}
+
+
+@async_api_view(methods=("POST",))
+async def async_home_seen(request: HttpRequest) -> dict:
+    """
+    Marks the unread counts of the home screen as seen: from now on they only
+    count what happens after this request.
+    """
+    seen_at = now()
+    await cache.aset(_last_seen_key(request.user.id), seen_at, timeout=UNREAD_LOOKBACK.total_seconds())
+    await sync_to_async(bump_stamps)("home-unread", [request.user.id])
+    return {"seen_at": seen_at}
@@ -0,0 +1,166 @@
+import hashlib
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+from instaapp.metrics import CACHE_FILL, CACHE_REQUESTS
+from .version_stamps import get_versions
+
+# How often a request waiting for another process to fill an entry checks for it.
+_WAIT_STEP = 0.05
+
+
+class _Flight:
+    """One computation of a key that concurrent requests in this process wait for."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.failed = False
+
+
+_flights = {}
+_flights_lock = threading.Lock()
+
+
+def _jittered(timeout: float) -> float:
+    """Shortens `timeout` by up to `CACHE_TTL_JITTER` of it, so entries filled together do not expire together."""
+    return timeout * (1 - settings.CACHE_TTL_JITTER * random.random())
+
+
+def versioned_key(key: str, namespaces=()) -> str:
+    """
+    Appends the current versions of `namespaces` to `key`.
+
+    Namespaces are `(kind, id)` pairs such as `("post", 3)` or
+    `("profile", user_id)` whose versions are the stamps of
+    `apis.version_stamps`. Bumping one, as the receivers in `apis.signals` do,
+    moves every key in it to a new name at once; the old entries are never
+    read again and simply expire.
+    """
+    namespaces = list(namespaces)
+    if not namespaces:
+        return key
+    versions = ".".join(get_versions(namespaces))
+    return f"{key}:{hashlib.md5(versions.encode()).hexdigest()}"
+
+
+def _store(key: str, value, timeout: int, stale_grace: int):
+    fresh_for = _jittered(timeout)
+    entry = (value, time.time() + fresh_for)
+    caches["default"].set(key, entry, timeout=fresh_for + stale_grace)
+    caches["local"].set(key, entry, timeout=min(fresh_for, settings.LOCAL_CACHE_TIMEOUT))
+
+
+def _fill(name: str, key: str, compute, timeout: int, stale_grace: int):
+    CACHE_REQUESTS.labels(name, "miss").inc()
+    started = time.perf_counter()
+    value = compute()
+    CACHE_FILL.labels(name).observe(time.perf_counter() - started)
+    if value is not None:
+        _store(key, value, timeout, stale_grace)
+    return value
+
+
+def _fill_once(name: str, key: str, compute, timeout: int, stale_grace: int, stale=None):
+    """
+    Fills `key`, making sure only one request across all processes computes it.
+
+    Within a process, concurrent requests for the key wait for the first one.
+    Across processes, the one holding the Redis lock computes; the others serve
+    `stale` if they have it, or else wait up to `CACHE_LOCK_TIMEOUT` for the
+    entry to appear before computing it themselves.
+    """
+    with _flights_lock:
+        flight = _flights.get(key)
+        leader = flight is None
+        if leader:
+            flight = _flights[key] = _Flight()
+    if not leader:
+        if flight.done.wait(settings.CACHE_LOCK_TIMEOUT) and not flight.failed:
+            CACHE_REQUESTS.labels(name, "coalesced").inc()
+            return flight.value
+        CACHE_REQUESTS.labels(name, "miss").inc()
+        return compute()
+
+    try:
+        flight.value = _fill_across_processes(name, key, compute, timeout, stale_grace, stale)
+    except BaseException:
+        flight.failed = True
+        raise
+    finally:
+        with _flights_lock:
+            del _flights[key]
+        flight.done.set()
+    return flight.value
+
+
+def _fill_across_processes(name, key, compute, timeout, stale_grace, stale):
+    remote = caches["default"]
+    lock_key = f"{key}:lock"
+    if remote.add(lock_key, 1, timeout=settings.CACHE_LOCK_TIMEOUT):
+        try:
+            return _fill(name, key, compute, timeout, stale_grace)
+        finally:
+            remote.delete(lock_key)
+    if stale is not None:
+        CACHE_REQUESTS.labels(name, "stale_hit").inc()
+        return stale
+    deadline = time.monotonic() + settings.CACHE_LOCK_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(_WAIT_STEP)
+        entry = remote.get(key)
+        if entry is not None:
+            CACHE_REQUESTS.labels(name, "coalesced").inc()
+            return entry[0]
+    return _fill(name, key, compute, timeout, stale_grace)
+
+
+def get_or_compute(name: str, key: str, compute, timeout: int, namespaces=(), stale_grace: int = 0):
+    """
+    Returns the cached value of `key`, computing and caching it on a miss.
+
+    Values are looked up in a bounded in-process LRU (the "local" cache) and
+    then in Redis (the "default" cache), which all processes share. A value
+    found only in Redis is copied to the local tier for at most
+    `LOCAL_CACHE_TIMEOUT` seconds, so the local tier never lags Redis by more
+    than that; with `namespaces` it never lags at all, since a bumped version
+    changes the key.
+
+    A value is fresh for `timeout` seconds, shortened by a random jitter. After
+    that it is kept for `stale_grace` more seconds, during which one request
+    recomputes it while the others keep getting the stale value. A missing
+    value is computed once: concurrent requests wait for that computation
+    instead of running their own. A `None` result is not cached.
+
+    Hits and misses are counted in the `cache_requests_total` metric under
+    `name`.
+
+    Args:
+        name (str): A short, fixed name for metrics, e.g. "post_detail".
+        key (str): The cache key, without versions.
+        compute (callable): Computes the value; takes no arguments.
+        timeout (int): Seconds the value stays fresh.
+        namespaces (iterable): `(kind, id)` pairs whose versions the key includes, see `versioned_key`.
+        stale_grace (int): Seconds a stale value may still be served while it is recomputed.
+
+    Returns:
+        The cached or computed value.
+    """
+    key = versioned_key(key, namespaces)
+    now = time.time()
+    entry = caches["local"].get(key)
+    if entry is not None and entry[1] > now:
+        CACHE_REQUESTS.labels(name, "local_hit").inc()
+        return entry[0]
+
+    entry = caches["default"].get(key)
+    if entry is not None and entry[1] > now:
+        CACHE_REQUESTS.labels(name, "remote_hit").inc()
+        caches["local"].set(key, entry, timeout=min(entry[1] - now, settings.LOCAL_CACHE_TIMEOUT))
+        return entry[0]
+
+    return _fill_once(name, key, compute, timeout, stale_grace, stale=entry[0] if entry else None)
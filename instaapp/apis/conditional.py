@@ -0,0 +1,55 @@
+import hashlib
+from functools import wraps
+
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+
+from instaapp.schema import code_version
+
+
+def _validators(request, stamps: list) -> tuple:
+    """
+    Builds the ETag and Last-Modified of a response from the version stamps it
+    was rendered from. The ETag also covers everything else the body depends
+    on: the code version (serializers), the viewer, the negotiated format and
+    the query string (sparse fieldsets, page).
+    """
+    parts = [
+        code_version(), str(request.user.pk), getattr(request, "accepted_media_type", ""),
+        request.get_full_path(), *(version for version, _ in stamps),
+    ]
+    etag = f'"{hashlib.sha256("|".join(parts).encode()).hexdigest()[:32]}"'
+    return etag, int(max(modified for _, modified in stamps))
+
+
+def conditional(stamps_func):
+    """
+    Adds `ETag` and `Last-Modified` to the GET responses of an APIView method
+    and answers `If-None-Match` / `If-Modified-Since` with 304 before the
+    method runs, so a client polling an unchanged resource costs no
+    serialization and only the queries `stamps_func` makes.
+
+    `stamps_func(request, *args, **kwargs)` returns the `(version, modified)`
+    stamps (see `apis.version_stamps`) of everything the response shows, or
+    None to serve the request without validators. Responses are marked
+    `private, no-cache` and vary on `Accept` and `Authorization`, so caches
+    revalidate instead of guessing a freshness lifetime from Last-Modified.
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            stamps = stamps_func(request, *args, **kwargs)
+            if not stamps:
+                return method(self, request, *args, **kwargs)
+            etag, last_modified = _validators(request, stamps)
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is None:
+                response = method(self, request, *args, **kwargs)
+            if response.status_code in (200, 304):
+                response.headers.setdefault("ETag", etag)
+                response.headers.setdefault("Last-Modified", http_date(last_modified))
+                patch_cache_control(response, private=True, no_cache=True)
+                patch_vary_headers(response, ("Accept", "Authorization"))
+            return response
+        return wrapper
+    return decorator
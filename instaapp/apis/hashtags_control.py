@@ -1,8 +1,7 @@
 from rest_framework.views import APIView, status
 from rest_framework.response import Response
 from django.shortcuts import get_list_or_404, get_object_or_404
-from drf_yasg.utils import swagger_auto_schema
-from drf_yasg import openapi
+from utils.lazy_schema import openapi, swagger_auto_schema
 
 from .permissions_cotrols import CanManageObjectPermission
 from posts.models import Post
@@ -47,6 +46,6 @@ class HashtagsPostListAPIView(APIView):
 
     def get(self, request, hashtaq_name):
         hashtag = get_object_or_404(HashTag, name=hashtaq_name)
-        posts = get_list_or_404(Post, hashtags=hashtag)  
-        serializer = PostSerializer(posts, many=True)
+        posts = get_list_or_404(PostSerializer.setup_eager_loading(Post.objects.all(), request), hashtags=hashtag)
+        serializer = PostSerializer(posts, many=True, fields=PostSerializer.requested_fields(request))
         return Response(serializer.data, status=status.HTTP_200_OK)
\ No newline at end of file
@@ -0,0 +1,223 @@
+import json
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+
+import numpy as np
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import AsyncClient, Client
+from django.test.utils import setup_databases, setup_test_environment, teardown_databases, teardown_test_environment
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apis.async_views import shutdown_query_threads
+from apis.seeding import SocialGraphSeeder
+from hashtags.models import HashTag
+from posts.models import Post
+
+
+class Dataset:
+    """Ids and names of the seeded rows that scenarios pick their targets from."""
+
+    def __init__(self, prefix: str):
+        self.usernames = list(User.objects.filter(username__startswith=prefix).values_list("username", flat=True))
+        self.post_ids = list(
+            Post.objects.filter(profile__user__username__startswith=prefix).values_list("id", flat=True)
+        )
+        self.hashtags = list(
+            HashTag.objects.filter(name__startswith=prefix, post_hashtag__isnull=False)
+            .distinct().values_list("name", flat=True)
+        )
+        self.prefix = prefix
+
+    def pick(self, rng: np.random.Generator, values: list):
+        return values[rng.integers(len(values))]
+
+
+SCENARIOS = {
+    "feed": lambda data, rng: reverse("posts-create"),
+    "post_detail": lambda data, rng: reverse("post-detail", kwargs={"id": data.pick(rng, data.post_ids)}),
+    "post_likes": lambda data, rng: reverse("like-post", kwargs={"post_id": data.pick(rng, data.post_ids)}),
+    "post_comments": lambda data, rng: reverse("post-comments", kwargs={"post_id": data.pick(rng, data.post_ids)}),
+    "user_search": lambda data, rng: f"{reverse('user-search')}?q={data.pick(rng, data.usernames)}",
+    "hashtag_posts": lambda data, rng: reverse(
+        "hashtags-posts", kwargs={"hashtaq_name": data.pick(rng, data.hashtags)}
+    ),
+    "profile_detail": lambda data, rng: reverse(
+        "profile-detail", kwargs={"user_name": data.pick(rng, data.usernames)}
+    ),
+    "followers": lambda data, rng: reverse(
+        "profile-follower-list", kwargs={"user_name": data.pick(rng, data.usernames)}
+    ),
+    "followings": lambda data, rng: reverse(
+        "profile-followings-list", kwargs={"user_name": data.pick(rng, data.usernames)}
+    ),
+    "async_feed": lambda data, rng: reverse("async-feed"),
+    "async_post_detail": lambda data, rng: reverse(
+        "async-post-detail", kwargs={"id": data.pick(rng, data.post_ids)}
+    ),
+    "async_story_tray": lambda data, rng: reverse("async-story-tray"),
+    "async_profile_detail": lambda data, rng: reverse(
+        "async-profile-detail", kwargs={"user_name": data.pick(rng, data.usernames)}
+    ),
+    "async_home": lambda data, rng: reverse("async-home"),
+}
+
+
+class _QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def _percentiles(values: list) -> dict:
+    values = np.asarray(values, dtype=float)
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {
+        "p50": round(p50, 2), "p95": round(p95, 2), "p99": round(p99, 2),
+        "mean": round(values.mean(), 2), "max": round(values.max(), 2),
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    """
+    Load-tests the real API endpoints against a seeded synthetic social graph.
+
+    By default a throwaway test database is created, seeded with
+    `SocialGraphSeeder` and dropped afterwards, so runs on different commits
+    see exactly the same data. Each scenario is then driven through the full
+    middleware and URL stack by `--clients` concurrent clients, each
+    authenticated as a random seeded user, and the command prints p50/p95/p99
+    latency, throughput and SQL queries per request as JSON. The `async_*`
+    scenarios hit the async read views; compare them with their sync
+    counterparts, ideally with `--asgi` so requests take the ASGI path.
+
+    Usage:
+        python manage.py benchmark_api --users 5000 --clients 8 --requests 400 --output before.json
+    """
+    help = "Benchmark API endpoints with concurrent clients on a synthetic social graph."
+
+    def add_arguments(self, parser):
+        SocialGraphSeeder.add_arguments(parser)
+        parser.add_argument("--clients", type=int, default=8, help="Concurrent clients per scenario.")
+        parser.add_argument("--requests", type=int, default=200, help="Requests per scenario.")
+        parser.add_argument("--warmup", type=int, default=10, help="Unmeasured requests per scenario.")
+        parser.add_argument("--viewers", type=int, default=50, help="Distinct users the clients log in as.")
+        parser.add_argument(
+            "--scenarios", default=",".join(SCENARIOS), help=f"Comma separated subset of: {', '.join(SCENARIOS)}."
+        )
+        parser.add_argument(
+            "--existing-database", action="store_true",
+            help="Benchmark the configured database as is, without creating or seeding a test database.",
+        )
+        parser.add_argument(
+            "--asgi", action="store_true",
+            help="Send requests through the ASGI handler (AsyncClient) instead of the WSGI one.",
+        )
+        parser.add_argument("--output", help="Also write the JSON report to this file.")
+
+    def handle(self, *args, **options):
+        scenarios = [name.strip() for name in options["scenarios"].split(",") if name.strip()]
+        unknown = set(scenarios) - set(SCENARIOS)
+        if unknown:
+            raise CommandError(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+        setup_test_environment()
+        old_config = None
+        try:
+            report = {"commit": _git_commit(), "config": {
+                key: options[key] for key in (
+                    "users", "avg_following", "posts_per_user", "hashtags", "likes_per_post", "comments_per_post",
+                    "story_ratio", "alpha", "seed", "clients", "requests", "warmup", "viewers", "asgi",
+                )
+            }}
+            if not options["existing_database"]:
+                old_config = setup_databases(verbosity=0, interactive=False)
+                started = time.perf_counter()
+                report["dataset"] = SocialGraphSeeder.from_options(options).run()
+                report["seed_seconds"] = round(time.perf_counter() - started, 2)
+
+            data = Dataset(options["prefix"])
+            if not (data.usernames and data.post_ids and data.hashtags):
+                raise CommandError(f"No seeded users, posts or hashtags with prefix {options['prefix']!r}.")
+            rng = np.random.default_rng(options["seed"])
+            size = min(options["viewers"], len(data.usernames))
+            viewers = User.objects.filter(
+                username__in=rng.choice(data.usernames, size=size, replace=False)
+            ).order_by("id")
+            tokens = [str(RefreshToken.for_user(user).access_token) for user in viewers]
+
+            report["scenarios"] = {
+                name: self.run_scenario(name, data, tokens, options, index) for index, name in enumerate(scenarios)
+            }
+        finally:
+            shutdown_query_threads()
+            if old_config is not None:
+                teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+
+        output = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as file:
+                file.write(output + "\n")
+        self.stdout.write(output)
+
+    def run_scenario(self, name: str, data: Dataset, tokens: list, options: dict, index: int) -> dict:
+        """Runs one scenario with concurrent clients and summarises its samples."""
+        build_url = SCENARIOS[name]
+        clients = options["clients"]
+        per_client = [options["requests"] // clients + (i < options["requests"] % clients) for i in range(clients)]
+
+        def worker(client_index: int, requests: int) -> list:
+            rng = np.random.default_rng([options["seed"], index, client_index])
+            headers = {"Authorization": f"Bearer {tokens[rng.integers(len(tokens))]}"}
+            get = async_to_sync(AsyncClient().get) if options["asgi"] else Client().get
+            samples = []
+            try:
+                for _ in range(requests):
+                    url = build_url(data, rng)
+                    counter = _QueryCounter()
+                    with ExitStack() as stack:
+                        for alias in connections:
+                            stack.enter_context(connections[alias].execute_wrapper(counter))
+                        started = time.perf_counter()
+                        response = get(url, headers=headers)
+                        elapsed = time.perf_counter() - started
+                    samples.append((elapsed * 1000, counter.count, response.status_code))
+            finally:
+                connections.close_all()
+            return samples
+
+        worker(clients, options["warmup"])
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=clients) as pool:
+            results = list(pool.map(worker, range(clients), per_client))
+        wall = time.perf_counter() - started
+
+        samples = [sample for result in results for sample in result]
+        if not samples:
+            return {"requests": 0}
+        latencies, queries, statuses = zip(*samples)
+        return {
+            "requests": len(samples),
+            "errors": sum(code >= 400 for code in statuses),
+            "throughput_rps": round(len(samples) / wall, 1),
+            "latency_ms": _percentiles(latencies),
+            "queries_per_request": _percentiles(queries),
+        }
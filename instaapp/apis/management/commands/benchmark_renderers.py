@@ -0,0 +1,104 @@
+import json
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import setup_databases, setup_test_environment, teardown_databases, teardown_test_environment
+from rest_framework.renderers import JSONRenderer
+
+from apis.renderers import MessagePackRenderer, ORJSONRenderer
+from apis.seeding import SocialGraphSeeder
+from comments.serializers import CommentSerializer
+from posts.models import Post
+from posts.serializers import PostSerializer
+from profiles.models import Profile
+from profiles.serializers import ProfileSerializer
+
+RENDERERS = {
+    "json": JSONRenderer,
+    "orjson": ORJSONRenderer,
+    "msgpack": MessagePackRenderer,
+}
+
+
+def _payloads(prefix: str, page_size: int) -> dict:
+    """Serializer output the API actually sends: a feed page, a profile list and a comment list."""
+    posts = PostSerializer.setup_eager_loading(
+        Post.objects.filter(profile__user__username__startswith=prefix)
+    ).order_by("-created_at")[:page_size]
+    profiles = ProfileSerializer.setup_eager_loading(
+        Profile.objects.filter(user__username__startswith=prefix)
+    ).order_by("id")[:page_size]
+    post = Post.objects.filter(profile__user__username__startswith=prefix, comments__isnull=False).first()
+    comments = CommentSerializer.setup_eager_loading(post.comments.all()) if post else []
+    return {
+        "feed": {"count": page_size, "next": None, "previous": None,
+                 "results": PostSerializer(posts, many=True).data},
+        "profiles": ProfileSerializer(profiles, many=True).data,
+        "comments": CommentSerializer(comments, many=True).data,
+    }
+
+
+class Command(BaseCommand):
+    """
+    Compares response renderers on real serializer output.
+
+    A throwaway test database is seeded with `SocialGraphSeeder` (or, with
+    `--existing-database`, the configured one is used as is), a feed page,
+    a profile list and a comment list are serialized once, and each renderer
+    renders every payload `--repeat` times. The command prints the median
+    and p95 time per render and the body size for every renderer as JSON.
+
+    Usage:
+        python manage.py benchmark_renderers --page-size 50 --repeat 2000
+    """
+    help = "Benchmark the JSON, orjson and MessagePack renderers on serialized API payloads."
+
+    def add_arguments(self, parser):
+        SocialGraphSeeder.add_arguments(parser)
+        parser.add_argument("--page-size", type=int, default=50, help="Items per serialized list.")
+        parser.add_argument("--repeat", type=int, default=1000, help="Renders per renderer and payload.")
+        parser.add_argument(
+            "--existing-database", action="store_true",
+            help="Read payloads from the configured database instead of seeding a test database.",
+        )
+        parser.add_argument("--output", help="Also write the JSON report to this file.")
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_config = None
+        try:
+            if not options["existing_database"]:
+                old_config = setup_databases(verbosity=0, interactive=False)
+                SocialGraphSeeder.from_options(options).run()
+            payloads = _payloads(options["prefix"], options["page_size"])
+        finally:
+            if old_config is not None:
+                teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+        if not payloads["feed"]["results"]:
+            raise CommandError(f"No seeded posts with prefix {options['prefix']!r}.")
+
+        report = {"config": {key: options[key] for key in ("users", "seed", "page_size", "repeat")}, "payloads": {}}
+        for name, data in payloads.items():
+            results = {}
+            for renderer_name, renderer_class in RENDERERS.items():
+                renderer = renderer_class()
+                body = renderer.render(data)
+                samples = np.empty(options["repeat"])
+                for i in range(options["repeat"]):
+                    started = time.perf_counter()
+                    renderer.render(data)
+                    samples[i] = time.perf_counter() - started
+                p50, p95 = np.percentile(samples * 1e6, [50, 95])
+                results[renderer_name] = {"p50_us": round(p50, 1), "p95_us": round(p95, 1), "bytes": len(body)}
+            baseline = results["json"]["p50_us"]
+            for result in results.values():
+                result["speedup"] = round(baseline / result["p50_us"], 2) if result["p50_us"] else None
+            report["payloads"][name] = results
+
+        output = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as file:
+                file.write(output + "\n")
+        self.stdout.write(output)
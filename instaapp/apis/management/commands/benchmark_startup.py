@@ -0,0 +1,88 @@
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Runs in a fresh interpreter, so every import is paid for again.
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import django
+django.setup()
+setup = time.perf_counter()
+from django.urls import get_resolver
+get_resolver().url_patterns
+urls = time.perf_counter()
+from instaapp.celery import app
+app.loader.import_default_modules()
+celery = time.perf_counter()
+print(json.dumps({
+    "setup_ms": (setup - started) * 1000,
+    "urls_ms": (urls - setup) * 1000,
+    "celery_ms": (celery - urls) * 1000,
+    "modules": len(sys.modules),
+    "lazy": sorted(set(sys.modules) & set(sys.argv[1:])),
+}))
+"""
+
+# Schema tooling imported only when a spec or docs page is built (see utils.lazy_schema);
+# a process start importing one of these is a regression.
+LAZY_MODULES = ("drf_yasg.openapi", "drf_yasg.utils", "drf_yasg.generators", "drf_yasg.codecs", "drf_yasg.views")
+
+
+class Command(BaseCommand):
+    """
+    Measures process start-up: `django.setup()`, loading the URL conf (which
+    imports every view module) and Celery task autodiscovery, each in a fresh
+    interpreter, `--runs` times. Prints the median and max of each phase as
+    JSON and which of `LAZY_MODULES` got imported anyway.
+
+    With `--budget-ms` the command fails when the median of setup plus URL
+    loading exceeds the budget or a lazy module was imported, so it can guard
+    start-up time in CI.
+
+    Usage:
+        python manage.py benchmark_startup --runs 10 --budget-ms 800
+    """
+    help = "Benchmark django.setup(), URL loading and Celery autodiscovery in fresh processes."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--runs", type=int, default=5)
+        parser.add_argument("--budget-ms", type=float, help="Fail above this median setup + URL time.")
+        parser.add_argument("--output", help="Also write the JSON report to this file.")
+
+    def handle(self, *args, **options):
+        env = {**os.environ, "DJANGO_SETTINGS_MODULE": os.environ.get("DJANGO_SETTINGS_MODULE", "instaapp.settings")}
+        runs = []
+        for _ in range(options["runs"]):
+            result = subprocess.run(
+                [sys.executable, "-c", PROBE, *LAZY_MODULES], cwd=settings.BASE_DIR, env=env,
+                capture_output=True, text=True,
+            )
+            if result.returncode:
+                raise CommandError(f"Start-up probe failed:\n{result.stderr}")
+            runs.append(json.loads(result.stdout.strip().splitlines()[-1]))
+
+        report = {"runs": options["runs"]}
+        for phase in ("setup_ms", "urls_ms", "celery_ms"):
+            values = np.array([run[phase] for run in runs])
+            report[phase] = {"median": round(float(np.median(values)), 1), "max": round(float(values.max()), 1)}
+        startup = float(np.median([run["setup_ms"] + run["urls_ms"] for run in runs]))
+        report["startup_ms"] = round(startup, 1)
+        report["modules"] = runs[-1]["modules"]
+        report["eagerly_imported"] = sorted({name for run in runs for name in run["lazy"]})
+
+        output = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as file:
+                file.write(output + "\n")
+        self.stdout.write(output)
+
+        if options["budget_ms"] is not None and startup > options["budget_ms"]:
+            raise CommandError(f"Start-up took {startup:.0f} ms, over the {options['budget_ms']:.0f} ms budget.")
+        if options["budget_ms"] is not None and report["eagerly_imported"]:
+            raise CommandError(f"Imported at start-up: {', '.join(report['eagerly_imported'])}.")
@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from instaapp.schema import code_version, generate_schema_files
+
+
+class Command(BaseCommand):
+    """
+    Writes the OpenAPI spec served at `swagger.json`/`swagger.yaml` to
+    `SCHEMA_DIR`, once per code version. Run it at deploy time so no request
+    ever pays for introspecting the views; it does nothing when the files for
+    the current version already exist.
+
+    Usage:
+        python manage.py generate_openapi_schema [--force]
+    """
+    help = "Generate the static OpenAPI spec for the current code version."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--force", action="store_true", help="Regenerate even if the spec is up to date.")
+
+    def handle(self, *args, **options):
+        paths = generate_schema_files(force=options["force"])
+        if paths:
+            for path in paths:
+                self.stdout.write(f"Wrote {path}")
+        else:
+            self.stdout.write(f"Spec for {code_version()} is up to date in {settings.SCHEMA_DIR}.")
@@ -0,0 +1,57 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db.models import Count, Exists, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from comments.models import Comment
+from likes.models import Like
+from posts.models import Post
+from posts.serializers import PostSerializer
+from profiles.models import Profile
+from .caching import get_or_compute
+
+# Names of the per-viewer fields overlaid on the shared representation.
+VIEWER_FIELDS = ("is_liked", "follows_author")
+
+
+def _build(post_id) -> dict:
+    # A subquery rather than a second Count join, which would multiply the like count.
+    comments = Comment.objects.filter(post_id=OuterRef("pk")).values("post_id").annotate(total=Count("pk"))
+    post = PostSerializer.setup_eager_loading(Post.objects.filter(pk=post_id)).annotate(
+        comments_total=Coalesce(Subquery(comments.values("total"), output_field=IntegerField()), 0)
+    ).first()
+    if post is None:
+        return None
+    return {**PostSerializer(post, context={"image_size": "full"}).data, "comments_count": post.comments_total}
+
+
+def get_cached_post(post_id) -> dict:
+    """
+    Returns the viewer-independent representation of a post (`PostSerializer`
+    fields plus `comments_count`), or None when the post does not exist.
+
+    Entries live in the post's namespace, so every change handled in
+    `apis.signals` makes the next read rebuild it. After `POST_CACHE_TIMEOUT`
+    one request rebuilds a popular post while the others keep getting the
+    stale entry for up to `POST_CACHE_STALE_GRACE` seconds, see
+    `apis.caching.get_or_compute`.
+    """
+    return get_or_compute(
+        "post_detail", f"post:detail:{post_id}", lambda: _build(post_id),
+        timeout=settings.POST_CACHE_TIMEOUT, namespaces=[("post", post_id)],
+        stale_grace=settings.POST_CACHE_STALE_GRACE,
+    )
+
+
+def viewer_post_flags(user, post_id, author_id) -> dict:
+    """
+    Whether `user` liked the post and follows its author, answered with one
+    query of two indexed `EXISTS` lookups.
+    """
+    flags = User.objects.filter(pk=user.pk).annotate(
+        is_liked=Exists(Like.objects.filter(post_id=post_id, profile__user_id=OuterRef("pk"))),
+        follows_author=Exists(
+            Profile.followers.through.objects.filter(profile_id=author_id, user_id=OuterRef("pk"))
+        ),
+    ).values(*VIEWER_FIELDS).first()
+    return flags or dict.fromkeys(VIEWER_FIELDS, False)
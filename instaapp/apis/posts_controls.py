@@ -3,20 +3,53 @@ from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.generics import get_object_or_404
-from django.http import HttpRequest
-from drf_yasg.utils import swagger_auto_schema
-from drf_yasg import openapi
+from django.http import Http404, HttpRequest
+from django.conf import settings
+from django.core.cache import cache
+from utils.lazy_schema import openapi, swagger_auto_schema
 
+from .conditional import conditional
 from .paginations import Pagination
+from .post_cache import VIEWER_FIELDS, get_cached_post, viewer_post_flags
+from .version_stamps import get_stamp, get_stamps
 from posts.models import Post
 from posts.serializers import PostCreateSerializer, PostSerializer
 from likes.models import Like
 from likes.serializers import LikeSerializer
 from comments.models import Comment
 from comments.serializers import CommentSerializer, CommentCreateSerializer
+from profiles.models import Profile
 from .permissions_cotrols import CanManageObjectPermission
 
 
+def _post_stamps(request: HttpRequest, id: int) -> list:
+    """The post and, for `follows_author`, the viewer's followings."""
+    stamps = [get_stamp("post", id)]
+    if request.user.is_authenticated:
+        stamps.append(get_stamp("followings", request.user.pk))
+    return stamps
+
+
+def _feed_stamps(request: HttpRequest) -> list:
+    """
+    The viewer's followings and the stamp of every followed author, which
+    changes with any post they create, edit, delete or get liked. Only the
+    first page gets validators; deeper pages are rarely polled.
+    """
+    if not request.user.is_authenticated or request.query_params.get("page", "1") != "1":
+        return None
+    followings = get_stamp("followings", request.user.pk)
+    key = f"feed:authors:{request.user.pk}:{followings[0]}"
+    author_ids = cache.get(key)
+    if author_ids is None:
+        author_ids = list(
+            Profile.followers.through.objects.filter(user_id=request.user.pk).values_list("profile_id", flat=True)
+        )
+        # The key changes with every follow or unfollow, so the timeout only evicts lists no longer read.
+        cache.set(key, author_ids, timeout=settings.FEED_AUTHORS_CACHE_TIMEOUT)
+    return [followings, *get_stamps("author", author_ids).values()]
+
+
 class PostDetailAPIView(APIView):
     """Get, update, or delete a specific post."""
     permission_classes = [CanManageObjectPermission]
@@ -25,12 +58,22 @@ class PostDetailAPIView(APIView):
         operation_description="Get post details by ID",
         responses={200: PostSerializer()}
     )
-    
+    @conditional(_post_stamps)
     def get(self, request: HttpRequest, id: int) -> Response:
-        """Handles GET request to fetch details of a specific post."""
-        post = get_object_or_404(Post, pk=id)
-        serializer = PostSerializer(post)
-        return Response(serializer.data)
+        """
+        Handles GET request to fetch details of a specific post. The post comes
+        from the cache shared by all viewers, and the viewer's own flags
+        (`is_liked`, `follows_author`) are added with one cheap query.
+        """
+        post = get_cached_post(id)
+        if post is None:
+            raise Http404("No Post matches the given query.")
+        fields = PostSerializer.requested_fields(request)
+        if fields is None or set(VIEWER_FIELDS) & fields:
+            post = {**post, **viewer_post_flags(request.user, id, post["profile"])}
+        if fields is not None:
+            post = {name: value for name, value in post.items() if name in fields}
+        return Response(post)
     
     @swagger_auto_schema(
         operation_description="Partially update a post",
@@ -76,15 +119,17 @@ class PostListCreateAPIView(APIView):
         operation_description="List all likes for a post",
         responses={200: openapi.Response('Likes list', LikeSerializer(many=True))}
     )
-
+    @conditional(_feed_stamps)
     def get(self, request: HttpRequest) -> Response:
         """Get paginated posts from followed profiles."""
 
         following_profiles = request.user.followings.all()
-        posts = Post.objects.filter(profile__in=following_profiles).order_by("-created_at")
+        posts = PostSerializer.setup_eager_loading(
+            Post.objects.filter(profile__in=following_profiles).order_by("-created_at"), request
+        )
         paginator = self.pagination_class()
         result_page = paginator.paginate_queryset(posts, request)
-        serializer = PostSerializer(result_page, many=True)
+        serializer = PostSerializer(result_page, many=True, fields=PostSerializer.requested_fields(request))
         return paginator.get_paginated_response(serializer.data)
     
     @swagger_auto_schema(
@@ -127,7 +172,7 @@ class LikePostAPIView(APIView):
     def get(self, request: HttpRequest, post_id: int) -> Response:
         """Handles GET request to fetch all likes for a specific post."""
         post = get_object_or_404(Post, id=post_id)
-        likes = Like.objects.filter(post=post)
+        likes = LikeSerializer.setup_eager_loading(Like.objects.filter(post=post))
         likes_count = likes.count() 
         serializer = LikeSerializer(likes, many=True)
         response_data = {
@@ -187,6 +232,7 @@ class CommentListAPIView(APIView):
     API view to retrieve all comments across all posts.
     """
     permission_classes = [IsAuthenticated]  
+    statement_timeout = 2000
     @swagger_auto_schema(
         operation_summary="Get all comments",
         responses={200: CommentSerializer(many=True)},
@@ -194,7 +240,7 @@ class CommentListAPIView(APIView):
 
     def get(self, request: HttpRequest) -> Response:
         """ Retrieve all comments for all posts """
-        comments = Comment.objects.all().order_by("-created_at")  
+        comments = CommentSerializer.setup_eager_loading(Comment.objects.all().order_by("-created_at"))
         serializer = CommentSerializer(comments, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
     
@@ -211,7 +257,7 @@ class CommentManagmentAPIView(APIView):
 
     def get(self, request: HttpRequest, post_id: int) -> Response:
         """ Retrieve all comments for a specific post """
-        comments = Comment.objects.filter(post_id=post_id)
+        comments = CommentSerializer.setup_eager_loading(Comment.objects.filter(post_id=post_id))
         serializer = CommentSerializer(comments, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
     
@@ -284,6 +330,7 @@ class LikeCommentAPIView(APIView):
             return Response({"message": "You have already liked this comment"}, status=status.HTTP_400_BAD_REQUEST)
             
         Like.objects.create(profile=request.user.profile, comment=comment)
+        comment = CommentSerializer.setup_eager_loading(Comment.objects.filter(pk=comment.pk)).get()
         serializer = CommentSerializer(comment)
 
         return Response({"message": "Like added","comment": serializer.data}, status=status.HTTP_201_CREATED)
@@ -1,18 +1,22 @@
 from rest_framework.views import APIView, status
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import authenticate
 from rest_framework.permissions import IsAuthenticated
 from django.shortcuts import get_object_or_404
 from django.http import HttpRequest
-from drf_yasg.utils import swagger_auto_schema
-from drf_yasg import openapi
+from django.db import transaction
+from utils.lazy_schema import openapi, swagger_auto_schema
 
 from .posts_controls import Pagination
-from profiles.models import Profile
+from profiles.models import Profile, FollowSuggestion
 from profiles.serializers import ProfileSerializer
 from .permissions_cotrols import CanManageObjectPermission
 from utils.send_mail import send_verification_email
+from .authentication import invalidate_cached_user
+from .conditional import conditional
+from .profile_resolver import get_profile_ref_or_404, get_profile_reference, resolve_username
+from .version_stamps import get_stamp
+from .tokens import BloomRefreshToken
 
 
 class ProfileListAPIView(APIView):
@@ -27,17 +31,18 @@ class ProfileListAPIView(APIView):
     )
     def get(self, request: HttpRequest, *args, **kwargs) -> Response:
         """Handles GET request to list all profiles with pagination."""
-        profiles = Profile.objects.all().order_by("id") 
+        profiles = ProfileSerializer.setup_eager_loading(Profile.objects.all().order_by("id"), request)
         paginator = self.pagination_class() 
         result_page = paginator.paginate_queryset(profiles, request)
         
-        serializer = ProfileSerializer(result_page, many=True)  
+        serializer = ProfileSerializer(result_page, many=True, fields=ProfileSerializer.requested_fields(request))
         return Response(serializer.data, status=status.HTTP_200_OK) 
     
 
 class ProfileSearchAPIView(APIView):
     """API View to search profiles by username."""
     permission_classes = [IsAuthenticated]
+    statement_timeout = 2000
     
     @swagger_auto_schema(
         manual_parameters=[
@@ -55,7 +60,8 @@ class ProfileSearchAPIView(APIView):
             profiles = Profile.objects.filter(user__username__icontains=query)
         else:
             profiles = Profile.objects.all()
-        serializer = ProfileSerializer(profiles, many=True)
+        profiles = ProfileSerializer.setup_eager_loading(profiles, request)
+        serializer = ProfileSerializer(profiles, many=True, fields=ProfileSerializer.requested_fields(request))
         return Response(serializer.data, status=status.HTTP_200_OK)
     
     
@@ -110,9 +116,10 @@ class RegisterAPIView(APIView):
         serializer = ProfileSerializer(data=request.data)
 
         if serializer.is_valid():
-            profile = serializer.save()  
-            send_verification_email(profile)  
-            refresh = RefreshToken.for_user(profile.user)
+            with transaction.atomic():
+                profile = serializer.save()
+                send_verification_email(profile)
+            refresh = BloomRefreshToken.for_user(profile.user)
             access_token = str(refresh.access_token)
             refresh_token = str(refresh)
 
@@ -168,7 +175,7 @@ class LoginAPIView(APIView):
         user = authenticate(username=username, password=password)
 
         if user:
-            refresh = RefreshToken.for_user(user)
+            refresh = BloomRefreshToken.for_user(user)
             return Response({
                 "user": {
                     "id": user.id,
@@ -205,8 +212,9 @@ class LogoutAPIView(APIView):
         """Handles POST request to logout the user by blacklisting the refresh token."""
         try:
             refresh_token = request.data.get("refresh_token")
-            token = RefreshToken(refresh_token)
+            token = BloomRefreshToken(refresh_token)
             token.blacklist()
+            invalidate_cached_user(request.user.id)
             
             return Response({"message": "User successfully logged out."}, status=status.HTTP_200_OK)
         
@@ -222,7 +230,7 @@ class FollowAPIView(APIView):
 
     @swagger_auto_schema(
         responses={
-            200: openapi.Response('Follow success', openapi.Schema(type=openapi.TYPE_OBJECT, properties={'detail': openapi.Schema(type=openapi.TYPE_STRING)})),
+            200: openapi.Response('Follow success', openapi.Schema(type=openapi.TYPE_OBJECT, properties={'detail': openapi.Schema(type=openapi.TYPE_STRING), 'profile': openapi.Schema(type=openapi.TYPE_OBJECT)})),
             400: 'Bad Request',
             404: 'Not Found'
         },
@@ -230,13 +238,16 @@ class FollowAPIView(APIView):
     )
     def post(self, request: HttpRequest, user_name: str) -> Response:
         user = request.user 
-        profile_to_follow = get_object_or_404(Profile, user__username=user_name)
+        profile_to_follow = get_profile_ref_or_404(user_name)
 
-        if profile_to_follow.user == user:
+        if profile_to_follow.user_id == user.pk:
             return Response({"detail": "You cannot follow yourself."}, status=status.HTTP_400_BAD_REQUEST)
 
         profile_to_follow.followers.add(user)
-        return Response({"detail": "You are now following this user."}, status=status.HTTP_200_OK)
+        return Response(
+            {"detail": "You are now following this user.", "profile": get_profile_reference(user_name)},
+            status=status.HTTP_200_OK,
+        )
 
 
 class UnfollowAPIView(APIView):
@@ -247,7 +258,7 @@ class UnfollowAPIView(APIView):
 
     @swagger_auto_schema(
         responses={
-            200: openapi.Response('Unfollow success', openapi.Schema(type=openapi.TYPE_OBJECT, properties={'detail': openapi.Schema(type=openapi.TYPE_STRING)})),
+            200: openapi.Response('Unfollow success', openapi.Schema(type=openapi.TYPE_OBJECT, properties={'detail': openapi.Schema(type=openapi.TYPE_STRING), 'profile': openapi.Schema(type=openapi.TYPE_OBJECT)})),
             400: 'Bad Request',
             404: 'Not Found'
         },
@@ -255,13 +266,16 @@ class UnfollowAPIView(APIView):
     )
     def post(self, request: HttpRequest, user_name: str) -> Response:
         user = request.user
-        profile_to_unfollow = get_object_or_404(Profile, user__username=user_name)
+        profile_to_unfollow = get_profile_ref_or_404(user_name)
 
-        if profile_to_unfollow.user == user:
+        if profile_to_unfollow.user_id == user.pk:
             return Response({"detail": "You cannot unfollow yourself."}, status=status.HTTP_400_BAD_REQUEST)
 
         profile_to_unfollow.followers.remove(user)
-        return Response({"detail": "You have unfollowed this user."}, status=status.HTTP_200_OK)
+        return Response(
+            {"detail": "You have unfollowed this user.", "profile": get_profile_reference(user_name)},
+            status=status.HTTP_200_OK,
+        )
     
     
 class ProfileFollowersListAPIView(APIView):
@@ -276,10 +290,9 @@ class ProfileFollowersListAPIView(APIView):
         operation_description="List profiles following the specified user"
     )
     def get(self, request: HttpRequest, user_name: str, format=None) -> Response:
-        profile = get_object_or_404(Profile, user__username=user_name)
-        follower_users = profile.followers.all()
-        follower_profiles = Profile.objects.filter(user__in=follower_users)
-        follower_serializer = ProfileSerializer(follower_profiles, many=True)
+        profile = get_profile_ref_or_404(user_name)
+        follower_profiles = ProfileSerializer.setup_eager_loading(Profile.objects.filter(user__followings=profile), request)
+        follower_serializer = ProfileSerializer(follower_profiles, many=True, fields=ProfileSerializer.requested_fields(request))
         return Response({"Followers": follower_serializer.data}, status=status.HTTP_200_OK)
             
             
@@ -295,12 +308,18 @@ class ProfileFollowingsListAPIView(APIView):
         operation_description="List profiles followed by the specified user"
     )
     def get(self, request: HttpRequest, user_name: str, format=None) -> Response:
-        profile = get_object_or_404(Profile, user__username=user_name)
-        following_profiles = profile.user.followings.all()
+        profile = get_profile_ref_or_404(user_name)
+        following_profiles = ProfileSerializer.setup_eager_loading(Profile.objects.filter(followers=profile.user_id), request)
         following_serializer = ProfileSerializer(following_profiles, many=True, context={"request": request})
         return Response({"Following": following_serializer.data}, status=status.HTTP_200_OK)
     
 
+def _profile_stamps(request: HttpRequest, user_name: str) -> list:
+    """The profile's stamp, which covers its user, followers and followings."""
+    resolved = resolve_username(user_name)
+    return None if resolved is None else [get_stamp("profile", resolved[1])]
+
+
 class ProfileDetailView(APIView):
     """API for retrieving user profile details."""
     permission_classes = [CanManageObjectPermission]
@@ -309,9 +328,12 @@ class ProfileDetailView(APIView):
         responses={200: ProfileSerializer, 404: 'Not Found'},
         operation_description="Get user profile details by username"
     )
+    @conditional(_profile_stamps)
     def get(self, request: HttpRequest, user_name: str) -> Response:
-        profile = get_object_or_404(Profile, user__username=user_name)
-        serializer = ProfileSerializer(profile)
+        profile = get_object_or_404(
+            ProfileSerializer.setup_eager_loading(Profile.objects.all(), request), pk=get_profile_ref_or_404(user_name).pk
+        )
+        serializer = ProfileSerializer(profile, fields=ProfileSerializer.requested_fields(request))
         return Response(serializer.data, status=status.HTTP_200_OK)
     
     @swagger_auto_schema(
@@ -326,7 +348,7 @@ class ProfileDetailView(APIView):
     )
     def patch(self, request: HttpRequest, user_name: str) -> Response:
         """Partially update user profile details."""
-        profile = get_object_or_404(Profile, user__username=user_name)
+        profile = get_object_or_404(Profile.objects.select_related("user"), pk=get_profile_ref_or_404(user_name).pk)
         print(f"Request User: {request.user}, Profile Owner: {profile.user}")
         if request.user != profile.user:
             return Response({"detail": "You do not have permission to edit this profile."}, status=status.HTTP_403_FORBIDDEN)
@@ -337,3 +359,27 @@ class ProfileDetailView(APIView):
             return Response(serializer.data, status=status.HTTP_200_OK)
         
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class FollowSuggestionsAPIView(APIView):
+    """Returns the precomputed "people you may know" list for the current user."""
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        responses={200: ProfileSerializer(many=True)},
+        operation_description="List suggested profiles to follow, best match first"
+    )
+    def get(self, request: HttpRequest) -> Response:
+        suggestion = FollowSuggestion.objects.filter(user_id=request.user.id).first()
+        if suggestion is None:
+            return Response([], status=status.HTTP_200_OK)
+
+        already_following = set(request.user.followings.values_list("user_id", flat=True))
+        user_ids = [user_id for user_id in suggestion.suggested_user_ids if user_id not in already_following]
+        profiles = {
+            profile.user_id: profile
+            for profile in ProfileSerializer.setup_eager_loading(Profile.objects.filter(user_id__in=user_ids), request)
+        }
+        ordered = [profiles[user_id] for user_id in user_ids if user_id in profiles]
+        serializer = ProfileSerializer(ordered, many=True, fields=ProfileSerializer.requested_fields(request))
+        return Response(serializer.data, status=status.HTTP_200_OK)
@@ -0,0 +1,64 @@
+from django.conf import settings
+from django.http import Http404
+
+from profiles.models import Profile
+from utils.images import avatar_urls
+from .caching import get_or_compute
+
+
+def _lookup(user_name: str) -> tuple:
+    profile = (
+        Profile.objects.filter(user__username=user_name)
+        .only("pk", "user_id", "profile_picture", "picture_variants").first()
+    )
+    if profile is None:
+        return None
+    return profile.pk, profile.user_id, avatar_urls(profile.profile_picture, profile.picture_variants)
+
+
+def _resolve(user_name: str) -> tuple:
+    """
+    Returns `(profile_id, user_id, avatar URLs)` of a username, or None when no
+    profile has it.
+
+    The mapping is cached for `USERNAME_CACHE_TIMEOUT` seconds in the
+    username's namespace, which `apis.signals` bumps when the user is renamed
+    (`profiles.signals.username_changed`) or deleted and when the profile
+    picture or its avatars change. Unknown usernames are not cached, so a newly
+    registered one resolves right away.
+    """
+    return get_or_compute(
+        "username", f"profile:by-username:{user_name}", lambda: _lookup(user_name),
+        timeout=settings.USERNAME_CACHE_TIMEOUT, namespaces=[("username", user_name)],
+    )
+
+
+def resolve_username(user_name: str) -> tuple:
+    """Returns the `(profile_id, user_id)` of a username, or None when no profile has it."""
+    resolved = _resolve(user_name)
+    return None if resolved is None else tuple(resolved[:2])
+
+
+def get_profile_reference(user_name: str) -> dict:
+    """
+    Returns the same `{"id", "username", "avatar"}` as
+    `profiles.serializers.ProfileReferenceSerializer` from the cached mapping,
+    so a warm username costs no query; raises Http404 for an unknown username.
+    """
+    resolved = _resolve(user_name)
+    if resolved is None:
+        raise Http404("No Profile matches the given query.")
+    return {"id": resolved[0], "username": user_name, "avatar": resolved[2]}
+
+
+def get_profile_ref_or_404(user_name: str) -> Profile:
+    """
+    Returns the profile of a username without querying it: only `id` and
+    `user_id` are set, and any other field is loaded from the database on first
+    access. Enough for relation managers (`profile.followers.add(...)`) and
+    filters; raises Http404 for an unknown username.
+    """
+    resolved = resolve_username(user_name)
+    if resolved is None:
+        raise Http404("No Profile matches the given query.")
+    return Profile.from_db("default", ["id", "user_id"], resolved)
@@ -0,0 +1,64 @@
+import msgpack
+import orjson
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+# Types orjson and msgpack do not know (lazy translations, timedeltas, querysets, ...)
+# are converted the same way DRF's own JSON encoder converts them.
+_default = JSONEncoder().default
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    Drop-in replacement for DRF's `JSONRenderer` built on orjson.
+
+    orjson serializes dicts, lists, strings, datetimes and UUIDs in C, several
+    times faster than the standard library encoder DRF uses; anything else
+    falls back to DRF's `JSONEncoder.default`. Like `JSONRenderer` the output
+    is compact UTF-8, with U+2028/U+2029 escaped so it is safe inside
+    `<script>` tags. Indented output (browsable API, `; indent=` in the
+    `Accept` header) always uses two spaces, the only width orjson supports.
+    """
+    options = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        options = self.options
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            options |= orjson.OPT_INDENT_2
+        try:
+            content = orjson.dumps(data, default=_default, option=options)
+        except orjson.JSONEncodeError as exc:
+            raise TypeError(str(exc)) from exc
+        return content.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+
+
+class MessagePackRenderer(BaseRenderer):
+    """
+    Renders `application/msgpack`, a compact binary encoding of the same data
+    as the JSON responses, for clients that send `Accept: application/msgpack`.
+    Datetimes and other non-native types are sent as the strings JSON would use.
+    """
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return msgpack.packb(data, default=_default, use_bin_type=True, datetime=False)
+
+
+class MessagePackParser(BaseParser):
+    """Parses `application/msgpack` request bodies into the same structures as `JSONParser`."""
+    media_type = "application/msgpack"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return msgpack.unpackb(stream.read(), raw=False, strict_map_key=False)
+        except (ValueError, msgpack.UnpackException) as exc:
+            raise ParseError(f"MessagePack parse error - {exc}")
@@ -0,0 +1,167 @@
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from comments.models import Comment
+from hashtags.models import HashTag
+from likes.models import Like
+from posts.models import Post, Story
+from posts.tasks import IMAGE_FIELDS, derivatives_outdated, queue_image_derivatives
+from profiles.models import Profile
+from profiles.signals import username_changed
+from .authentication import invalidate_cached_user
+from .version_stamps import bump_stamps
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_user_on_change(sender, instance, **kwargs):
+    """Password changes, deactivation and other user edits drop the cached user."""
+    invalidate_cached_user(instance.pk)
+    _bump("profile", [instance.pk])
+
+
+@receiver(post_delete, sender=User)
+def invalidate_username_on_delete(sender, instance, **kwargs):
+    """A deleted user's name must stop resolving, see `apis.profile_resolver`."""
+    _bump("username", [instance.username])
+
+
+@receiver(username_changed)
+def invalidate_username_on_rename(sender, user, old_username, **kwargs):
+    """After a rename the old name must stop resolving, see `apis.profile_resolver`."""
+    _bump("username", [old_username, user.username])
+
+
+@receiver([post_save, post_delete], sender=Profile)
+def invalidate_user_on_profile_change(sender, instance, **kwargs):
+    """The profile is cached together with its user, so profile edits drop it too."""
+    invalidate_cached_user(instance.user_id)
+    _bump("profile", [instance.user_id])
+
+
+@receiver(post_save, sender=Profile)
+def invalidate_username_on_avatar_change(sender, instance, update_fields=None, **kwargs):
+    """The username mapping carries the avatar URLs, see `apis.profile_resolver`."""
+    if update_fields is not None and not {"profile_picture", "picture_variants"} & set(update_fields):
+        return
+    if Profile.user.is_cached(instance):
+        usernames = [instance.user.username]
+    else:
+        usernames = User.objects.filter(pk=instance.user_id).values_list("username", flat=True)
+    _bump("username", usernames)
+
+
+def _bump(kind, keys):
+    """
+    Bumps the version stamps (see `apis.version_stamps`) now and again once the
+    transaction commits, so a read that cached or validated not yet committed
+    data cannot outlive it.
+    """
+    keys = list(keys)
+    if keys:
+        bump_stamps(kind, keys)
+        transaction.on_commit(lambda: bump_stamps(kind, keys))
+
+
+def _invalidate_posts(post_ids, author_ids=None):
+    """
+    Drops the cached posts and bumps their authors' stamps, which the feed
+    validators are built from. Authors are looked up when not given.
+    """
+    post_ids = list(post_ids)
+    if post_ids and author_ids is None:
+        author_ids = set(Post.objects.filter(pk__in=post_ids).values_list("profile_id", flat=True))
+    _bump("post", post_ids)
+    _bump("author", author_ids or ())
+
+
+@receiver([post_save, post_delete], sender=Post)
+def invalidate_post_on_change(sender, instance, **kwargs):
+    """Creating, editing and deleting a post drop its cached representation and change its author's feed."""
+    _invalidate_posts([instance.pk], [instance.profile_id])
+
+
+@receiver([post_save, post_delete], sender=Like)
+def invalidate_post_on_like(sender, instance, **kwargs):
+    """Likes and unlikes change the like count of the post or story."""
+    if instance.post_id:
+        # Avoid looking the author up when the post is at hand, including for
+        # every like removed along with a deleted post.
+        origin = kwargs.get("origin")
+        if Like.post.is_cached(instance):
+            _invalidate_posts([instance.post_id], [instance.post.profile_id])
+        elif isinstance(origin, Post) and origin.pk == instance.post_id:
+            _invalidate_posts([instance.post_id], [origin.profile_id])
+        else:
+            _invalidate_posts([instance.post_id])
+    if instance.story_id:
+        _bump("story", [instance.story_id])
+
+
+@receiver([post_save, post_delete], sender=Comment)
+def invalidate_post_on_comment(sender, instance, **kwargs):
+    """Comments change the cached comment count, which feeds do not show."""
+    _bump("post", [instance.post_id])
+
+
+@receiver(m2m_changed, sender=Post.hashtags.through)
+def invalidate_post_on_hashtags_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """Adding or removing hashtags, from either side, changes the cached hashtag list."""
+    if not reverse and action in ("post_add", "post_remove", "post_clear"):
+        _invalidate_posts([instance.pk], [instance.profile_id])
+    elif reverse and action in ("post_add", "post_remove"):
+        _invalidate_posts(pk_set)
+    elif reverse and action == "pre_clear":
+        _invalidate_posts(instance.post_hashtag.values_list("pk", flat=True))
+
+
+@receiver([post_save, pre_delete], sender=HashTag)
+def invalidate_posts_on_hashtag_change(sender, instance, **kwargs):
+    """Renaming or deleting a hashtag changes the hashtag list of every post that has it."""
+    if not kwargs.get("created"):
+        _invalidate_posts(instance.post_hashtag.values_list("pk", flat=True))
+
+
+@receiver([post_save, post_delete], sender=Story)
+def invalidate_story_on_change(sender, instance, **kwargs):
+    """Edits and deletion of a story change its stamp."""
+    _bump("story", [instance.pk])
+
+
+@receiver(m2m_changed, sender=Profile.followers.through)
+def invalidate_profiles_on_follow(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    A follow or unfollow changes the followed profile (followers) and the
+    follower's profile (following count) and followings, which feeds and
+    `follows_author` depend on.
+    """
+    if action == "pre_clear":
+        pk_set = set(
+            instance.followings.values_list("pk", flat=True) if reverse
+            else instance.followers.values_list("pk", flat=True)
+        )
+    elif action not in ("post_add", "post_remove"):
+        return
+    if reverse:
+        followers = [instance.pk]
+        followed = Profile.objects.filter(pk__in=pk_set).values_list("user_id", flat=True)
+    else:
+        followers = pk_set
+        followed = [instance.user_id]
+    _bump("followings", followers)
+    _bump("profile", {*followers, *followed})
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Story)
+@receiver(post_save, sender=Profile)
+def generate_derivatives_on_upload(sender, instance, update_fields=None, **kwargs):
+    """A new, replaced or removed image gets its derivatives (re)generated in a worker."""
+    image_field, variants_field = IMAGE_FIELDS[sender._meta.label]
+    if update_fields is not None and image_field not in update_fields:
+        return
+    if {image_field, variants_field} & instance.get_deferred_fields():
+        return
+    if derivatives_outdated(instance):
+        queue_image_derivatives(instance)
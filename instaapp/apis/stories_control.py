@@ -4,10 +4,11 @@ from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from django.shortcuts import get_object_or_404
 from django.http import HttpRequest
-from drf_yasg.utils import swagger_auto_schema
-from drf_yasg import openapi
+from utils.lazy_schema import openapi, swagger_auto_schema
 
+from .conditional import conditional
 from .permissions_cotrols import CanManageObjectPermission
+from .version_stamps import get_stamp
 from posts.models import Story
 from posts.serializers import StoryCreateSerializer, StorySerializer
 from likes.models import Like
@@ -24,10 +25,11 @@ class StoryManagmentAPIView(APIView):
             openapi.Parameter('story_id', openapi.IN_PATH, description="Hekayə ID-si", type=openapi.TYPE_INTEGER)
         ]
     )
+    @conditional(lambda request, story_id: [get_stamp("story", story_id)])
     def get(self, request: HttpRequest, story_id: int) -> Response:
         """Handle GET request to retrieve a story by ID."""
-        story = get_object_or_404(Story, id=story_id)
-        serializer = StorySerializer(story, context={"request": request})  
+        story = get_object_or_404(StorySerializer.setup_eager_loading(Story.objects.all(), request), id=story_id)
+        serializer = StorySerializer(story, context={"request": request})
         return Response(serializer.data, status=status.HTTP_200_OK)
   
     @swagger_auto_schema(
@@ -0,0 +1,36 @@
+from celery import shared_task
+from django.conf import settings
+from django.utils.timezone import now
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+
+
+@shared_task
+def prune_expired_tokens(batch_size: int = None) -> int:
+    """
+    A Celery task that deletes expired refresh tokens in batches.
+
+    Every refresh adds an `OutstandingToken` row (and, with rotation, a
+    `BlacklistedToken` row), and nothing ever removes them. Expired tokens fail
+    signature verification before the blacklist is consulted, so their rows can
+    go. Rows are deleted in primary-key order, `batch_size` at a time, so each
+    delete is a short transaction; blacklist rows are removed by the cascade.
+
+    Returns:
+        int: The number of outstanding tokens deleted.
+    """
+    batch_size = batch_size or settings.TOKEN_PRUNE_BATCH_SIZE
+    cutoff = now()
+    last_id = 0
+    deleted = 0
+    while True:
+        ids = list(
+            OutstandingToken.objects.filter(id__gt=last_id, expires_at__lt=cutoff)
+            .order_by("id")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        if not ids:
+            break
+        OutstandingToken.objects.filter(id__in=ids).delete()
+        deleted += len(ids)
+        last_id = ids[-1]
+    return deleted
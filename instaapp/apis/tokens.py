@@ -0,0 +1,105 @@
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.timezone import now
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from utils.bloom_filter import BloomFilter
+
+WATERMARK_KEY = "auth:blacklist-watermark"
+# Rows re-read on every sync, so blacklist rows committed slightly out of id order are not skipped.
+SYNC_LOOKBACK = 100
+
+
+class BlacklistIndex:
+    """
+    Process-wide Bloom filter of blacklisted refresh token JTIs.
+
+    The filter answers "definitely not blacklisted" without touching the
+    database; only possible hits are confirmed with the regular
+    `BlacklistedToken` lookup. It is kept in step with the database
+    incrementally: whenever a process blacklists a token it publishes the new
+    row id as a watermark in the cache, and other processes load rows above
+    their last seen id when the watermark moves or at least every
+    `TOKEN_BLACKLIST_SYNC_INTERVAL` seconds. When the filter outgrows its
+    capacity it is rebuilt from the non-expired rows with twice the size.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._filter = None
+        self._last_id = 0
+        self._synced_at = 0.0
+
+    def might_contain(self, jti: str) -> bool:
+        """Returns False if the token is certainly not blacklisted."""
+        self._sync()
+        return jti in self._filter
+
+    def add(self, jti: str, row_id: int):
+        """Records a token this process has just blacklisted."""
+        self._sync()
+        with self._lock:
+            self._filter.add(jti)
+        if row_id > cache.get(WATERMARK_KEY, 0):
+            cache.set(WATERMARK_KEY, row_id, timeout=None)
+
+    def reset(self):
+        """Forgets the filter; it is rebuilt from the database on next use."""
+        with self._lock:
+            self._filter = None
+            self._last_id = 0
+
+    def _sync(self):
+        interval = settings.TOKEN_BLACKLIST_SYNC_INTERVAL
+        with self._lock:
+            watermark = cache.get(WATERMARK_KEY, 0)
+            if self._filter is None or self._filter.is_full():
+                self._rebuild()
+            elif watermark > self._last_id or time.monotonic() - self._synced_at >= interval:
+                self._load(BlacklistedToken.objects.filter(id__gt=self._last_id - SYNC_LOOKBACK))
+            self._last_id = max(self._last_id, watermark)
+
+    def _rebuild(self):
+        rows = BlacklistedToken.objects.filter(token__expires_at__gt=now())
+        capacity = max(settings.TOKEN_BLACKLIST_BLOOM_CAPACITY, rows.count() * 2)
+        self._filter = BloomFilter(capacity, settings.TOKEN_BLACKLIST_BLOOM_ERROR_RATE)
+        self._last_id = 0
+        self._load(rows)
+
+    def _load(self, rows):
+        for row_id, jti in rows.order_by("id").values_list("id", "token__jti").iterator(chunk_size=5000):
+            self._filter.add(jti)
+            self._last_id = max(self._last_id, row_id)
+        self._synced_at = time.monotonic()
+
+
+blacklist_index = BlacklistIndex()
+
+
+class BloomRefreshToken(RefreshToken):
+    """
+    Refresh token whose blacklist check consults `blacklist_index` first.
+
+    Tokens that are not in the Bloom filter skip the `BlacklistedToken` query
+    entirely; the database is only asked to confirm possible hits.
+    """
+
+    def check_blacklist(self) -> None:
+        if blacklist_index.might_contain(self.payload[api_settings.JTI_CLAIM]):
+            super().check_blacklist()
+
+    def blacklist(self):
+        blacklisted, created = super().blacklist()
+        blacklist_index.add(self.payload[api_settings.JTI_CLAIM], blacklisted.id)
+        return blacklisted, created
+
+
+class BloomTokenRefreshSerializer(TokenRefreshSerializer):
+    """Token refresh serializer that rotates refresh tokens through `BloomRefreshToken`."""
+    token_class = BloomRefreshToken
@@ -0,0 +1,146 @@
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.http import HttpRequest
+from django.shortcuts import get_object_or_404
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from utils.chunked_files import HashingReader, save_stream
+from utils.lazy_schema import openapi, swagger_auto_schema
+
+from uploads.models import Upload
+from uploads.serializers import UploadSerializer
+from uploads.tasks import queue_assembly
+
+
+def _get_upload(request: HttpRequest, upload_id, lock: bool = False) -> Upload:
+    """Returns one of the current user's uploads, locked for the transaction with `lock`."""
+    uploads = Upload.objects.select_for_update(of=("self",)) if lock else Upload.objects
+    return get_object_or_404(uploads, pk=upload_id, profile__user=request.user)
+
+
+def _conflict(upload: Upload, detail: str) -> Response:
+    return Response(
+        {"detail": detail, "status": upload.status, "next_chunk": upload.next_chunk},
+        status=status.HTTP_409_CONFLICT,
+    )
+
+
+class UploadCreateAPIView(APIView):
+    """API for starting a chunked, resumable upload of a large file (a post or story video)."""
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description="Start a chunked upload",
+        request_body=UploadSerializer,
+        responses={201: UploadSerializer(), 400: 'Bad Request'}
+    )
+    def post(self, request: HttpRequest) -> Response:
+        serializer = UploadSerializer(data=request.data, context={"request": request})
+        if serializer.is_valid():
+            serializer.save()
+            return Response(serializer.data, status=status.HTTP_201_CREATED)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class UploadDetailAPIView(APIView):
+    """API for checking the progress of an upload (to resume it) and for cancelling it."""
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description="Get the progress of an upload",
+        responses={200: UploadSerializer(), 404: 'Not Found'}
+    )
+    def get(self, request: HttpRequest, upload_id) -> Response:
+        return Response(UploadSerializer(_get_upload(request, upload_id)).data, status=status.HTTP_200_OK)
+
+    @swagger_auto_schema(
+        operation_description="Cancel an upload and delete what was received",
+        responses={204: 'No Content', 404: 'Not Found', 409: 'Conflict'}
+    )
+    def delete(self, request: HttpRequest, upload_id) -> Response:
+        with transaction.atomic():
+            upload = _get_upload(request, upload_id, lock=True)
+            if upload.status == Upload.ASSEMBLING:
+                return _conflict(upload, "The upload is being assembled.")
+            upload.delete()
+        for name in upload.parts:
+            default_storage.delete(name)
+        if upload.file:
+            default_storage.delete(upload.file.name)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class UploadChunkAPIView(APIView):
+    """
+    API for sending one chunk of an upload as the raw request body.
+
+    Chunks must be sent in order, each exactly `chunk_size` bytes (the last one
+    the rest of the file), with its hex SHA-256 in the `X-Chunk-SHA256` header.
+    The body is streamed to storage as it arrives instead of being buffered. A
+    chunk out of order gets a 409 with the `next_chunk` to send.
+    """
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description="Send a chunk of an upload",
+        manual_parameters=[
+            openapi.Parameter('X-Chunk-SHA256', openapi.IN_HEADER, description="Hex SHA-256 of the chunk", type=openapi.TYPE_STRING, required=True)
+        ],
+        responses={200: UploadSerializer(), 400: 'Bad Request', 404: 'Not Found', 409: 'Conflict'}
+    )
+    def put(self, request: HttpRequest, upload_id, index: int) -> Response:
+        upload = _get_upload(request, upload_id)
+        if upload.status != Upload.OPEN:
+            return _conflict(upload, "The upload does not accept chunks anymore.")
+        if index != upload.next_chunk or index >= upload.total_chunks:
+            return _conflict(upload, f"Expected chunk {upload.next_chunk}.")
+
+        checksum = request.headers.get("X-Chunk-SHA256", "").lower()
+        if not checksum:
+            return Response({"detail": "The X-Chunk-SHA256 header is required."}, status=status.HTTP_400_BAD_REQUEST)
+        expected = upload.chunk_length(index)
+        if request.META.get("CONTENT_LENGTH") != str(expected):
+            return Response({"detail": f"Chunk {index} must be {expected} bytes."}, status=status.HTTP_400_BAD_REQUEST)
+
+        reader = HashingReader(request.stream, expected)
+        name = save_stream(f"uploads/{upload.pk}/{index:06d}.part", reader)
+        if reader.size != expected or reader.hexdigest() != checksum:
+            default_storage.delete(name)
+            return Response({"detail": "The chunk does not match its checksum."}, status=status.HTTP_400_BAD_REQUEST)
+
+        with transaction.atomic():
+            upload = _get_upload(request, upload_id, lock=True)
+            # Another request stored this chunk while this one was receiving it.
+            if upload.status != Upload.OPEN or upload.next_chunk != index:
+                default_storage.delete(name)
+                return _conflict(upload, f"Expected chunk {upload.next_chunk}.")
+            upload.parts.append(name)
+            upload.save(update_fields=["parts", "updated_at"])
+        return Response(UploadSerializer(upload).data, status=status.HTTP_200_OK)
+
+
+class UploadFinalizeAPIView(APIView):
+    """
+    API for finishing an upload once every chunk is in. The file is assembled
+    by a Celery worker; poll the upload until its status is `complete`, then
+    attach it to a post or story as `video_upload`.
+    """
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description="Finish an upload",
+        responses={202: UploadSerializer(), 404: 'Not Found', 409: 'Conflict'}
+    )
+    def post(self, request: HttpRequest, upload_id) -> Response:
+        with transaction.atomic():
+            upload = _get_upload(request, upload_id, lock=True)
+            if upload.status != Upload.OPEN:
+                return _conflict(upload, "The upload is already finalized.")
+            if upload.next_chunk != upload.total_chunks:
+                return _conflict(upload, f"Chunks {upload.next_chunk} to {upload.total_chunks - 1} are missing.")
+            upload.status = Upload.ASSEMBLING
+            upload.save(update_fields=["status", "updated_at"])
+            queue_assembly(upload)
+        return Response(UploadSerializer(upload).data, status=status.HTTP_202_ACCEPTED)
@@ -3,6 +3,8 @@ from .posts_controls import *
 from .profile_controls import *
 from .stories_control import *
 from .hashtags_control import *
+from .uploads_controls import *
+from .async_views import *
 
 urlpatterns = [
     path(
@@ -17,6 +19,12 @@ urlpatterns = [
         name="user-search"
         ),
     
+    path(
+        'suggestions/',
+        FollowSuggestionsAPIView.as_view(),
+        name="follow-suggestions"
+        ),
+    
     path(
         'register/',
         RegisterAPIView.as_view(),
@@ -140,5 +148,65 @@ urlpatterns = [
             name="hashtags-posts"
             ),
 
+    path(
+        'uploads/',
+        UploadCreateAPIView.as_view(),
+        name="upload-create"
+        ),
+    
+    path(
+        'uploads/<uuid:upload_id>/',
+        UploadDetailAPIView.as_view(),
+        name="upload-detail"
+        ),
+    
+    path(
+        'uploads/<uuid:upload_id>/chunks/<int:index>/',
+        UploadChunkAPIView.as_view(),
+        name="upload-chunk"
+        ),
+    
+    path(
+        'uploads/<uuid:upload_id>/finalize/',
+        UploadFinalizeAPIView.as_view(),
+        name="upload-finalize"
+        ),
+
+    path(
+        'async/posts/',
+        async_feed,
+        name="async-feed"
+        ),
+    
+    path(
+        'async/post/<int:id>/',
+        async_post_detail,
+        name="async-post-detail"
+        ),
+    
+    path(
+        'async/stories/',
+        async_story_tray,
+        name="async-story-tray"
+        ),
+    
+    path(
+        'async/profiles/<str:user_name>/',
+        async_profile_detail,
+        name="async-profile-detail"
+        ),
+    
+    path(
+        'async/home/',
+        async_home,
+        name="async-home"
+        ),
+
+    path(
+        'async/home/seen/',
+        async_home_seen,
+        name="async-home-seen"
+        ),
+
 ]
 
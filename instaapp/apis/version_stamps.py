@@ -0,0 +1,62 @@
+import time
+from uuid import uuid4
+
+from django.core.cache import cache
+
+
+def _stamp_key(kind: str, key) -> str:
+    return f"stamp:{kind}:{key}"
+
+
+def _new_stamp() -> tuple:
+    return uuid4().hex, time.time()
+
+
+def _load(pairs: list) -> dict:
+    found = cache.get_many([_stamp_key(kind, key) for kind, key in pairs])
+    stamps = {}
+    for kind, key in pairs:
+        stamp = found.get(_stamp_key(kind, key))
+        if stamp is None:
+            stamp = _new_stamp()
+            if not cache.add(_stamp_key(kind, key), stamp, timeout=None):
+                stamp = cache.get(_stamp_key(kind, key), stamp)
+        stamps[kind, key] = stamp
+    return stamps
+
+
+def get_stamps(kind: str, keys) -> dict:
+    """
+    Returns the version stamp of several objects of one kind with one cache
+    round trip, creating the missing ones.
+
+    A stamp is a `(version, modified)` pair: a random version, which unlike a
+    counter can never repeat after the key is lost, and the time it was last
+    bumped. A stamp created on a miss takes the
+    current time, which can only make the object look newer than it is.
+
+    Args:
+        kind (str): The kind of object, e.g. "post" or "profile".
+        keys (iterable): The ids of the objects.
+
+    Returns:
+        dict: The stamp of each key.
+    """
+    return {key: stamp for (_, key), stamp in _load([(kind, key) for key in keys]).items()}
+
+
+def get_versions(namespaces) -> list:
+    """Returns the versions of `(kind, key)` pairs of any kinds, in order, with one round trip."""
+    namespaces = list(namespaces)
+    stamps = _load(namespaces)
+    return [stamps[namespace][0] for namespace in namespaces]
+
+
+def get_stamp(kind: str, key) -> tuple:
+    """Returns the `(version, modified)` stamp of one object, see `get_stamps`."""
+    return get_stamps(kind, [key])[key]
+
+
+def bump_stamps(kind: str, keys):
+    """Gives the objects new stamps, which invalidates everything derived from the old ones."""
+    cache.set_many({_stamp_key(kind, key): _new_stamp() for key in keys}, timeout=None)
@@ -1,6 +1,9 @@
 from rest_framework import serializers
+from django.db.models import Prefetch, QuerySet
 from .models import Comment
 from posts.models import Post
+from likes.models import Like
+from profiles.serializers import ProfileReferenceSerializer
 
 class CommentSerializer(serializers.ModelSerializer):
     """
@@ -9,34 +12,66 @@ class CommentSerializer(serializers.ModelSerializer):
     **Fields:**
     - `id`: Unique identifier of the comment.
     - `user`: The username of the comment's author.
+    - `author`: Compact reference (id, username, avatar) to the comment's author.
     - `post`: The ID of the post associated with the comment.
     - `text`: The content of the comment.
     - `created_at`: Formatted timestamp when the comment was created.
     - `like_count`: Number of likes the comment has received.
     - `liked_by_users`: List of usernames who liked the comment.
+    - `liked_by`: Compact references to the users who liked the comment.
 
     **Read-Only Fields:**
     - `user`
+    - `author`
     - `created_at`
     - `like_count`
     - `liked_by_users`
+    - `liked_by`
     """
     user = serializers.CharField(source="user.user.username", read_only=True) 
+    author = ProfileReferenceSerializer(source="user", read_only=True)
     post = serializers.PrimaryKeyRelatedField(queryset=Post.objects.all())  
     created_at = serializers.DateTimeField(format="%Y-%m-%d %H:%M", read_only=True)  
+    like_count = serializers.SerializerMethodField()
+    liked_by_users = serializers.SerializerMethodField()
+    liked_by = serializers.SerializerMethodField()
 
     class Meta:
         model = Comment
         fields = [
             "id",
             "user",
+            "author",
             "post",
             "text",
             "created_at",
             "like_count", 
-            "liked_by_users" 
+            "liked_by_users",
+            "liked_by"
         ]
 
+    @staticmethod
+    def setup_eager_loading(queryset: QuerySet) -> QuerySet:
+        """
+        Joins the author and prefetches the likes (with their usernames) of all
+        comments at once, so the like fields cost no query per comment.
+        """
+        return queryset.select_related("user__user").prefetch_related(
+            Prefetch("comment_likes", queryset=Like.objects.select_related("profile__user"))
+        )
+
+    def get_like_count(self, obj) -> int:
+        """Returns the number of likes on the comment, from the prefetched likes."""
+        return len(obj.comment_likes.all())
+
+    def get_liked_by_users(self, obj) -> list:
+        """Returns the usernames of the users who liked the comment."""
+        return [like.profile.user.username for like in obj.comment_likes.all()]
+
+    def get_liked_by(self, obj) -> list:
+        """Returns references to the profiles that liked the comment, from the prefetched likes."""
+        return ProfileReferenceSerializer([like.profile for like in obj.comment_likes.all()], many=True).data
+
 
 class CommentCreateSerializer(serializers.ModelSerializer):
     """
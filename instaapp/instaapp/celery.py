@@ -11,4 +11,7 @@ app = Celery('instaapp')
 app.config_from_object('django.conf:settings', namespace='CELERY')
 
 # Auto-discover Celery tasks from all registered Django apps
-app.autodiscover_tasks()
\ No newline at end of file
+app.autodiscover_tasks()
+
+# Record queue wait and execution time of every task, see instaapp.metrics
+from . import metrics  # noqa: E402,F401
\ No newline at end of file
@@ -0,0 +1,134 @@
+import os
+import time
+from datetime import datetime, timezone
+
+from celery.signals import before_task_publish, task_postrun, task_prerun
+from django.http import HttpResponse
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess,
+)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "Time spent handling a request.",
+    ["route", "method"], buckets=LATENCY_BUCKETS,
+)
+REQUESTS = Counter(
+    "http_requests_total", "Requests handled, by response status.",
+    ["route", "method", "status"],
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight", "Requests currently being handled.",
+    ["route"], multiprocess_mode="livesum",
+)
+
+DB_QUERIES = Histogram(
+    "db_queries_per_request", "SQL queries run by one request.",
+    ["route"], buckets=(1, 2, 5, 10, 20, 50, 100, 200),
+)
+DB_TIME = Histogram(
+    "db_time_per_request_seconds", "Time one request spent in SQL queries.",
+    ["route"], buckets=LATENCY_BUCKETS,
+)
+DB_N_PLUS_ONE = Counter(
+    "db_n_plus_one_total", "Requests in which an SQL shape repeated past the N+1 threshold.",
+    ["route"],
+)
+
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Reads through apis.caching, by result: local_hit, remote_hit, stale_hit, coalesced or miss.",
+    ["cache", "result"],
+)
+CACHE_FILL = Histogram(
+    "cache_fill_seconds", "Time spent computing a value after a cache miss.",
+    ["cache"], buckets=LATENCY_BUCKETS,
+)
+
+TASK_QUEUE_WAIT = Histogram(
+    "celery_task_queue_wait_seconds", "Time a task waited in the queue before a worker started it.",
+    ["task"], buckets=(0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300, 900),
+)
+TASK_DURATION = Histogram(
+    "celery_task_duration_seconds", "Time a worker spent executing a task.",
+    ["task", "state"], buckets=LATENCY_BUCKETS + (30, 60, 300),
+)
+
+
+def route_name(request) -> str:
+    """Returns the URL name a request resolved to, used as the `route` label."""
+    match = getattr(request, "resolver_match", None)
+    return (match.url_name if match else None) or "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    Records latency, status codes and in-flight requests for every view,
+    labeled by URL name (`route`) so label values stay bounded.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            route = getattr(request, "_metrics_route", None)
+            if route is not None:
+                REQUESTS_IN_FLIGHT.labels(route).dec()
+        route = route or route_name(request)
+        REQUEST_LATENCY.labels(route, request.method).observe(time.perf_counter() - started)
+        REQUESTS.labels(route, request.method, str(response.status_code)).inc()
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._metrics_route = route_name(request)
+        REQUESTS_IN_FLIGHT.labels(request._metrics_route).inc()
+
+
+def metrics_view(request):
+    """
+    Serves all metrics in the Prometheus text format.
+
+    When `PROMETHEUS_MULTIPROC_DIR` is set, every web and Celery worker process
+    writes its samples there and this view merges them, so one scrape sees the
+    whole deployment rather than whichever process answered.
+    """
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return HttpResponse(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
+
+
+@before_task_publish.connect
+def stamp_published_at(headers=None, **kwargs):
+    headers["published_at"] = time.time()
+
+
+@task_prerun.connect
+def record_queue_wait(task=None, **kwargs):
+    task.request._metrics_started = time.perf_counter()
+    published_at = getattr(task.request, "published_at", None)
+    if published_at is None:
+        return
+    # Tasks scheduled with an ETA (e.g. delete_story_after_24_hours) only start waiting once it passes.
+    eta = task.request.eta
+    if eta:
+        if isinstance(eta, str):
+            eta = datetime.fromisoformat(eta)
+        if eta.tzinfo is None:
+            eta = eta.replace(tzinfo=timezone.utc)
+        published_at = max(published_at, eta.timestamp())
+    TASK_QUEUE_WAIT.labels(task.name).observe(max(time.time() - published_at, 0))
+
+
+@task_postrun.connect
+def record_task_duration(task=None, state=None, **kwargs):
+    started = getattr(task.request, "_metrics_started", None)
+    if started is not None:
+        TASK_DURATION.labels(task.name, state or "UNKNOWN").observe(time.perf_counter() - started)
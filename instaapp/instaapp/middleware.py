@@ -0,0 +1,306 @@
+import cProfile
+import io
+import logging
+import pstats
+import random
+import re
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import ExitStack
+from hashlib import md5
+from pathlib import Path
+
+from django.conf import settings
+from django.db import DatabaseError, OperationalError, connections
+from django.http import JsonResponse
+from rest_framework.exceptions import APIException
+
+from apis.authentication import CachedJWTAuthentication
+
+from .metrics import DB_N_PLUS_ONE, DB_QUERIES, DB_TIME, route_name
+
+logger = logging.getLogger(__name__)
+
+# SQLSTATE raised by Postgres when a statement is cancelled by statement_timeout.
+QUERY_CANCELED = "57014"
+
+
+def is_statement_timeout(exception) -> bool:
+    """Returns True if the exception is Postgres cancelling a query that hit statement_timeout."""
+    cause = exception.__cause__
+    code = getattr(cause, "pgcode", None) or getattr(cause, "sqlstate", None)
+    return isinstance(exception, OperationalError) and code == QUERY_CANCELED
+
+
+class _StatementDeadline:
+    """
+    Execute wrapper that applies `statement_timeout` on the first query each
+    connection runs during a request and remembers which connections it touched.
+    """
+
+    def __init__(self):
+        self.timeout = None
+        self.applied = set()
+
+    def __call__(self, execute, sql, params, many, context):
+        connection = context["connection"]
+        if self.timeout and connection.alias not in self.applied:
+            self.applied.add(connection.alias)
+            context["cursor"].cursor.execute("SET statement_timeout = %s", [int(self.timeout)])
+        return execute(sql, params, many, context)
+
+    def for_thread(self) -> "_StatementDeadline":
+        """
+        A deadline with the same timeout for the connections of another thread
+        (see `apis.async_views`), which must reset it there.
+        """
+        deadline = _StatementDeadline()
+        deadline.timeout = self.timeout
+        return deadline
+
+    def reset(self):
+        for alias in self.applied:
+            try:
+                with connections[alias].cursor() as cursor:
+                    cursor.execute("RESET statement_timeout")
+            except DatabaseError:
+                connections[alias].close()
+        self.applied.clear()
+
+
+class StatementTimeoutMiddleware:
+    """
+    Puts a deadline on every SQL statement a request runs on Postgres.
+
+    The deadline is taken from the view's `statement_timeout` class attribute
+    (milliseconds), falling back to `DEFAULT_STATEMENT_TIMEOUT`; `None` or 0
+    disables it. It is applied with `SET statement_timeout` on each connection
+    the request actually uses and reset afterwards, so persistent connections
+    are handed back clean. A statement cancelled by the deadline is turned into
+    a 503 response with a `Retry-After` header instead of a 500.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        deadline = _StatementDeadline()
+        request.statement_deadline = deadline
+        with ExitStack() as stack:
+            for alias in connections:
+                if connections[alias].vendor == "postgresql":
+                    stack.enter_context(connections[alias].execute_wrapper(deadline))
+            response = self.get_response(request)
+        deadline.reset()
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = getattr(view_func, "cls", None) or getattr(view_func, "view_class", None)
+        request.statement_deadline.timeout = getattr(
+            view_class, "statement_timeout", settings.DEFAULT_STATEMENT_TIMEOUT
+        )
+
+    def process_exception(self, request, exception):
+        if not is_statement_timeout(exception):
+            return None
+        return JsonResponse(
+            {"error": "The request took too long. Please try again later."},
+            status=503,
+            headers={"Retry-After": str(settings.STATEMENT_TIMEOUT_RETRY_AFTER)},
+        )
+
+
+_IN_LIST = re.compile(r"\bIN\s*\((?:\s*%s\s*,?)+\)", re.IGNORECASE)
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def fingerprint_sql(sql: str) -> str:
+    """
+    Reduces a SQL statement to its shape: literals become `?` and `IN` lists of
+    any length collapse to `IN (...)`, so the same query run for different rows
+    gets the same fingerprint.
+    """
+    sql = _IN_LIST.sub("IN (...)", sql)
+    sql = _STRING.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    return _WHITESPACE.sub(" ", sql).strip()
+
+
+class _QueryRecorder:
+    """
+    Execute wrapper that times every query and counts queries per SQL shape.
+    Queries of one request may run on several threads, hence the lock.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.time = 0.0
+        self.shapes = Counter()
+        self._lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            shape = fingerprint_sql(sql)
+            with self._lock:
+                self.time += elapsed
+                self.count += 1
+                self.shapes[shape] += 1
+
+    def repeated(self, threshold: int) -> list:
+        """Returns (fingerprint, count) for SQL shapes run more than `threshold` times."""
+        return [(shape, count) for shape, count in self.shapes.most_common() if count > threshold]
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Records how many queries each request runs, how long they take and which
+    SQL shapes repeat.
+
+    A shape that runs more than `SQL_N_PLUS_ONE_THRESHOLD` times in one request
+    is reported as a likely N+1 (a query issued once per row of a list) and
+    logged with the view name. With `DEBUG` on, the numbers are returned in
+    `X-DB-Query-Count`, `X-DB-Time-Ms` and `X-DB-N-Plus-One` response headers.
+    In every mode they are aggregated per route into the `db_*` histograms
+    served by the metrics endpoint.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = _QueryRecorder()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(recorder))
+            response = self.get_response(request)
+
+        route = route_name(request)
+        repeated = recorder.repeated(settings.SQL_N_PLUS_ONE_THRESHOLD)
+        DB_QUERIES.labels(route).observe(recorder.count)
+        DB_TIME.labels(route).observe(recorder.time)
+        if repeated:
+            DB_N_PLUS_ONE.labels(route).inc()
+
+        for shape, count in repeated:
+            logger.warning("Possible N+1 in %s: %d x %s", route, count, shape)
+
+        if settings.DEBUG:
+            response["X-DB-Query-Count"] = str(recorder.count)
+            response["X-DB-Time-Ms"] = f"{recorder.time * 1000:.1f}"
+            if repeated:
+                response["X-DB-N-Plus-One"] = ", ".join(
+                    f"{count}x {md5(shape.encode()).hexdigest()[:8]}" for shape, count in repeated
+                )
+        return response
+
+
+class _SQLLog:
+    """Execute wrapper that keeps every statement a request runs with its duration."""
+
+    def __init__(self):
+        self.entries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.entries.append((time.perf_counter() - started, context["connection"].alias, sql))
+
+
+_authentication = CachedJWTAuthentication()
+
+
+def _is_staff(request) -> bool:
+    """Returns True if the request carries a valid JWT of a staff user."""
+    try:
+        result = _authentication.authenticate(request)
+    except APIException:
+        return False
+    return bool(result and result[0].is_staff)
+
+
+class ProfilingMiddleware:
+    """
+    Captures a cProfile profile and the SQL log of selected requests.
+
+    A request is profiled when it carries an `X-Profile: 1` header or a
+    `_profile=1` query parameter and a JWT of a staff user, or when it is
+    picked by `PROFILING_SAMPLE_RATE` (0 disables sampling). The token is
+    checked before the profiler is turned on (the user comes from the cache
+    of `CachedJWTAuthentication`), so a flagged request from anyone else runs
+    unprofiled. Each profile is written to `PROFILING_DIR` as `<id>.prof`
+    (load with `python -m pstats` or snakeviz) and `<id>.txt` (hottest
+    functions and every SQL statement with timings); staff requests get the id
+    back in `X-Profile-Id`. Only the newest `PROFILING_KEEP` profiles are kept.
+    Requests that are not profiled only pay for a header lookup and, with
+    sampling on, one random number.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        flagged = request.headers.get("X-Profile") == "1" or request.GET.get("_profile") == "1"
+        requested = flagged and _is_staff(request)
+        rate = settings.PROFILING_SAMPLE_RATE
+        if not (requested or (rate and random.random() < rate)):
+            return self.get_response(request)
+
+        profiler = cProfile.Profile()
+        sql_log = _SQLLog()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(sql_log))
+            try:
+                profiler.enable()
+            except ValueError:
+                # Another request on this process is being profiled already.
+                return self.get_response(request)
+            started = time.perf_counter()
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.disable()
+            elapsed = time.perf_counter() - started
+
+        if requested:
+            response["X-Profile-Id"] = self.save(request, response, profiler, sql_log, elapsed)
+        else:
+            self.save(request, response, profiler, sql_log, elapsed)
+        return response
+
+    def save(self, request, response, profiler: cProfile.Profile, sql_log: _SQLLog, elapsed: float) -> str:
+        """Writes the profile and its text report and returns the profile id."""
+        directory = Path(settings.PROFILING_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        profile_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{route_name(request)}-{uuid.uuid4().hex[:8]}"
+        profiler.dump_stats(directory / f"{profile_id}.prof")
+
+        stats_output = io.StringIO()
+        pstats.Stats(profiler, stream=stats_output).sort_stats("cumulative").print_stats(40)
+        sql_time = sum(duration for duration, _, _ in sql_log.entries)
+        lines = [
+            f"{request.method} {request.get_full_path()} -> {response.status_code}",
+            f"user: {getattr(request, 'user', None)}",
+            f"total: {elapsed * 1000:.1f} ms, sql: {len(sql_log.entries)} queries in {sql_time * 1000:.1f} ms",
+            "",
+            stats_output.getvalue(),
+            "SQL:",
+        ]
+        lines += [f"{duration * 1000:8.2f} ms  [{alias}] {sql}" for duration, alias, sql in sql_log.entries]
+        (directory / f"{profile_id}.txt").write_text("\n".join(lines) + "\n")
+
+        reports = sorted(directory.glob("*.prof"), key=lambda path: path.stat().st_mtime)
+        for old in reports[:-settings.PROFILING_KEEP]:
+            old.unlink(missing_ok=True)
+            old.with_suffix(".txt").unlink(missing_ok=True)
+        return profile_id
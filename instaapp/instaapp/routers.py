@@ -0,0 +1,80 @@
+from contextvars import ContextVar
+from hashlib import sha1
+
+from django.conf import settings
+from django.core.cache import cache
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+_read_from_replica = ContextVar("read_from_replica", default=False)
+
+
+def replica_alias():
+    """Returns the configured replica alias, or None when replica routing is off."""
+    alias = getattr(settings, "DATABASE_REPLICA_ALIAS", None)
+    return alias if alias in settings.DATABASES else None
+
+
+class ReplicaRouter:
+    """Database router that sends reads of replica-eligible requests to the replica."""
+
+    def db_for_read(self, model, **hints):
+        alias = replica_alias()
+        if alias and _read_from_replica.get():
+            return alias
+        return "default"
+
+    def db_for_write(self, model, **hints):
+        _read_from_replica.set(False)
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db != getattr(settings, "DATABASE_REPLICA_ALIAS", None)
+
+
+def _pin_key(request) -> str:
+    credentials = (
+        request.META.get("HTTP_AUTHORIZATION")
+        or request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+        or request.META.get("REMOTE_ADDR", "")
+    )
+    return "db:pin:" + sha1(credentials.encode()).hexdigest()
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Read-replica routing for requests.
+
+    Safe-method requests (GET, HEAD, OPTIONS) are marked as replica-eligible and
+    `ReplicaRouter` then sends their reads to the database
+    configured as `DATABASE_REPLICA_ALIAS`. Everything else goes to `default`.
+
+    To preserve read-your-writes, a client that has just written (any unsafe
+    method) is pinned to the primary for `REPLICA_STICKY_SECONDS`, so a follow or
+    like is visible on the very next feed or profile read even if the replica
+    lags. Clients are identified by their credentials (Authorization header,
+    session cookie or, failing both, IP address). A request that writes is also
+    moved to the primary for the rest of its own reads.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not replica_alias():
+            return self.get_response(request)
+
+        key = _pin_key(request)
+        use_replica = request.method in SAFE_METHODS and not cache.get(key)
+        token = _read_from_replica.set(use_replica)
+        try:
+            response = self.get_response(request)
+        finally:
+            _read_from_replica.reset(token)
+
+        if request.method not in SAFE_METHODS:
+            cache.set(key, True, timeout=settings.REPLICA_STICKY_SECONDS)
+        return response
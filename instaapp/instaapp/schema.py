@@ -0,0 +1,127 @@
+import hashlib
+import os
+import subprocess
+from functools import lru_cache
+from pathlib import Path
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_safe
+from rest_framework.permissions import AllowAny
+
+from utils.lazy_schema import openapi, resolve
+
+# drf_yasg (with its inspectors and YAML codecs) is only imported once a spec or
+# a docs page is actually built, so it costs nothing at process start.
+API_INFO = openapi.Info(
+    title="Comment API",
+    default_version='api/v1/',
+    description="Bu API şərhləri idarə etmək üçündür",
+    terms_of_service="https://www.example.com/terms/",
+    contact=openapi.Contact(email="admin@example.com"),
+    license=openapi.License(name="MIT License"),
+)
+
+CODECS = {
+    "json": ("OpenAPICodecJson", "application/json"),
+    "yaml": ("OpenAPICodecYaml", "application/yaml"),
+}
+
+
+@lru_cache(maxsize=None)
+def code_version() -> str:
+    """
+    Identifies the deployed code: `CODE_VERSION` if set, otherwise the git
+    commit, otherwise "unversioned" (e.g. an image built without `.git`).
+    """
+    if settings.CODE_VERSION:
+        return settings.CODE_VERSION
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short=12", "HEAD"], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unversioned"
+
+
+def schema_path(fmt: str, version: str = None) -> Path:
+    return Path(settings.SCHEMA_DIR) / f"openapi-{version or code_version()}.{fmt}"
+
+
+def generate_schema_files(force: bool = False) -> list:
+    """
+    Introspects every view once and writes the spec as JSON and YAML for the
+    current code version, removing files left by other versions.
+
+    Args:
+        force (bool): Regenerate even if the files for this version exist.
+
+    Returns:
+        list: The paths written, empty when the files were up to date.
+    """
+    paths = {fmt: schema_path(fmt) for fmt in CODECS}
+    if not force and all(path.exists() for path in paths.values()):
+        return []
+    from drf_yasg import codecs
+    from utils.schema_generator import LazySchemaGenerator
+
+    schema = LazySchemaGenerator(resolve(API_INFO)).get_schema(request=None, public=True)
+    directory = Path(settings.SCHEMA_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    for fmt, path in paths.items():
+        # Write then rename, so concurrent workers never serve a half-written file.
+        partial = path.with_name(f".{path.name}.{os.getpid()}")
+        partial.write_bytes(getattr(codecs, CODECS[fmt][0])(validators=[]).encode(schema))
+        os.replace(partial, path)
+    for stale in directory.glob("openapi-*.*"):
+        if stale not in paths.values():
+            stale.unlink(missing_ok=True)
+    load_schema.cache_clear()
+    return list(paths.values())
+
+
+@lru_cache(maxsize=None)
+def load_schema(fmt: str, version: str) -> tuple:
+    """
+    Returns the spec of a code version and its ETag, generating the files on
+    the first request when `generate_openapi_schema` did not run at deploy.
+    """
+    path = schema_path(fmt, version)
+    if not path.exists():
+        generate_schema_files()
+    content = path.read_bytes()
+    return content, f'"{hashlib.sha256(content).hexdigest()[:32]}"'
+
+
+def schema_file_view(fmt: str):
+    """
+    Builds a view serving the pre-generated spec in `fmt` from memory, with an
+    ETag (answered with 304 when unchanged) and a public `Cache-Control`.
+    """
+    @cache_control(public=True, max_age=settings.SCHEMA_CACHE_MAX_AGE)
+    @require_safe
+    @condition(etag_func=lambda request: load_schema(fmt, code_version())[1])
+    def view(request):
+        content, _ = load_schema(fmt, code_version())
+        return HttpResponse(content, content_type=CODECS[fmt][1])
+    return view
+
+
+@lru_cache(maxsize=None)
+def _ui_view(renderer: str):
+    from drf_yasg.views import get_schema_view
+
+    schema_view = get_schema_view(resolve(API_INFO), public=True, permission_classes=[AllowAny])
+    return schema_view.with_ui(renderer, cache_timeout=settings.SCHEMA_CACHE_MAX_AGE)
+
+
+def schema_ui_view(renderer: str):
+    """
+    The drf_yasg `swagger` or `redoc` page, built on its first request. The
+    page loads the spec from `schema_file_view` (`SPEC_URL` setting).
+    """
+    def view(request, *args, **kwargs):
+        return _ui_view(renderer)(request, *args, **kwargs)
+    return view
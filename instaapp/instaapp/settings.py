@@ -13,6 +13,7 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 from pathlib import Path
 from datetime import timedelta
 import os
+from celery.schedules import crontab
 from dotenv import load_dotenv
 
 
@@ -50,13 +51,20 @@ INSTALLED_APPS = [
     'comments',
     'apis',
     'hashtags',
+    'mailing',
+    'uploads',
     
 ]
 
 MIDDLEWARE = [
+    'instaapp.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'instaapp.middleware.QueryInstrumentationMiddleware',
+    'instaapp.middleware.ProfilingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
+    'instaapp.routers.ReplicaRoutingMiddleware',
+    'instaapp.middleware.StatementTimeoutMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
@@ -95,9 +103,73 @@ DATABASES = {
         'PASSWORD': os.getenv('DATABASE_PASSWORD'),
         'HOST': os.getenv('DATABASE_HOST'),
         'PORT': os.getenv('DATABASE_PORT'),
+        # Keep connections open between requests and check them before reuse.
+        'CONN_MAX_AGE': int(os.getenv('DATABASE_CONN_MAX_AGE', 60)),
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
+if os.getenv('DATABASE_REPLICA_HOST'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'HOST': os.getenv('DATABASE_REPLICA_HOST'),
+        'PORT': os.getenv('DATABASE_REPLICA_PORT', DATABASES['default']['PORT']),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+# Safe-method requests read from this alias when it is configured, see instaapp.routers
+DATABASE_REPLICA_ALIAS = 'replica'
+DATABASE_ROUTERS = ['instaapp.routers.ReplicaRouter']
+REPLICA_STICKY_SECONDS = int(os.getenv('REPLICA_STICKY_SECONDS', 5))
+
+# Redis shared by all processes, with a bounded in-process LRU ("local") in front
+# of it, see apis.caching. Tests use local memory instead of Redis (instaapp.settings_test).
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.getenv('CACHE_REDIS_URL', 'redis://localhost:6379/1'),
+        'KEY_PREFIX': 'instaapp',
+    },
+    'local': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'instaapp-local',
+        'OPTIONS': {'MAX_ENTRIES': int(os.getenv('LOCAL_CACHE_MAX_ENTRIES', 10000)), 'CULL_FREQUENCY': 10},
+    },
+}
+# Longest a value stays in the local tier without checking Redis
+LOCAL_CACHE_TIMEOUT = int(os.getenv('LOCAL_CACHE_TIMEOUT', 30))
+# Share of a timeout randomly cut off, so entries filled together expire apart
+CACHE_TTL_JITTER = float(os.getenv('CACHE_TTL_JITTER', 0.1))
+# Seconds one request may hold the lock for filling an entry while others wait for it
+CACHE_LOCK_TIMEOUT = int(os.getenv('CACHE_LOCK_TIMEOUT', 5))
+
+# Per-request SQL deadline in milliseconds; views override it with a
+# `statement_timeout` class attribute, see instaapp.middleware
+DEFAULT_STATEMENT_TIMEOUT = int(os.getenv('DEFAULT_STATEMENT_TIMEOUT', 5000))
+STATEMENT_TIMEOUT_RETRY_AFTER = int(os.getenv('STATEMENT_TIMEOUT_RETRY_AFTER', 5))
+
+# Same SQL shape repeated more than this many times in one request is reported as N+1
+SQL_N_PLUS_ONE_THRESHOLD = int(os.getenv('SQL_N_PLUS_ONE_THRESHOLD', 5))
+
+# Request profiling: staff send `X-Profile: 1` (or `?_profile=1`); a share of all
+# requests can also be sampled. See instaapp.middleware.ProfilingMiddleware
+PROFILING_SAMPLE_RATE = float(os.getenv('PROFILING_SAMPLE_RATE', 0))
+PROFILING_DIR = os.getenv('PROFILING_DIR', BASE_DIR / 'request_profiles')
+PROFILING_KEEP = int(os.getenv('PROFILING_KEEP', 200))
+
+# OpenAPI spec generated once per code version (`generate_openapi_schema`), see instaapp.schema.
+# CODE_VERSION defaults to the git commit.
+CODE_VERSION = os.getenv('CODE_VERSION')
+SCHEMA_DIR = os.getenv('SCHEMA_DIR', BASE_DIR / 'openapi')
+SCHEMA_CACHE_MAX_AGE = int(os.getenv('SCHEMA_CACHE_MAX_AGE', 3600))
+# The UIs load the cached spec instead of asking their own view to generate it
+SWAGGER_SETTINGS = {
+    'SPEC_URL': 'schema-json',
+    # Applies the swagger_auto_schema overrides deferred by utils.lazy_schema
+    'DEFAULT_GENERATOR_CLASS': 'utils.schema_generator.LazySchemaGenerator',
+}
+REDOC_SETTINGS = {'SPEC_URL': 'schema-json'}
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -142,10 +214,31 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'apis.authentication.CachedJWTAuthentication',
+    ),
+    # orjson for JSON, MessagePack for clients sending `Accept: application/msgpack`, see apis.renderers
+    'DEFAULT_RENDERER_CLASSES': (
+        'apis.renderers.ORJSONRenderer',
+        'apis.renderers.MessagePackRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'rest_framework.parsers.JSONParser',
+        'apis.renderers.MessagePackParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ),
 }
 
+# Seconds an authenticated user (with profile) stays cached, see apis.authentication
+AUTH_USER_CACHE_TIMEOUT = int(os.getenv('AUTH_USER_CACHE_TIMEOUT', 60))
+
+# Seconds a username stays mapped to its profile id, see apis.profile_resolver
+USERNAME_CACHE_TIMEOUT = int(os.getenv('USERNAME_CACHE_TIMEOUT', 3600))
+
+# Seconds the list of followed profiles behind the feed's ETag stays cached, see apis.posts_controls
+FEED_AUTHORS_CACHE_TIMEOUT = int(os.getenv('FEED_AUTHORS_CACHE_TIMEOUT', 3600))
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=365), 
     'REFRESH_TOKEN_LIFETIME': timedelta(days=365), 
@@ -154,8 +247,15 @@ SIMPLE_JWT = {
     'ALGORITHM': 'HS256',
     'SIGNING_KEY': SECRET_KEY, 
     'AUTH_HEADER_TYPES': ('Bearer',),
+    'TOKEN_REFRESH_SERIALIZER': 'apis.tokens.BloomTokenRefreshSerializer',
 }
 
+# Bloom filter in front of the refresh token blacklist, see apis.tokens
+TOKEN_BLACKLIST_BLOOM_CAPACITY = int(os.getenv('TOKEN_BLACKLIST_BLOOM_CAPACITY', 100000))
+TOKEN_BLACKLIST_BLOOM_ERROR_RATE = float(os.getenv('TOKEN_BLACKLIST_BLOOM_ERROR_RATE', 0.001))
+TOKEN_BLACKLIST_SYNC_INTERVAL = int(os.getenv('TOKEN_BLACKLIST_SYNC_INTERVAL', 5))
+TOKEN_PRUNE_BATCH_SIZE = int(os.getenv('TOKEN_PRUNE_BATCH_SIZE', 1000))
+
 
 # instaapp/settings.py
 CELERY_BROKER_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
@@ -165,6 +265,70 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = 'UTC'
 CELERY_BROKER_CONNECTION_RETRY_ON_STARTUP = True
+CELERY_BEAT_SCHEDULE = {
+    'compute-follow-suggestions': {
+        'task': 'profiles.tasks.compute_follow_suggestions',
+        'schedule': crontab(hour=3, minute=0),
+    },
+    'send-pending-emails': {
+        'task': 'mailing.tasks.send_pending_emails',
+        'schedule': timedelta(minutes=1),
+    },
+    'prune-expired-tokens': {
+        'task': 'apis.tasks.prune_expired_tokens',
+        'schedule': crontab(hour=4, minute=0),
+    },
+    'generate-missing-image-derivatives': {
+        'task': 'posts.tasks.generate_missing_image_derivatives',
+        'schedule': timedelta(minutes=10),
+    },
+    'sweep-uploads': {
+        'task': 'uploads.tasks.sweep_uploads',
+        'schedule': timedelta(minutes=15),
+    },
+}
+
+# Chunked uploads, see uploads.models.Upload: bytes per chunk, largest file accepted,
+# hours before an unfinished or unattached upload is deleted, and minutes after which
+# an assembly that never finished (e.g. the broker was down) is started again
+UPLOAD_CHUNK_SIZE = int(os.getenv('UPLOAD_CHUNK_SIZE', 5 * 1024 * 1024))
+UPLOAD_MAX_SIZE = int(os.getenv('UPLOAD_MAX_SIZE', 2 * 1024 ** 3))
+UPLOAD_EXPIRY_HOURS = int(os.getenv('UPLOAD_EXPIRY_HOURS', 24))
+UPLOAD_ASSEMBLY_TIMEOUT_MINUTES = int(os.getenv('UPLOAD_ASSEMBLY_TIMEOUT_MINUTES', 60))
+
+# Resized copies of uploaded images, see utils.images: width in pixels per size,
+# encoded as IMAGE_DERIVATIVE_FORMAT ('WEBP' or 'JPEG') with IMAGE_DERIVATIVE_QUALITY
+IMAGE_DERIVATIVE_WIDTHS = {
+    'thumbnail': int(os.getenv('IMAGE_THUMBNAIL_WIDTH', 320)),
+    'feed': int(os.getenv('IMAGE_FEED_WIDTH', 1080)),
+    'full': int(os.getenv('IMAGE_FULL_WIDTH', 2048)),
+}
+IMAGE_DERIVATIVE_FORMAT = os.getenv('IMAGE_DERIVATIVE_FORMAT', 'WEBP')
+IMAGE_DERIVATIVE_QUALITY = int(os.getenv('IMAGE_DERIVATIVE_QUALITY', 80))
+IMAGE_DERIVATIVE_BATCH_SIZE = int(os.getenv('IMAGE_DERIVATIVE_BATCH_SIZE', 100))
+# Sides in pixels of the square avatars cropped from profile pictures
+AVATAR_SIZES = [int(size) for size in os.getenv('AVATAR_SIZES', '40,80,160').split(',')]
+
+# Post detail cache, see apis.post_cache: entries are fresh for POST_CACHE_TIMEOUT seconds,
+# then served stale for up to POST_CACHE_STALE_GRACE seconds while one request rebuilds them
+POST_CACHE_TIMEOUT = int(os.getenv('POST_CACHE_TIMEOUT', 300))
+POST_CACHE_STALE_GRACE = int(os.getenv('POST_CACHE_STALE_GRACE', 60))
+
+# Async views run their independent queries at the same time on a pool of this many
+# threads, each with its own database connection (so up to this many extra connections
+# per process); 0 runs them one after another on the request's connection, see apis.async_views
+ASYNC_VIEW_QUERY_THREADS = int(os.getenv('ASYNC_VIEW_QUERY_THREADS', 8))
+
+# Seconds each part of the home screen endpoint stays cached per user, see apis.async_views
+HOME_CACHE_TIMEOUTS = {
+    'feed': int(os.getenv('HOME_FEED_CACHE_TIMEOUT', 30)),
+    'stories': int(os.getenv('HOME_STORIES_CACHE_TIMEOUT', 30)),
+    'profile': int(os.getenv('HOME_PROFILE_CACHE_TIMEOUT', 60)),
+    'unread': int(os.getenv('HOME_UNREAD_CACHE_TIMEOUT', 15)),
+}
+
+#follow suggestions
+FOLLOW_SUGGESTIONS_LIMIT = int(os.getenv('FOLLOW_SUGGESTIONS_LIMIT', 20))
 
 #send mail
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
@@ -173,5 +337,7 @@ EMAIL_PORT = int(os.getenv('EMAIL_PORT', 587))
 EMAIL_USE_TLS = os.getenv('EMAIL_USE_TLS', 'True') == 'True'
 EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER')
 EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD')
+EMAIL_OUTBOX_BATCH_SIZE = int(os.getenv('EMAIL_OUTBOX_BATCH_SIZE', 50))
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.getenv('EMAIL_OUTBOX_MAX_ATTEMPTS', 5))
 
 
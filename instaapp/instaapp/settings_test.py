@@ -0,0 +1,35 @@
+"""
+Settings for the test suite: the project settings with SQLite and local-memory
+caches instead of Postgres and Redis, so the tests need no services.
+
+`manage.py test` uses this module unless DJANGO_SETTINGS_MODULE or --settings
+says otherwise.
+"""
+
+from .settings import *  # noqa: F401,F403
+from .settings import BASE_DIR, CACHES
+
+# Two SQLite databases act as primary and replica; replica routing is
+# switched on per test with override_settings(DATABASE_REPLICA_ALIAS='replica').
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'primary.sqlite3',
+    },
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'replica.sqlite3',
+        'TEST': {'MIRROR': 'default'},
+    },
+}
+DATABASE_REPLICA_ALIAS = None
+
+CACHES = {
+    **CACHES,
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'instaapp-test'},
+}
+
+# A TestCase's data lives in an uncommitted transaction on the test thread's
+# connection, so async views query on that connection, one query at a time.
+# Tests of the concurrent path use TransactionTestCase and override this.
+ASYNC_VIEW_QUERY_THREADS = 0
@@ -1,34 +1,22 @@
 from django.contrib import admin
 from django.urls import path, include
-from drf_yasg.views import get_schema_view
-from drf_yasg import openapi
-from rest_framework.permissions import AllowAny
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
+from .metrics import metrics_view
+from .schema import schema_file_view, schema_ui_view
 
-schema_view = get_schema_view(
-    openapi.Info(
-        title="Comment API",
-        default_version='api/v1/',
-        description="Bu API şərhləri idarə etmək üçündür",
-        terms_of_service="https://www.example.com/terms/",
-        contact=openapi.Contact(email="admin@example.com"),
-        license=openapi.License(name="MIT License"),
-    ),
-    public=True, 
-    permission_classes=[AllowAny],  
-)
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('metrics', metrics_view, name='metrics'),
     path('api/v1/', include("apis.urls")), 
     
     path('api/token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     
-    path('swagger/', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
-    path('redoc/', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
-    path('swagger.json', schema_view.without_ui(cache_timeout=0), name='schema-json'),
-    path('swagger.yaml', schema_view.without_ui(cache_timeout=0), name='schema-yaml'),
+    path('swagger/', schema_ui_view('swagger'), name='schema-swagger-ui'),
+    path('redoc/', schema_ui_view('redoc'), name='schema-redoc'),
+    path('swagger.json', schema_file_view('json'), name='schema-json'),
+    path('swagger.yaml', schema_file_view('yaml'), name='schema-yaml'),
 ]
 
@@ -1,4 +1,6 @@
 from rest_framework import serializers
+from django.db.models import QuerySet
+from profiles.serializers import ProfileReferenceSerializer
 from .models import Like
 
 class LikeSerializer(serializers.ModelSerializer):
@@ -6,7 +8,7 @@ class LikeSerializer(serializers.ModelSerializer):
     Serializer for the Like model, converting Like instances to and from JSON format.
 
     **Fields:**
-    - `profile`: The user profile who liked the content (represented as a string).
+    - `profile`: A compact reference (id, username, avatar) to the profile who liked the content.
     - `post_title`: The title of the liked post (only available if the like is related to a post).
     - `post_content`: The content of the liked post (only available if the like is related to a post).
     - `comment_id`: The ID of the liked comment (only available if the like is related to a comment).
@@ -17,7 +19,7 @@ class LikeSerializer(serializers.ModelSerializer):
     - Serializes data from the Like model for API responses.
     - Deserializes incoming data for creating or updating like instances.
     """
-    profile = serializers.StringRelatedField()  
+    profile = ProfileReferenceSerializer(read_only=True)
     post_title = serializers.CharField(source="post.title", read_only=True)
     post_content = serializers.CharField(source="post.content", read_only=True) 
     comment_id = serializers.IntegerField(source="comment.id", read_only=True)  
@@ -36,3 +38,8 @@ class LikeSerializer(serializers.ModelSerializer):
         ]
         
         read_only_fields = ["created_at"] 
+
+    @staticmethod
+    def setup_eager_loading(queryset: QuerySet) -> QuerySet:
+        """Joins the liking user and the liked post or comment into the same query."""
+        return queryset.select_related("profile__user", "post", "comment")
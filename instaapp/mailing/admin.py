@@ -0,0 +1,5 @@
+from django.contrib import admin
+from .models import EmailOutbox
+# Register your models here.
+
+admin.site.register(EmailOutbox)
\ No newline at end of file
@@ -0,0 +1,97 @@
+from datetime import timedelta
+
+from django.core.mail import EmailMessage
+from django.db import models
+from django.utils.timezone import now
+
+
+class EmailOutbox(models.Model):
+    """
+    Model representing a transactional email waiting to be delivered.
+
+    Emails are written here on the request path and delivered in batches by the
+    `send_pending_emails` Celery task over a single SMTP connection. Failed
+    deliveries are retried with exponential backoff.
+
+    **Fields:**
+    - `subject`: The email subject.
+    - `body`: The plain-text email body.
+    - `from_email`: The sender address (falls back to `DEFAULT_FROM_EMAIL` when empty).
+    - `recipients`: List of recipient addresses.
+    - `status`: Delivery state (pending, sending, sent or failed).
+    - `attempts`: Number of delivery attempts made so far.
+    - `last_error`: The error message of the last failed attempt.
+    - `next_attempt_at`: Earliest time a worker may pick the email up. While an email is
+      being sent this is the end of the worker's lease, so emails left behind by a crashed
+      worker are picked up again.
+    - `created_at`: Timestamp when the email was queued.
+    - `sent_at`: Timestamp when the email was delivered.
+
+    **Methods:**
+    - `to_message()`: Builds the `EmailMessage` to hand to a mail backend.
+    - `mark_sent()`: Records a successful delivery.
+    - `mark_failed()`: Records a failed attempt and schedules a retry or gives up.
+    """
+    PENDING = "pending"
+    SENDING = "sending"
+    SENT = "sent"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (PENDING, "Pending"),
+        (SENDING, "Sending"),
+        (SENT, "Sent"),
+        (FAILED, "Failed"),
+    ]
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=254, blank=True)
+    recipients = models.JSONField(default=list)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    next_attempt_at = models.DateTimeField(default=now)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "next_attempt_at"])]
+
+    def __str__(self) -> str:
+        return f"{self.subject} -> {', '.join(self.recipients)} ({self.status})"
+
+    def to_message(self, connection=None) -> EmailMessage:
+        """
+        Returns an `EmailMessage` for this email bound to the given backend connection.
+        """
+        return EmailMessage(
+            subject=self.subject,
+            body=self.body,
+            from_email=self.from_email or None,
+            to=self.recipients,
+            connection=connection,
+        )
+
+    def mark_sent(self):
+        """Marks the email as delivered."""
+        self.status = self.SENT
+        self.attempts += 1
+        self.sent_at = now()
+        self.last_error = ""
+        self.save(update_fields=["status", "attempts", "sent_at", "last_error"])
+
+    def mark_failed(self, error: str, max_attempts: int):
+        """
+        Records a failed delivery attempt.
+
+        The email goes back to the queue with exponential backoff (30s, 60s, 120s, ...)
+        until `max_attempts` is reached, after which it is marked as failed for good.
+        """
+        self.attempts += 1
+        self.last_error = error
+        if self.attempts >= max_attempts:
+            self.status = self.FAILED
+        else:
+            self.status = self.PENDING
+            self.next_attempt_at = now() + timedelta(seconds=30 * 2 ** (self.attempts - 1))
+        self.save(update_fields=["status", "attempts", "last_error", "next_attempt_at"])
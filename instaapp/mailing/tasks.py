@@ -0,0 +1,100 @@
+import logging
+from datetime import timedelta
+
+from celery import shared_task
+from django.conf import settings
+from django.core.mail import get_connection
+from django.db import transaction
+from django.utils.timezone import now
+
+from mailing.models import EmailOutbox
+
+logger = logging.getLogger(__name__)
+
+SEND_LEASE = timedelta(minutes=10)
+
+
+def claim_pending_emails(batch_size: int) -> list:
+    """
+    Claims up to `batch_size` due emails for the calling worker.
+
+    Rows are locked with `SKIP LOCKED`, so concurrent workers never claim the
+    same email. Claimed emails are moved to `sending` with a lease; if the worker
+    dies before finishing, the lease expires and the email becomes due again.
+    """
+    current_time = now()
+    with transaction.atomic():
+        ids = list(
+            EmailOutbox.objects.select_for_update(skip_locked=True)
+            .filter(status__in=[EmailOutbox.PENDING, EmailOutbox.SENDING], next_attempt_at__lte=current_time)
+            .order_by("next_attempt_at", "id")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        EmailOutbox.objects.filter(id__in=ids).update(
+            status=EmailOutbox.SENDING, next_attempt_at=current_time + SEND_LEASE
+        )
+    return list(EmailOutbox.objects.filter(id__in=ids).order_by("id"))
+
+
+def release_emails(emails: list):
+    """Puts claimed but unsent emails straight back into the queue."""
+    EmailOutbox.objects.filter(
+        id__in=[email.id for email in emails], status=EmailOutbox.SENDING
+    ).update(status=EmailOutbox.PENDING, next_attempt_at=now())
+
+
+@shared_task(bind=True, max_retries=5)
+def send_pending_emails(self, batch_size: int = None) -> int:
+    """
+    A Celery task that delivers queued emails from the outbox.
+
+    Emails are claimed in batches and all of them are sent over one SMTP
+    connection, which is opened once per run instead of once per email. The task
+    keeps draining batches until the outbox has nothing due. If the mail server
+    cannot be reached, the claimed emails are released and the task retries
+    itself with backoff; individual delivery failures are retried per email
+    (see `EmailOutbox.mark_failed`).
+
+    Returns:
+        int: The number of emails delivered.
+    """
+    batch_size = batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE
+    max_attempts = settings.EMAIL_OUTBOX_MAX_ATTEMPTS
+    connection = get_connection(fail_silently=False)
+    delivered = 0
+    opened = False
+
+    try:
+        while True:
+            emails = claim_pending_emails(batch_size)
+            if not emails:
+                break
+
+            for position, email in enumerate(emails):
+                try:
+                    if not opened:
+                        connection.open()
+                        opened = True
+                except Exception as exc:
+                    release_emails(emails[position:])
+                    logger.warning("Could not connect to the mail server: %s", exc)
+                    raise self.retry(exc=exc, countdown=30 * 2 ** self.request.retries)
+
+                try:
+                    connection.send_messages([email.to_message(connection)])
+                except Exception as exc:
+                    logger.warning("Sending email %s failed: %s", email.id, exc)
+                    email.mark_failed(str(exc), max_attempts)
+                    connection.close()
+                    opened = False
+                else:
+                    email.mark_sent()
+                    delivered += 1
+
+            if len(emails) < batch_size:
+                break
+    finally:
+        if opened:
+            connection.close()
+
+    return delivered
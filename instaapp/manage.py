@@ -6,7 +6,9 @@ import sys
 
 def main():
     """Run administrative tasks."""
-    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'instaapp.settings')
+    # The test suite runs on SQLite and local-memory caches, see instaapp/settings_test.py.
+    default_settings = 'instaapp.settings_test' if sys.argv[1:2] == ['test'] else 'instaapp.settings'
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', default_settings)
     try:
         from django.core.management import execute_from_command_line
     except ImportError as exc:
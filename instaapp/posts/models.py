@@ -17,6 +17,7 @@ class Post(models.Model):
     - `title`: The title of the post (defaults to 'Untitled Post').
     - `content`: The content or body of the post (defaults to 'No content provided').
     - `image`: Optional image attached to the post.
+    - `image_variants`: Resized copies of `image`, filled by the `generate_image_derivatives` task.
     - `video`: Optional video attached to the post.
     - `hashtags`: List of hashtags associated with the post (ManyToMany relationship with HashTag).
     - `created_at`: Timestamp when the post was created.
@@ -31,6 +32,7 @@ class Post(models.Model):
     title = models.CharField(max_length=255, default='Untitled Post')    
     content = models.TextField(default='No content provided')  
     image = models.ImageField(upload_to="media/", null=True, blank=True)
+    image_variants = models.JSONField(default=dict, blank=True)
     video = models.FileField(upload_to="media/", null=True, blank=True)
     hashtags = models.ManyToManyField(HashTag, related_name="post_hashtag", blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -69,6 +71,7 @@ class Story(models.Model):
     - `caption`: The caption for the story (optional).
     - `created_at`: Timestamp when the story was created.
     - `image`: Optional image attached to the story.
+    - `image_variants`: Resized copies of `image`, filled by the `generate_image_derivatives` task.
     - `video`: Optional video attached to the story.
 
     **Methods:**
@@ -79,6 +82,7 @@ class Story(models.Model):
     caption = models.CharField(max_length=2200, null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     image = models.ImageField(upload_to="media/", null=True, blank=True)
+    image_variants = models.JSONField(default=dict, blank=True)
     video = models.FileField(upload_to="media/", null=True, blank=True)
 
     def __str__(self) -> str:
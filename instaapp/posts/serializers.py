@@ -1,8 +1,15 @@
+from contextlib import nullcontext
+
 from rest_framework import serializers
+from django.db import transaction
+from django.db.models import Count, Exists, OuterRef, QuerySet
 from .models import Post, Story
 from profiles.models import Profile
 from likes.models import Like
 from hashtags.models import HashTag
+from uploads.models import Upload
+from utils.images import ImageVariantField
+from utils.sparse_fields import SparseFieldsetsMixin
 
 def add_hashtags_to_post(post, hashtags_data):
     """
@@ -23,17 +30,21 @@ def add_hashtags_to_post(post, hashtags_data):
                 post.hashtags.add(hashtag)
                 
 
-class PostSerializer(serializers.ModelSerializer):
+class PostSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     """
     Serializer for Post model, used to serialize a Post instance.
 
     This serializer handles the inclusion of hashtags as a string and includes the 
-    like count and hashtag list as additional fields.
+    like count and hashtag list as additional fields. Clients can limit the
+    fields with `?fields=` or `?exclude=` (see `SparseFieldsetsMixin`).
     """
     hashtags = serializers.CharField(write_only=True, required=False)
     profile = serializers.PrimaryKeyRelatedField(queryset=Profile.objects.all())
     likes_count = serializers.SerializerMethodField()
     hashtag_list = serializers.SerializerMethodField(read_only=True)
+    display_image = ImageVariantField("image", "image_variants", "feed")
+    # Added by the post detail view, see apis.post_cache
+    extra_fields = ("comments_count", "is_liked", "follows_author")
 
     class Meta:
         model = Post
@@ -43,6 +54,7 @@ class PostSerializer(serializers.ModelSerializer):
             "title",
             "content",
             "image",
+            "display_image",
             "video",
             "hashtags",
             "hashtag_list",
@@ -50,6 +62,28 @@ class PostSerializer(serializers.ModelSerializer):
             "updated_at",
             "likes_count"
             ]
+
+    @staticmethod
+    def setup_eager_loading(queryset: QuerySet, request=None) -> QuerySet:
+        """
+        Loads everything the serializer reads in a constant number of queries:
+        the like count is annotated and hashtags are prefetched in one query.
+        Both are skipped, and unused columns deferred, when the request asks
+        for a sparse fieldset without them.
+
+        Args:
+            queryset (QuerySet): A queryset of posts.
+            request (HttpRequest): The current request, if any.
+
+        Returns:
+            QuerySet: The queryset with annotations and prefetches applied.
+        """
+        fields = PostSerializer.requested_fields(request)
+        if fields is None or "likes_count" in fields:
+            queryset = queryset.annotate(likes_total=Count("likes"))
+        if fields is None or "hashtag_list" in fields:
+            queryset = queryset.prefetch_related("hashtags")
+        return PostSerializer.sparse_queryset(queryset, fields)
         
     def get_likes_count(self, obj) -> int:
         """
@@ -61,6 +95,8 @@ class PostSerializer(serializers.ModelSerializer):
         Returns:
             int: The number of likes for the post.
         """
+        if hasattr(obj, "likes_total"):
+            return obj.likes_total
         return obj.get_likes_count()
     
     def get_hashtag_list(self, obj) -> list:
@@ -91,12 +127,55 @@ class PostSerializer(serializers.ModelSerializer):
         return post
 
 
-class PostCreateSerializer(serializers.ModelSerializer):
+class VideoUploadMixin(serializers.Serializer):
+    """
+    Adds a write-only `video_upload` field to a post or story serializer: the
+    ID of one of the user's complete chunked uploads (see `uploads.models.Upload`),
+    used as the video instead of a file sent with the request.
+
+    The upload's file passes to the post or story and the upload itself is
+    deleted, so it can be attached only once.
+    """
+    video_upload = serializers.PrimaryKeyRelatedField(
+        queryset=Upload.objects.filter(status=Upload.COMPLETE), write_only=True, required=False
+    )
+
+    def validate_video_upload(self, upload):
+        if upload.profile_id != self.context["request"].user.profile.id:
+            raise serializers.ValidationError("Upload not found.")
+        return upload
+
+    def validate(self, data):
+        if data.get("video") and data.get("video_upload"):
+            raise serializers.ValidationError("Send either a video or a video upload, not both.")
+        return super().validate(data)
+
+    def attaching(self, validated_data: dict):
+        """A transaction to save in when an upload is attached, so it is only used up if the save succeeds."""
+        return transaction.atomic() if validated_data.get("video_upload") else nullcontext()
+
+    def attach_video_upload(self, validated_data: dict):
+        """Replaces `video_upload` in `validated_data` with its file; call within `attaching`."""
+        upload = validated_data.pop("video_upload", None)
+        if upload is None:
+            return
+        if not Upload.objects.filter(pk=upload.pk, status=Upload.COMPLETE).delete()[0]:
+            raise serializers.ValidationError({"video_upload": "The upload was already attached."})
+        validated_data["video"] = upload.file.name
+
+    def update(self, instance, validated_data):
+        with self.attaching(validated_data):
+            self.attach_video_upload(validated_data)
+            return super().update(instance, validated_data)
+
+
+class PostCreateSerializer(VideoUploadMixin, serializers.ModelSerializer):
     """
     Serializer for creating a new Post instance.
 
     This serializer handles post creation without retrieving the `likes_count` or `hashtag_list`.
-    It also processes hashtags and assigns them to the post during creation.
+    It also processes hashtags and assigns them to the post during creation, and
+    takes the video from a chunked upload when `video_upload` is given.
     """
     hashtags = serializers.CharField(write_only=True, required=False)
 
@@ -107,6 +186,7 @@ class PostCreateSerializer(serializers.ModelSerializer):
             "content",
             "image",
             "video",
+            "video_upload",
             "hashtags"
             ]
         
@@ -122,26 +202,53 @@ class PostCreateSerializer(serializers.ModelSerializer):
         """
         user = self.context["request"].user
         hashtags_data = validated_data.pop("hashtags", None) 
-        post = Post.objects.create(profile=user.profile, **validated_data)
+        with self.attaching(validated_data):
+            self.attach_video_upload(validated_data)
+            post = Post.objects.create(profile=user.profile, **validated_data)
         if hashtags_data:  
             add_hashtags_to_post(post, hashtags_data)
         return post
     
 
-class StorySerializer(serializers.ModelSerializer):
+class StorySerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     """
     Serializer for the Story model, used to serialize a Story instance.
 
     This serializer includes fields like `likes_count` and `is_liked` to indicate
-    whether the current user has liked the story.
+    whether the current user has liked the story. Clients can limit the
+    fields with `?fields=` or `?exclude=` (see `SparseFieldsetsMixin`).
     """
     user = serializers.PrimaryKeyRelatedField(queryset=Profile.objects.all())
     likes_count = serializers.SerializerMethodField()
     is_liked = serializers.SerializerMethodField()
+    display_image = ImageVariantField("image", "image_variants", "full")
 
     class Meta:
         model = Story
-        fields = "__all__"
+        exclude = ["image_variants"]
+
+    @staticmethod
+    def setup_eager_loading(queryset: QuerySet, request=None) -> QuerySet:
+        """
+        Annotates the like count and, for an authenticated request, whether the
+        current user liked each story, so neither needs a query per story.
+        Annotations and columns outside a requested sparse fieldset are skipped.
+
+        Args:
+            queryset (QuerySet): A queryset of stories.
+            request (HttpRequest): The current request, if any.
+
+        Returns:
+            QuerySet: The annotated queryset.
+        """
+        fields = StorySerializer.requested_fields(request)
+        if fields is None or "likes_count" in fields:
+            queryset = queryset.annotate(likes_total=Count("story_likes"))
+        if request and request.user.is_authenticated and (fields is None or "is_liked" in fields):
+            queryset = queryset.annotate(liked_by_viewer=Exists(
+                Like.objects.filter(story=OuterRef("pk"), profile__user=request.user)
+            ))
+        return StorySerializer.sparse_queryset(queryset, fields)
         
     def get_likes_count(self, obj) -> int:
         """
@@ -153,6 +260,8 @@ class StorySerializer(serializers.ModelSerializer):
         Returns:
             int: The number of likes for the story.
         """
+        if hasattr(obj, "likes_total"):
+            return obj.likes_total
         return Like.objects.filter(story=obj).count()
     
     def get_is_liked(self, obj) -> bool:
@@ -165,23 +274,26 @@ class StorySerializer(serializers.ModelSerializer):
         Returns:
             bool: True if the current user has liked the story, False otherwise.
         """
+        if hasattr(obj, "liked_by_viewer"):
+            return obj.liked_by_viewer
         request = self.context.get("request")
         if request and request.user.is_authenticated:
             profile = request.user.profile
             return Like.objects.filter(story=obj, profile=profile).exists()
         return False
 
-class StoryCreateSerializer(serializers.ModelSerializer):
+class StoryCreateSerializer(VideoUploadMixin, serializers.ModelSerializer):
     """
     Serializer for creating a new Story instance.
 
-    This serializer allows creating a story with either an image or a video.
+    This serializer allows creating a story with either an image or a video
+    (sent with the request or as a chunked `video_upload`).
     It also validates that both an image and video cannot be included in the same story.
     """
     
     class Meta:
         model = Story
-        fields = ["caption", "image", "video"] 
+        fields = ["caption", "image", "video", "video_upload"] 
 
     def create(self, validated_data):
         """
@@ -194,7 +306,9 @@ class StoryCreateSerializer(serializers.ModelSerializer):
             Story: The created Story instance.
         """
         user = self.context["request"].user.profile
-        story = Story.objects.create(user=user, **validated_data)
+        with self.attaching(validated_data):
+            self.attach_video_upload(validated_data)
+            story = Story.objects.create(user=user, **validated_data)
         story.delete_after_24_hours()
         return story
     
@@ -211,6 +325,6 @@ class StoryCreateSerializer(serializers.ModelSerializer):
         Returns:
             dict: The validated data.
         """
-        if data.get("image") and data.get("video"):
+        if data.get("image") and (data.get("video") or data.get("video_upload")):
             raise serializers.ValidationError("Both an image and a video cannot be added.")
-        return data
\ No newline at end of file
+        return super().validate(data)
\ No newline at end of file
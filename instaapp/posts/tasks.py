@@ -1,5 +1,27 @@
+import logging
+
 from celery import shared_task
+from django.apps import apps
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.db.models.fields.json import KT
+from PIL import Image
+
 from posts.models import Story
+from utils.images import build_derivatives, delete_derivatives
+
+logger = logging.getLogger(__name__)
+
+# The image field of each model with derivatives, and the JSON field holding them.
+IMAGE_FIELDS = {
+    "posts.Post": ("image", "image_variants"),
+    "posts.Story": ("image", "image_variants"),
+    "profiles.Profile": ("profile_picture", "picture_variants"),
+}
+# Models whose image is also cropped into square avatars.
+AVATAR_MODELS = {"profiles.Profile"}
+
 
 @shared_task
 def delete_story_after_24_hours(story_id):
@@ -16,4 +38,90 @@ def delete_story_after_24_hours(story_id):
         story = Story.objects.get(id=story_id)
         story.delete()
     except Story.DoesNotExist:
-        pass  
\ No newline at end of file
+        pass
+
+
+def derivatives_outdated(instance) -> bool:
+    """Whether the stored derivatives of `instance` do not match its current image."""
+    image_field, variants_field = IMAGE_FIELDS[instance._meta.label]
+    image, variants = getattr(instance, image_field), getattr(instance, variants_field) or {}
+    return variants.get("source") != image.name if image else bool(variants)
+
+
+def queue_image_derivatives(instance):
+    """Generates the derivatives of `instance` in a worker once the transaction commits."""
+    args = [instance._meta.label, instance.pk]
+    # retry=False: if the broker is down, the periodic sweep generates them instead.
+    transaction.on_commit(lambda: generate_image_derivatives.apply_async(args, retry=False), robust=True)
+
+
+@shared_task
+def generate_image_derivatives(model_label: str, pk: int):
+    """
+    A Celery task that writes the resized copies of an uploaded image (see
+    `utils.images.build_derivatives`), and the avatars of `AVATAR_MODELS`,
+    and stores them on the model.
+
+    Derivatives of the previous image are deleted. An image Pillow cannot read
+    is recorded with its error and no sizes, so it is served as uploaded and
+    not retried. Saving the model with `update_fields` lets the cache
+    receivers in `apis.signals` drop the cached representations.
+
+    Args:
+        model_label (str): A key of `IMAGE_FIELDS`, e.g. `"posts.Post"`.
+        pk (int): The primary key of the instance.
+    """
+    model = apps.get_model(model_label)
+    image_field, variants_field = IMAGE_FIELDS[model_label]
+    instance = model.objects.filter(pk=pk).first()
+    if instance is None or not derivatives_outdated(instance):
+        return
+
+    image = getattr(instance, image_field)
+    variants = {}
+    if image:
+        try:
+            variants = build_derivatives(image, avatars=model_label in AVATAR_MODELS)
+        except (OSError, Image.DecompressionBombError) as exc:
+            logger.warning("Could not build derivatives of %s %s: %s", model_label, pk, exc)
+            variants = {"source": image.name, "sizes": {}, "error": str(exc)}
+
+    with transaction.atomic():
+        current = model.objects.select_for_update().filter(pk=pk).first()
+        # The image was replaced or the derivatives were stored by another run meanwhile.
+        if current is None or (getattr(current, image_field).name or "") != (image.name or "") \
+                or not derivatives_outdated(current):
+            transaction.on_commit(lambda: delete_derivatives(variants))
+            return
+        previous = getattr(current, variants_field)
+        setattr(current, variants_field, variants)
+        current.save(update_fields=[variants_field])
+        transaction.on_commit(lambda: delete_derivatives(previous))
+
+
+@shared_task
+def generate_missing_image_derivatives(batch_size: int = None) -> int:
+    """
+    A Celery task that generates the derivatives the upload-time task missed,
+    e.g. while the broker was down. Scheduled by celery-beat (see
+    `CELERY_BEAT_SCHEDULE`).
+
+    Returns:
+        int: The number of instances processed.
+    """
+    batch_size = batch_size or settings.IMAGE_DERIVATIVE_BATCH_SIZE
+    processed = 0
+    for model_label, (image_field, variants_field) in IMAGE_FIELDS.items():
+        model = apps.get_model(model_label)
+        pks = list(
+            model.objects.exclude(Q(**{f"{image_field}__isnull": True}) | Q(**{image_field: ""}))
+            .annotate(variants_source=KT(f"{variants_field}__source"))
+            .filter(Q(variants_source__isnull=True) | ~Q(variants_source=F(image_field)))
+            .order_by("pk").values_list("pk", flat=True)[:batch_size - processed]
+        )
+        for pk in pks:
+            generate_image_derivatives(model_label, pk)
+        processed += len(pks)
+        if processed >= batch_size:
+            break
+    return processed
@@ -0,0 +1,60 @@
+import json
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from profiles.suggestions import FollowGraph, friends_of_friends
+
+
+class Command(BaseCommand):
+    """
+    Benchmarks the follow suggestion engine on a synthetic follow graph.
+
+    The graph is generated in memory (no database access): followers are drawn
+    uniformly and followed accounts from a power-law distribution, which
+    mimics a few very popular accounts and a long tail.
+
+    Usage:
+        python manage.py benchmark_suggestions --users 100000 --edges 1000000
+    """
+    help = "Benchmark friends-of-friends suggestion scoring on a synthetic graph."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=100_000)
+        parser.add_argument("--edges", type=int, default=1_000_000)
+        parser.add_argument("--limit", type=int, default=20)
+        parser.add_argument("--alpha", type=float, default=1.2, help="Power-law exponent for popularity.")
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = np.random.default_rng(options["seed"])
+        users, edges = options["users"], options["edges"]
+
+        popularity = 1.0 / np.arange(1, users + 1) ** options["alpha"]
+        popularity /= popularity.sum()
+        followers = rng.integers(1, users + 1, size=edges)
+        followed = rng.permutation(users)[rng.choice(users, size=edges, p=popularity)] + 1
+
+        started = time.perf_counter()
+        graph = FollowGraph.from_edges(followers, followed)
+        build_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        suggested_users = 0
+        suggestions = 0
+        for _, candidate_ids, _ in friends_of_friends(graph, limit=options["limit"]):
+            suggested_users += 1
+            suggestions += len(candidate_ids)
+        score_seconds = time.perf_counter() - started
+
+        self.stdout.write(json.dumps({
+            "users": len(graph),
+            "edges": graph.edge_count,
+            "graph_bytes": graph.user_ids.nbytes + graph.indptr.nbytes + graph.indices.nbytes,
+            "build_seconds": round(build_seconds, 3),
+            "score_seconds": round(score_seconds, 3),
+            "users_per_second": round(len(graph) / score_seconds) if score_seconds else None,
+            "users_with_suggestions": suggested_users,
+            "suggestions": suggestions,
+        }, indent=2))
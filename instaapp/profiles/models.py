@@ -18,6 +18,7 @@ class Profile(models.Model):
         user (OneToOneField): A one-to-one relationship with the User model.
         followers (ManyToManyField): Users who follow this profile.
         profile_picture (ImageField): The profile picture of the user.
+        picture_variants (JSONField): Resized copies of the picture, filled by the `generate_image_derivatives` task.
         bio (CharField): A short biography for the user.
         website_link (URLField): A URL field for the user's personal or professional website.
         created_at (DateTimeField): The timestamp when the profile was created.
@@ -25,6 +26,7 @@ class Profile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name="profile")
     followers = models.ManyToManyField(User, related_name="followings", symmetrical=False, blank=True)
     profile_picture = models.ImageField(upload_to="media/", null=True, blank=True)
+    picture_variants = models.JSONField(default=dict, blank=True)
     bio = models.CharField(max_length=150, null=True, blank=True)
     email_verified = models.BooleanField(default=False)  
     verification_code = models.CharField(max_length=6, blank=True, null=True)
@@ -47,3 +49,23 @@ class Profile(models.Model):
         return code
 
 
+class FollowSuggestion(models.Model):
+    """
+    Precomputed "people you may know" suggestions for a single user.
+
+    Rows are rebuilt in bulk by the `compute_follow_suggestions` Celery task, so
+    reading a user's suggestions is a single primary-key lookup.
+
+    Attributes:
+        user (OneToOneField): The user the suggestions are for (primary key).
+        suggested_user_ids (JSONField): Suggested user ids, best match first.
+        scores (JSONField): Number of mutual connections for each suggestion.
+        computed_at (DateTimeField): The timestamp when the suggestions were computed.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name="follow_suggestions")
+    suggested_user_ids = models.JSONField(default=list)
+    scores = models.JSONField(default=list)
+    computed_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        return f"Suggestions for user {self.user_id}"
@@ -1,7 +1,11 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
+from django.db.models import Count, IntegerField, OuterRef, QuerySet, Subquery
 
 from profiles.models import Profile
+from profiles.signals import username_changed
+from utils.images import AvatarField, ImageVariantField
+from utils.sparse_fields import SparseFieldsetsMixin
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -31,13 +35,36 @@ class UserSerializer(serializers.ModelSerializer):
         ]
 
 
-class ProfileSerializer(serializers.ModelSerializer):
+class ProfileReferenceSerializer(serializers.ModelSerializer):
+    """
+    Compact, read-only reference to a profile for lists that show users next
+    to something else (comment authors, likers).
+
+    Everything is read from the profile row and its user, so a queryset with
+    `select_related("user")` (or a relation followed with it) costs no query.
+
+    Fields:
+        id (int): The unique ID of the profile.
+        username (str): The username of the associated User.
+        avatar (dict): URLs of the square avatars, keyed by their size in pixels.
+    """
+    username = serializers.CharField(source="user.username", read_only=True)
+    avatar = AvatarField("profile_picture", "picture_variants")
+
+    class Meta:
+        model = Profile
+        fields = ["id", "username", "avatar"]
+        read_only_fields = fields
+
+
+class ProfileSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     """
     Serializer for the Profile model.
 
     This serializer is used to convert a Profile object into JSON format, and vice versa.
     It also allows the creation and updating of the associated User object.
     The serializer includes user-related fields (username, email, password, etc.) and profile-specific fields.
+    Clients can limit the fields with `?fields=` or `?exclude=` (see `SparseFieldsetsMixin`).
 
     Fields:
         user (UserSerializer): The associated User object.
@@ -45,6 +72,8 @@ class ProfileSerializer(serializers.ModelSerializer):
         followers_count (int): The number of followers the profile has.
         following_count (int): The number of users this profile is following.
         profile_picture (ImageField): The profile picture of the user.
+        display_picture (dict): URL and size of the thumbnail of the profile picture.
+        avatar (dict): URLs of the square avatars, keyed by their size in pixels.
         bio (str): The biography of the user.
         website_link (str): The website link associated with the profile.
         created_at (datetime): The timestamp when the profile was created.
@@ -72,15 +101,47 @@ class ProfileSerializer(serializers.ModelSerializer):
     )
     followers_count = serializers.SerializerMethodField()
     following_count = serializers.SerializerMethodField()
+    display_picture = ImageVariantField("profile_picture", "picture_variants", "thumbnail")
+    avatar = AvatarField("profile_picture", "picture_variants")
 
     class Meta:
         model = Profile
         fields = [
             "user", "followers", "followers_count", "following_count",
-            "profile_picture", "bio", "website_link", "created_at",
+            "profile_picture", "display_picture", "avatar", "bio", "website_link", "created_at",
             "username", "email", "password", "first_name", "last_name"
         ]
 
+    @staticmethod
+    def setup_eager_loading(queryset: QuerySet, request=None) -> QuerySet:
+        """
+        Loads everything the serializer reads in a constant number of queries.
+
+        The user is joined, followers are prefetched (which also answers
+        `followers_count`) and the following count is annotated with a
+        correlated subquery. For a sparse fieldset only what the requested
+        fields need is loaded; `user_id` is always kept.
+
+        Args:
+            queryset (QuerySet): A queryset of profiles.
+            request (HttpRequest): The current request, if any.
+
+        Returns:
+            QuerySet: The queryset with joins, prefetches and annotations applied.
+        """
+        fields = ProfileSerializer.requested_fields(request)
+        if fields is None or "user" in fields:
+            queryset = queryset.select_related("user")
+        if fields is None or {"followers", "followers_count"} & fields:
+            queryset = queryset.prefetch_related("followers")
+        if fields is None or "following_count" in fields:
+            followings = (
+                Profile.followers.through.objects.filter(user_id=OuterRef("user_id"))
+                .values("user_id").annotate(total=Count("*")).values("total")
+            )
+            queryset = queryset.annotate(following_total=Subquery(followings, output_field=IntegerField()))
+        return ProfileSerializer.sparse_queryset(queryset, fields, always=("user",))
+
     def get_followers_count(self, obj) -> int:
         """
         Returns the number of followers of a profile.
@@ -91,7 +152,7 @@ class ProfileSerializer(serializers.ModelSerializer):
         Returns:
             int: The number of followers.
         """
-        return obj.followers.count()
+        return len(obj.followers.all())
 
     def get_following_count(self, obj) -> bool:
         """
@@ -103,6 +164,8 @@ class ProfileSerializer(serializers.ModelSerializer):
         Returns:
             int: The number of followings.
         """
+        if hasattr(obj, "following_total"):
+            return obj.following_total or 0
         return obj.user.followings.count()
 
     def validate_password(self, value):
@@ -184,6 +247,7 @@ class ProfileSerializer(serializers.ModelSerializer):
             Profile: The updated profile instance.
         """
         user_updated = False
+        old_username = instance.user.username
         if "password" in validated_data:
             instance.user.set_password(validated_data.pop("password"))
             user_updated = True
@@ -201,6 +265,8 @@ class ProfileSerializer(serializers.ModelSerializer):
             user_updated = True
         if user_updated:
             instance.user.save()
+        if instance.user.username != old_username:
+            username_changed.send(sender=User, user=instance.user, old_username=old_username)
 
         profile_fields = ["followers", "profile_picture", "bio", "website_link"]
         for field in profile_fields:
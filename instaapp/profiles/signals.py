@@ -0,0 +1,5 @@
+from django.dispatch import Signal
+
+# Sent by `ProfileSerializer.update` after a user's username changed, with
+# `user` and `old_username`, so caches keyed by username can drop the old name.
+username_changed = Signal()
@@ -0,0 +1,161 @@
+from itertools import chain
+
+import numpy as np
+from django.contrib.auth.models import User
+from django.db import transaction
+
+from profiles.models import Profile, FollowSuggestion
+
+
+class FollowGraph:
+    """
+    Compact, array-backed snapshot of the follow graph in CSR layout.
+
+    Users are remapped to dense indices `0..n-1`; `user_ids[i]` gives the real
+    user id of index `i`. The accounts followed by index `i` are stored in
+    `indices[indptr[i]:indptr[i + 1]]`, sorted ascending.
+
+    Attributes:
+        user_ids (np.ndarray): Real user ids, indexed by dense index.
+        indptr (np.ndarray): Row offsets into `indices` (length n + 1).
+        indices (np.ndarray): Dense indices of followed users.
+    """
+
+    def __init__(self, user_ids: np.ndarray, indptr: np.ndarray, indices: np.ndarray):
+        self.user_ids = user_ids
+        self.indptr = indptr
+        self.indices = indices
+
+    def __len__(self) -> int:
+        return len(self.user_ids)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.indices)
+
+    @classmethod
+    def from_edges(cls, followers: np.ndarray, followed: np.ndarray) -> "FollowGraph":
+        """
+        Builds the graph from two parallel arrays of user ids, where
+        `followers[k]` follows `followed[k]`. Duplicate edges and self-follows are dropped.
+        """
+        followers = np.asarray(followers, dtype=np.int64)
+        followed = np.asarray(followed, dtype=np.int64)
+        keep = followers != followed
+        followers, followed = followers[keep], followed[keep]
+
+        user_ids = np.unique(np.concatenate([followers, followed]))
+        src = np.searchsorted(user_ids, followers)
+        dst = np.searchsorted(user_ids, followed)
+
+        n = len(user_ids)
+        keys = np.unique(src * n + dst)
+        src, dst = keys // n, keys % n
+
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=n), out=indptr[1:])
+        return cls(user_ids, indptr, dst.astype(np.int64))
+
+    @classmethod
+    def from_database(cls) -> "FollowGraph":
+        """
+        Exports the `Profile.followers` relation into a `FollowGraph`.
+
+        The through table is keyed by profile, so profile ids are mapped to
+        their owner's user id with a single extra query instead of a join per row.
+        """
+        rows = Profile.followers.through.objects.values_list("user_id", "profile_id")
+        edges = np.fromiter(
+            chain.from_iterable(rows.iterator(chunk_size=10000)), dtype=np.int64
+        ).reshape(-1, 2)
+        followers, profiles = edges[:, 0], edges[:, 1]
+
+        pairs = np.array(list(Profile.objects.values_list("id", "user_id")), dtype=np.int64).reshape(-1, 2)
+        order = np.argsort(pairs[:, 0])
+        profile_ids, owner_ids = pairs[order, 0], pairs[order, 1]
+        followed = owner_ids[np.searchsorted(profile_ids, profiles)]
+        return cls.from_edges(followers, followed)
+
+
+def _gather(indptr: np.ndarray, indices: np.ndarray, rows: np.ndarray):
+    """
+    Concatenates the adjacency lists of `rows` without a Python loop.
+
+    Returns:
+        tuple: (`owner`, `values`) where `values` are the neighbours and `owner[k]`
+        is the position in `rows` that `values[k]` came from.
+    """
+    starts = indptr[rows]
+    lengths = indptr[rows + 1] - starts
+    total = int(lengths.sum())
+    owner = np.repeat(np.arange(len(rows)), lengths)
+    offsets = np.arange(total) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    return owner, indices[np.repeat(starts, lengths) + offsets]
+
+
+def friends_of_friends(graph: FollowGraph, limit: int = 20, block_size: int = 4096):
+    """
+    Scores "people you may know" candidates for every user in the graph.
+
+    A candidate's score is the number of accounts the user follows that also
+    follow the candidate. Users already followed and the user themself are
+    excluded. Users are processed in blocks so peak memory stays bounded.
+
+    Yields:
+        tuple: (`user_id`, `candidate_ids`, `scores`) for every user with at least
+        one candidate, candidates ordered by descending score then user id.
+    """
+    n = len(graph)
+    for block_start in range(0, n, block_size):
+        rows = np.arange(block_start, min(block_start + block_size, n))
+        owner, friends = _gather(graph.indptr, graph.indices, rows)
+        if not len(friends):
+            continue
+        hop, candidates = _gather(graph.indptr, graph.indices, friends)
+        users = rows[owner[hop]]
+
+        keys = users * n + candidates
+        direct = rows[owner] * n + friends
+        keep = (candidates != users) & ~np.isin(keys, direct)
+        keys, counts = np.unique(keys[keep], return_counts=True)
+        if not len(keys):
+            continue
+        users, candidates = keys // n, keys % n
+
+        order = np.lexsort((candidates, -counts, users))
+        users, candidates, counts = users[order], candidates[order], counts[order]
+        group_starts = np.flatnonzero(np.r_[True, users[1:] != users[:-1]])
+        group_ends = np.r_[group_starts[1:], len(users)]
+        for start, end in zip(group_starts, group_ends):
+            end = min(end, start + limit)
+            yield (
+                int(graph.user_ids[users[start]]),
+                graph.user_ids[candidates[start:end]].tolist(),
+                counts[start:end].tolist(),
+            )
+
+
+def rebuild_follow_suggestions(limit: int = 20, batch_size: int = 1000) -> int:
+    """
+    Recomputes and stores the top `limit` suggestions for every user.
+
+    Returns:
+        int: The number of users that received suggestions.
+    """
+    graph = FollowGraph.from_database()
+    existing_users = set(User.objects.values_list("id", flat=True))
+    rows = []
+    written = 0
+    with transaction.atomic():
+        FollowSuggestion.objects.all().delete()
+        for user_id, candidate_ids, scores in friends_of_friends(graph, limit=limit):
+            if user_id not in existing_users:
+                continue
+            rows.append(FollowSuggestion(user_id=user_id, suggested_user_ids=candidate_ids, scores=scores))
+            if len(rows) >= batch_size:
+                FollowSuggestion.objects.bulk_create(rows)
+                written += len(rows)
+                rows = []
+        FollowSuggestion.objects.bulk_create(rows)
+        written += len(rows)
+    return written
@@ -0,0 +1,15 @@
+from celery import shared_task
+from django.conf import settings
+
+from profiles.suggestions import rebuild_follow_suggestions
+
+
+@shared_task
+def compute_follow_suggestions():
+    """
+    A Celery task that rebuilds the "people you may know" table from the follow graph.
+
+    Scheduled by celery-beat (see `CELERY_BEAT_SCHEDULE`). Returns the number of
+    users that received suggestions.
+    """
+    return rebuild_follow_suggestions(limit=settings.FOLLOW_SUGGESTIONS_LIMIT)
@@ -0,0 +1,113 @@
+import threading
+from functools import partial
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.http import HttpRequest
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase, APITransactionTestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apis.async_views import _concurrently, shutdown_query_threads
+from likes.models import Like
+from posts.models import Post, Story
+from profiles.models import Profile
+
+User = get_user_model()
+
+
+class GraphMixin:
+    def setUp(self):
+        cache.clear()
+        self.viewer = User.objects.create_user(username="viewer", password="pass")
+        self.author = User.objects.create_user(username="author", password="pass")
+        Profile.objects.create(user=self.viewer)
+        Profile.objects.create(user=self.author)
+        self.author.profile.followers.add(self.viewer)
+        self.post = Post.objects.create(profile=self.author.profile, title="hello")
+        Like.objects.create(profile=self.viewer.profile, post=self.post)
+        Story.objects.bulk_create([Story(user=self.author.profile, caption="today")])
+
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.viewer)}")
+
+
+class AsyncReadViewsTest(GraphMixin, APITestCase):
+    def test_requires_authentication(self):
+        response = APIClient().get(reverse("async-feed"))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_feed_matches_sync_view(self):
+        response = self.client.get(reverse("async-feed"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.client.force_authenticate(user=self.viewer)
+        sync = self.client.get(reverse("posts-create")).json()
+        data = response.json()
+        self.assertEqual(data["count"], sync["count"])
+        self.assertEqual([post["id"] for post in data["results"]], [post["id"] for post in sync["results"]])
+        self.assertEqual(data["results"][0]["likes_count"], 1)
+        self.assertTrue(data["results"][0]["is_liked"])
+        self.assertEqual(data["results"][0]["author"]["username"], "author")
+
+    def test_post_detail_and_missing_post(self):
+        data = self.client.get(reverse("async-post-detail", kwargs={"id": self.post.id})).json()
+        self.assertEqual(data["title"], "hello")
+        self.assertTrue(data["is_liked"])
+        response = self.client.get(reverse("async-post-detail", kwargs={"id": self.post.id + 100}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_story_tray_groups_by_author(self):
+        tray = self.client.get(reverse("async-story-tray")).json()
+        self.assertEqual(len(tray), 1)
+        self.assertEqual(tray[0]["user"]["username"], "author")
+        self.assertEqual(tray[0]["stories"][0]["caption"], "today")
+
+    def test_profile_detail(self):
+        data = self.client.get(reverse("async-profile-detail", kwargs={"user_name": "author"})).json()
+        self.assertEqual(data["followers"], [self.viewer.id])
+        self.assertEqual(data["followers_count"], 1)
+        self.assertEqual(data["posts_count"], 1)
+        self.assertEqual(self.client.post(reverse("async-profile-detail", kwargs={"user_name": "author"})).status_code,
+                         status.HTTP_405_METHOD_NOT_ALLOWED)
+
+
+@override_settings(ASYNC_VIEW_QUERY_THREADS=4)
+class ConcurrentQueriesTest(GraphMixin, APITransactionTestCase):
+    """The views with their queries on the query threads; the rows must be committed for those connections."""
+
+    def tearDown(self):
+        shutdown_query_threads()
+        super().tearDown()
+
+    def test_queries_run_at_the_same_time(self):
+        request = HttpRequest()
+        request.execute_wrappers = {}
+        # Each query waits for the other two, so they only finish if all three run at once.
+        barrier = threading.Barrier(3, timeout=5)
+        results = async_to_sync(_concurrently)(request, *[partial(barrier.wait)] * 3)
+        self.assertEqual(sorted(results), [0, 1, 2])
+
+    @override_settings(DEBUG=True)
+    def test_same_responses_and_query_metrics_as_on_one_connection(self):
+        urls = [
+            reverse("async-feed"),
+            reverse("async-post-detail", kwargs={"id": self.post.id}),
+            reverse("async-post-detail", kwargs={"id": self.post.id + 100}),
+            reverse("async-story-tray"),
+            reverse("async-profile-detail", kwargs={"user_name": "author"}),
+            reverse("async-home"),
+        ]
+        for url in urls:
+            cache.clear()
+            concurrent = self.client.get(url)
+            cache.clear()
+            with override_settings(ASYNC_VIEW_QUERY_THREADS=0):
+                sequential = self.client.get(url)
+            self.assertEqual(concurrent.status_code, sequential.status_code, url)
+            self.assertEqual(concurrent.json(), sequential.json(), url)
+            if concurrent.status_code == status.HTTP_200_OK:
+                # The middleware's execute wrappers see the queries of the executor threads too.
+                self.assertEqual(concurrent["X-DB-Query-Count"], sequential["X-DB-Query-Count"], url)
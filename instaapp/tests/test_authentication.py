@@ -0,0 +1,48 @@
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from profiles.models import Profile
+
+User = get_user_model()
+
+
+class CachedJWTAuthenticationTest(APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="testuser", password="testpass123")
+        self.profile = Profile.objects.create(user=self.user, bio="bio")
+        self.refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.refresh.access_token}")
+        self.url = reverse("follow-suggestions")
+
+    def test_user_and_profile_are_served_from_cache(self):
+        with self.assertNumQueries(2):
+            self.client.get(self.url)
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.wsgi_request.user.profile.bio, "bio")
+
+    def test_deactivation_invalidates_cache(self):
+        self.client.get(self.url)
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_profile_change_invalidates_cache(self):
+        self.client.get(self.url)
+        self.profile.bio = "updated"
+        self.profile.save()
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url)
+        self.assertEqual(response.wsgi_request.user.profile.bio, "updated")
+
+    def test_logout_invalidates_cache(self):
+        self.client.get(self.url)
+        self.client.post(reverse("logout"), {"refresh_token": str(self.refresh)}, format="json")
+        with self.assertNumQueries(2):
+            self.client.get(self.url)
@@ -0,0 +1,105 @@
+import threading
+import time
+from unittest import mock
+
+from django.core.cache import caches
+from django.test import SimpleTestCase, override_settings
+from prometheus_client import REGISTRY
+
+from apis import caching
+from apis.version_stamps import bump_stamps
+
+
+def requests_count(name: str, result: str) -> float:
+    return REGISTRY.get_sample_value("cache_requests_total", {"cache": name, "result": result}) or 0
+
+
+class Counter:
+    """A compute function that counts its calls."""
+
+    def __init__(self, value="value", delay=0):
+        self.value = value
+        self.delay = delay
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        time.sleep(self.delay)
+        return self.value
+
+
+@override_settings(CACHE_TTL_JITTER=0)
+class GetOrComputeTest(SimpleTestCase):
+    def setUp(self):
+        caches["default"].clear()
+        caches["local"].clear()
+
+    def get(self, compute, key="key", **kwargs):
+        kwargs.setdefault("timeout", 60)
+        return caching.get_or_compute("test", key, compute, **kwargs)
+
+    def test_local_then_remote_tier(self):
+        compute = Counter()
+        local_hits, remote_hits = requests_count("test", "local_hit"), requests_count("test", "remote_hit")
+        self.assertEqual(self.get(compute), "value")
+        self.assertEqual(self.get(compute), "value")
+        caches["local"].clear()
+        self.assertEqual(self.get(compute), "value")
+        self.assertEqual(self.get(compute), "value")
+
+        self.assertEqual(compute.calls, 1)
+        self.assertEqual(requests_count("test", "local_hit") - local_hits, 2)
+        self.assertEqual(requests_count("test", "remote_hit") - remote_hits, 1)
+
+    def test_bumping_a_namespace_recomputes(self):
+        compute = Counter()
+        self.get(compute, namespaces=[("post", 1), ("profile", 2)])
+        self.get(compute, namespaces=[("post", 1), ("profile", 2)])
+        bump_stamps("profile", [2])
+        self.get(compute, namespaces=[("post", 1), ("profile", 2)])
+        self.assertEqual(compute.calls, 2)
+
+    def test_none_is_not_cached(self):
+        compute = Counter(value=None)
+        self.get(compute)
+        self.get(compute)
+        self.assertEqual(compute.calls, 2)
+
+    @override_settings(CACHE_TTL_JITTER=0.5)
+    def test_timeouts_are_jittered(self):
+        now = time.time()
+        fresh_until = set()
+        for index in range(20):
+            self.get(Counter(), key=f"key-{index}", timeout=100)
+            fresh_until.add(round(caches["default"].get(f"key-{index}")[1] - now))
+        self.assertTrue(all(50 <= value <= 100 for value in fresh_until))
+        self.assertGreater(len(fresh_until), 1)
+
+    def test_concurrent_misses_compute_once(self):
+        compute = Counter(delay=0.2)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(self.get(compute))) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, ["value"] * 5)
+        self.assertEqual(compute.calls, 1)
+
+    def test_stale_value_is_served_while_another_process_recomputes(self):
+        self.get(Counter("old"), stale_grace=60)
+        caches["default"].set("key", ("old", time.time() - 1))
+        caches["local"].clear()
+
+        caches["default"].add("key:lock", 1)
+        self.assertEqual(self.get(Counter("new"), stale_grace=60), "old")
+        caches["default"].delete("key:lock")
+        self.assertEqual(self.get(Counter("new"), stale_grace=60), "new")
+
+    def test_cold_miss_waits_for_the_lock_holder(self):
+        caches["default"].add("key:lock", 1)
+        compute = Counter()
+        fill = lambda _: caches["default"].set("key", ("built elsewhere", time.time() + 60))
+        with mock.patch.object(caching.time, "sleep", side_effect=fill):
+            self.assertEqual(self.get(compute), "built elsewhere")
+        self.assertEqual(compute.calls, 0)
@@ -0,0 +1,142 @@
+import hashlib
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils.timezone import now
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from posts.models import Post
+from profiles.models import Profile
+from uploads.models import Upload
+from uploads.tasks import assemble_upload, sweep_uploads
+
+User = get_user_model()
+
+DATA = b"0123456789abcdefghijKLMNO"
+
+
+def sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+@override_settings(UPLOAD_CHUNK_SIZE=10)
+class ChunkedUploadTest(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        media = override_settings(MEDIA_ROOT=self.media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+
+        self.user = User.objects.create_user(username="author", password="pass")
+        Profile.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def start(self, data=DATA, **extra) -> dict:
+        response = self.client.post(
+            reverse("upload-create"), {"filename": "clip.mp4", "size": len(data), "sha256": sha256(data), **extra},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response.data
+
+    def put_chunk(self, upload_id, index, data, checksum=None):
+        return self.client.put(
+            reverse("upload-chunk", kwargs={"upload_id": upload_id, "index": index}), data,
+            content_type="application/octet-stream", HTTP_X_CHUNK_SHA256=checksum or sha256(data),
+        )
+
+    def upload(self, data=DATA) -> Upload:
+        upload = self.start(data)
+        for index in range(upload["total_chunks"]):
+            self.put_chunk(upload["id"], index, data[index * 10:(index + 1) * 10])
+        with mock.patch("uploads.tasks.assemble_upload.apply_async") as apply_async:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(reverse("upload-finalize", kwargs={"upload_id": upload["id"]}))
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        apply_async.assert_called_once_with([str(upload["id"])], retry=False)
+        assemble_upload(str(upload["id"]))
+        return Upload.objects.get(pk=upload["id"])
+
+    def test_chunks_in_order_with_checksums(self):
+        upload = self.start()
+        self.assertEqual((upload["chunk_size"], upload["total_chunks"], upload["next_chunk"]), (10, 3, 0))
+
+        response = self.put_chunk(upload["id"], 1, DATA[10:20])
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response.data["next_chunk"], 0)
+
+        response = self.put_chunk(upload["id"], 0, DATA[:10], checksum=sha256(b"other"))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.put_chunk(upload["id"], 0, DATA[:9]).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(default_storage.listdir(f"uploads/{upload['id']}")[1])
+
+        self.assertEqual(self.put_chunk(upload["id"], 0, DATA[:10]).data["next_chunk"], 1)
+        response = self.put_chunk(upload["id"], 0, DATA[:10])
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(self.client.get(reverse("upload-detail", kwargs={"upload_id": upload["id"]})).data["next_chunk"], 1)
+
+        response = self.client.post(reverse("upload-finalize", kwargs={"upload_id": upload["id"]}))
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+
+    def test_finalize_assembles_the_file(self):
+        upload = self.upload()
+        self.assertEqual(upload.status, Upload.COMPLETE)
+        with upload.file.open("rb") as file:
+            self.assertEqual(file.read(), DATA)
+        self.assertEqual(upload.parts, [])
+        self.assertFalse(default_storage.listdir(f"uploads/{upload.pk}")[1])
+
+    def test_assembly_checks_the_whole_file(self):
+        upload = self.start(sha256=sha256(b"something else"))
+        for index in range(3):
+            self.put_chunk(upload["id"], index, DATA[index * 10:(index + 1) * 10])
+        Upload.objects.filter(pk=upload["id"]).update(status=Upload.ASSEMBLING)
+        with self.assertLogs("uploads.tasks", "WARNING"):
+            assemble_upload(str(upload["id"]))
+        upload = Upload.objects.get(pk=upload["id"])
+        self.assertEqual(upload.status, Upload.FAILED)
+        self.assertFalse(upload.file)
+        self.assertEqual(os.listdir(os.path.join(self.media_root, "media")), [])
+
+    def test_attach_to_a_post_once(self):
+        upload = self.upload()
+        response = self.client.post(reverse("posts-create"), {"title": "clip", "video_upload": str(upload.pk)}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Post.objects.get().video.name, upload.file.name)
+        self.assertFalse(Upload.objects.exists())
+
+        response = self.client.post(reverse("posts-create"), {"title": "clip", "video_upload": str(upload.pk)}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_uploads_are_private(self):
+        upload = self.upload()
+        other = User.objects.create_user(username="other", password="pass")
+        Profile.objects.create(user=other)
+        self.client.force_authenticate(user=other)
+
+        response = self.client.get(reverse("upload-detail", kwargs={"upload_id": upload.pk}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        with mock.patch("posts.tasks.delete_story_after_24_hours.apply_async"):
+            response = self.client.post(reverse("story-list-create"), {"video_upload": str(upload.pk)}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("video_upload", response.data)
+
+    def test_sweep_deletes_expired_uploads(self):
+        upload = self.start()
+        self.put_chunk(upload["id"], 0, DATA[:10])
+        self.assertEqual(sweep_uploads(), 0)
+
+        Upload.objects.filter(pk=upload["id"]).update(updated_at=now() - timedelta(days=2))
+        self.assertEqual(sweep_uploads(), 1)
+        self.assertFalse(Upload.objects.exists())
+        self.assertFalse(default_storage.listdir(f"uploads/{upload['id']}")[1])
@@ -0,0 +1,112 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from likes.models import Like
+from posts.models import Post, Story
+from profiles.models import Profile
+
+User = get_user_model()
+
+
+class ConditionalGetTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username="author", password="pass")
+        self.viewer = User.objects.create_user(username="viewer", password="pass")
+        Profile.objects.create(user=self.author)
+        Profile.objects.create(user=self.viewer)
+        self.author.profile.followers.add(self.viewer)
+        self.post = Post.objects.create(profile=self.author.profile, title="hello")
+        with mock.patch("posts.tasks.delete_story_after_24_hours.apply_async"):
+            self.story = Story.objects.create(user=self.author.profile, caption="hi")
+
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.viewer)
+
+    def get(self, url, etag=None, **headers):
+        if etag:
+            headers["HTTP_IF_NONE_MATCH"] = etag
+        return self.client.get(url, **headers)
+
+    def assert_revalidates(self, url, max_queries=0):
+        """Returns the ETag of `url` after checking a revalidation is a cheap 304."""
+        response = self.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("no-cache", response["Cache-Control"])
+        etag = response["ETag"]
+        with CaptureQueriesContext(connection) as queries:
+            not_modified = self.get(url, etag)
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(not_modified["ETag"], etag)
+        self.assertLessEqual(len(queries), max_queries)
+        return etag
+
+    def assert_changed(self, url, etag):
+        response = self.get(url, etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_post_detail(self):
+        url = reverse("post-detail", kwargs={"id": self.post.id})
+        etag = self.assert_revalidates(url)
+
+        Like.objects.create(profile=self.viewer.profile, post=self.post)
+        self.assert_changed(url, etag)
+        etag = self.get(url)["ETag"]
+        # follows_author is part of the response, so unfollowing changes it too.
+        self.author.profile.followers.remove(self.viewer)
+        self.assert_changed(url, etag)
+
+    def test_etag_depends_on_viewer_fields_and_format(self):
+        url = reverse("post-detail", kwargs={"id": self.post.id})
+        etag = self.get(url)["ETag"]
+        self.assertNotEqual(self.get(f"{url}?fields=id,title")["ETag"], etag)
+        self.assertNotEqual(self.get(url, HTTP_ACCEPT="application/msgpack")["ETag"], etag)
+        self.client.force_authenticate(user=self.author)
+        self.assertEqual(self.get(url, etag).status_code, status.HTTP_200_OK)
+
+    def test_if_modified_since(self):
+        url = reverse("post-detail", kwargs={"id": self.post.id})
+        last_modified = self.get(url)["Last-Modified"]
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_profile_detail(self):
+        url = reverse("profile-detail", kwargs={"user_name": "author"})
+        etag = self.assert_revalidates(url, max_queries=1)
+        self.author.profile.followers.remove(self.viewer)
+        self.assert_changed(url, etag)
+
+        etag = self.get(url)["ETag"]
+        self.author.profile.bio = "new bio"
+        self.author.profile.save()
+        self.assert_changed(url, etag)
+        self.assertEqual(self.get(reverse("profile-detail", kwargs={"user_name": "nobody"})).status_code, 404)
+
+    def test_story_detail(self):
+        url = reverse("story-detail", kwargs={"story_id": self.story.id})
+        etag = self.assert_revalidates(url)
+        Like.objects.create(profile=self.viewer.profile, story=self.story)
+        self.assert_changed(url, etag)
+
+    def test_first_feed_page(self):
+        url = reverse("posts-create")
+        etag = self.assert_revalidates(url)
+
+        Post.objects.create(profile=self.author.profile, title="another")
+        self.assert_changed(url, etag)
+        etag = self.get(url)["ETag"]
+        Like.objects.create(profile=self.viewer.profile, post=self.post)
+        self.assert_changed(url, etag)
+        etag = self.get(url)["ETag"]
+        self.author.profile.followers.remove(self.viewer)
+        self.assert_changed(url, etag)
+
+        self.assertFalse(self.get(f"{url}?page=2").has_header("ETag"))
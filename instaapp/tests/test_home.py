@@ -0,0 +1,102 @@
+import asyncio
+import time
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apis.version_stamps import bump_stamps
+from comments.models import Comment
+from likes.models import Like
+from posts.models import Post, Story
+from profiles.models import Profile
+
+User = get_user_model()
+
+
+class HomeViewTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.viewer = User.objects.create_user(username="viewer", password="pass")
+        self.author = User.objects.create_user(username="author", password="pass")
+        Profile.objects.create(user=self.viewer)
+        Profile.objects.create(user=self.author)
+        self.author.profile.followers.add(self.viewer)
+        self.own_post = Post.objects.create(profile=self.viewer.profile, title="mine")
+        self.post = Post.objects.create(profile=self.author.profile, title="hello")
+        Like.objects.create(profile=self.author.profile, post=self.own_post)
+        Comment.objects.create(user=self.author.profile, post=self.own_post, text="nice")
+        Story.objects.bulk_create([Story(user=self.author.profile, caption="today")])
+
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.viewer)}")
+
+    def test_requires_authentication(self):
+        response = APIClient().get(reverse("async-home"))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_returns_every_part(self):
+        data = self.client.get(reverse("async-home")).json()
+        self.assertEqual([post["id"] for post in data["feed"]["results"]], [self.post.id])
+        self.assertEqual(data["stories"][0]["stories"][0]["caption"], "today")
+        self.assertEqual(data["profile"]["user"]["username"], "viewer")
+        self.assertEqual(data["profile"]["posts_count"], 1)
+        self.assertNotIn("followers", data["profile"])
+        self.assertEqual(data["unread"], {"likes": 1, "comments": 1, "feed_posts": 1})
+
+    def test_parts_are_cached(self):
+        self.client.get(reverse("async-home"))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("async-home"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # Only the authenticated user lookup, which CachedJWTAuthentication also caches.
+        self.assertLessEqual(len(queries), 1)
+
+    def test_only_expired_parts_are_recomputed(self):
+        self.client.get(reverse("async-home"))
+        Post.objects.create(profile=self.author.profile, title="newer")
+        bump_stamps("home-unread", [self.viewer.id])
+        data = self.client.get(reverse("async-home")).json()
+        self.assertEqual(len(data["feed"]["results"]), 1)
+        # Recomputing the counts does not mark anything as seen.
+        self.assertEqual(data["unread"], {"likes": 1, "comments": 1, "feed_posts": 2})
+
+    def test_counts_restart_when_marked_as_seen(self):
+        self.client.get(reverse("async-home"))
+        self.assertEqual(self.client.get(reverse("async-home-seen")).status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+        response = self.client.post(reverse("async-home-seen"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.get(reverse("async-home")).json()["unread"],
+                         {"likes": 0, "comments": 0, "feed_posts": 0})
+
+        Post.objects.create(profile=self.author.profile, title="newer")
+        bump_stamps("home-unread", [self.viewer.id])
+        self.assertEqual(self.client.get(reverse("async-home")).json()["unread"],
+                         {"likes": 0, "comments": 0, "feed_posts": 1})
+
+    @override_settings(ASYNC_VIEW_QUERY_THREADS=4)
+    def test_parts_are_built_at_the_same_time(self):
+        spans = {}
+
+        def fake(part):
+            async def compute(*args):
+                started = time.monotonic()
+                await asyncio.sleep(0.2)
+                spans[part] = (started, time.monotonic())
+                return part
+            return compute
+
+        parts = {"feed": "_feed_page", "stories": "_story_tray", "profile": "_profile_summary",
+                 "unread": "_unread_counts"}
+        with mock.patch.multiple("apis.async_views", **{name: fake(part) for part, name in parts.items()}):
+            data = self.client.get(reverse("async-home")).json()
+        self.assertEqual(data, {part: part for part in parts})
+        # Every part started before any of them finished.
+        self.assertLess(max(start for start, _ in spans.values()), min(end for _, end in spans.values()))
@@ -0,0 +1,176 @@
+import shutil
+import tempfile
+from io import BytesIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+from rest_framework.test import APIClient
+
+from posts.models import Post
+from posts.tasks import generate_image_derivatives, generate_missing_image_derivatives
+from profiles.models import Profile
+
+User = get_user_model()
+
+WIDTHS = {"thumbnail": 50, "feed": 150, "full": 1000}
+
+
+def rotated_jpeg(name="photo.jpg") -> SimpleUploadedFile:
+    """A 400x200 JPEG whose EXIF orientation (6) displays it as 200x400."""
+    image = Image.new("RGB", (400, 200), "red")
+    exif = image.getexif()
+    exif[0x0112] = 6
+    output = BytesIO()
+    image.save(output, "JPEG", exif=exif)
+    return SimpleUploadedFile(name, output.getvalue(), content_type="image/jpeg")
+
+
+@override_settings(IMAGE_DERIVATIVE_WIDTHS=WIDTHS, IMAGE_DERIVATIVE_FORMAT="WEBP")
+class ImageDerivativesTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        media = override_settings(MEDIA_ROOT=media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+
+        self.user = User.objects.create_user(username="author", password="pass")
+        self.profile = Profile.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def create_post(self) -> Post:
+        with mock.patch("posts.tasks.generate_image_derivatives.apply_async") as apply_async:
+            with self.captureOnCommitCallbacks(execute=True):
+                post = Post.objects.create(profile=self.profile, image=rotated_jpeg())
+        apply_async.assert_called_once_with(["posts.Post", post.pk], retry=False)
+        return post
+
+    def test_upload_only_enqueues(self):
+        post = self.create_post()
+        post.refresh_from_db()
+        self.assertEqual(post.image_variants, {})
+
+    def test_sizes_orientation_and_format(self):
+        post = self.create_post()
+        generate_image_derivatives("posts.Post", post.pk)
+        post.refresh_from_db()
+
+        sizes = post.image_variants["sizes"]
+        self.assertEqual(post.image_variants["source"], post.image.name)
+        self.assertEqual({size: (v["width"], v["height"]) for size, v in sizes.items()},
+                         {"thumbnail": (50, 100), "feed": (150, 300), "full": (200, 400)})
+        with default_storage.open(sizes["feed"]["name"]) as file, Image.open(file) as derivative:
+            self.assertEqual(derivative.format, "WEBP")
+            self.assertEqual(derivative.size, (150, 300))
+            self.assertNotIn(0x0112, derivative.getexif())
+
+    def test_serializers_return_the_size_of_the_view(self):
+        post = self.create_post()
+        generate_image_derivatives("posts.Post", post.pk)
+
+        viewer = User.objects.create_user(username="viewer", password="pass")
+        Profile.objects.create(user=viewer)
+        self.profile.followers.add(viewer)
+        self.client.force_authenticate(user=viewer)
+
+        feed = self.client.get(reverse("posts-create"), {"fields": "display_image"}).data["results"][0]["display_image"]
+        detail = self.client.get(reverse("post-detail", kwargs={"id": post.pk})).data["display_image"]
+        self.assertEqual((feed["width"], detail["width"]), (150, 200))
+        self.assertTrue(feed["url"].endswith("-150w.webp"))
+
+    def test_replacing_the_image_regenerates(self):
+        post = self.create_post()
+        generate_image_derivatives("posts.Post", post.pk)
+        post.refresh_from_db()
+        old = post.image_variants["sizes"]["thumbnail"]["name"]
+
+        with mock.patch("posts.tasks.generate_image_derivatives.apply_async") as apply_async:
+            with self.captureOnCommitCallbacks(execute=True):
+                post.image = rotated_jpeg("other.jpg")
+                post.save()
+        apply_async.assert_called_once()
+        self.assertIsNone(self.client.get(reverse("post-detail", kwargs={"id": post.pk})).data["display_image"]["width"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            generate_image_derivatives("posts.Post", post.pk)
+        post.refresh_from_db()
+        self.assertEqual(post.image_variants["source"], post.image.name)
+        self.assertFalse(default_storage.exists(old))
+
+    def test_unreadable_image_is_served_as_uploaded(self):
+        with mock.patch("posts.tasks.generate_image_derivatives.apply_async"):
+            post = Post.objects.create(
+                profile=self.profile, image=SimpleUploadedFile("broken.jpg", b"not an image", content_type="image/jpeg")
+            )
+        with self.assertLogs("posts.tasks", "WARNING"):
+            generate_image_derivatives("posts.Post", post.pk)
+        post.refresh_from_db()
+        self.assertEqual(post.image_variants["sizes"], {})
+        self.assertIn("error", post.image_variants)
+        self.assertEqual(generate_missing_image_derivatives(), 0)
+
+    def test_sweep_generates_missed_derivatives(self):
+        with mock.patch("posts.tasks.generate_image_derivatives.apply_async"):
+            post = Post.objects.create(profile=self.profile, image=rotated_jpeg())
+            self.profile.profile_picture = rotated_jpeg("avatar.jpg")
+            self.profile.save()
+        Post.objects.create(profile=self.profile)
+
+        self.assertEqual(generate_missing_image_derivatives(), 2)
+        post.refresh_from_db()
+        self.profile.refresh_from_db()
+        self.assertEqual(post.image_variants["source"], post.image.name)
+        self.assertEqual(self.profile.picture_variants["sizes"]["thumbnail"]["width"], 50)
+        self.assertEqual(generate_missing_image_derivatives(), 0)
+
+    def test_profile_picture_avatars(self):
+        with mock.patch("posts.tasks.generate_image_derivatives.apply_async") as apply_async:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.patch(
+                    reverse("profile-detail", kwargs={"user_name": "author"}),
+                    {"profile_picture": rotated_jpeg("avatar.jpg")}, format="multipart",
+                )
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.data["avatar"])
+        apply_async.assert_called_once_with(["profiles.Profile", self.profile.pk], retry=False)
+
+        generate_image_derivatives("profiles.Profile", self.profile.pk)
+        self.profile.refresh_from_db()
+        avatars = self.profile.picture_variants["avatars"]
+        self.assertEqual(set(avatars), {"40", "80", "160"})
+        with default_storage.open(avatars["80"]) as file, Image.open(file) as avatar:
+            self.assertEqual(avatar.size, (80, 80))
+
+        post = Post.objects.create(profile=self.profile)
+        self.client.post(reverse("post-comments", kwargs={"post_id": post.pk}), {"text": "hi"}, format="json")
+        comment = self.client.get(reverse("post-comments", kwargs={"post_id": post.pk})).data[0]
+        self.assertEqual(comment["author"]["username"], "author")
+        self.assertTrue(comment["author"]["avatar"]["40"].endswith("-40sq.webp"))
+
+        viewer = User.objects.create_user(username="viewer", password="pass")
+        Profile.objects.create(user=viewer)
+        self.client.force_authenticate(user=viewer)
+        followed = self.client.post(reverse("follow-user", kwargs={"user_name": "author"})).data["profile"]
+        self.assertEqual(followed["avatar"], comment["author"]["avatar"])
+
+    def test_post_likers_carry_avatars(self):
+        with mock.patch("posts.tasks.generate_image_derivatives.apply_async"):
+            self.profile.profile_picture = rotated_jpeg("avatar.jpg")
+            self.profile.save()
+        generate_image_derivatives("profiles.Profile", self.profile.pk)
+        post = Post.objects.create(profile=self.profile)
+        self.client.post(reverse("like-post", kwargs={"post_id": post.pk}))
+
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse("like-post", kwargs={"post_id": post.pk}))
+        liker = response.data["likes"][0]["profile"]
+        self.assertEqual((liker["id"], liker["username"]), (self.profile.pk, "author"))
+        self.assertTrue(liker["avatar"]["40"].endswith("-40sq.webp"))
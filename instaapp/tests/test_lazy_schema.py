@@ -0,0 +1,25 @@
+import json
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+from drf_yasg import openapi as real_openapi
+
+from utils.lazy_schema import openapi, resolve
+
+
+class LazySchemaTest(SimpleTestCase):
+    def test_resolves_nested_deferred_objects(self):
+        schema = resolve({"body": openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            properties={"ids": openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Items(type=openapi.TYPE_INTEGER))},
+        )})["body"]
+        self.assertIsInstance(schema, real_openapi.Schema)
+        self.assertEqual(schema.type, real_openapi.TYPE_OBJECT)
+        self.assertIsInstance(schema.properties["ids"]["items"], real_openapi.Items)
+
+    def test_startup_does_not_import_schema_tooling(self):
+        stdout = StringIO()
+        # A generous budget: only the lazily imported modules are checked here.
+        call_command("benchmark_startup", runs=1, budget_ms=60000, stdout=stdout)
+        self.assertEqual(json.loads(stdout.getvalue())["eagerly_imported"], [])
@@ -0,0 +1,83 @@
+import json
+from datetime import timedelta
+from unittest import mock
+
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.test import TestCase, override_settings
+from django.utils.timezone import now
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from mailing.models import EmailOutbox
+from mailing.tasks import send_pending_emails
+from utils.send_mail import queue_email
+
+
+@override_settings(EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend")
+class RegisterQueuesVerificationEmailTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.url = "/api/v1/register/"
+
+    def test_register_only_enqueues(self):
+        data = {"username": "testuser", "email": "test@example.com", "password": "strongpassword123"}
+        with mock.patch("mailing.tasks.send_pending_emails.apply_async") as apply_async:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(self.url, json.dumps(data), content_type="application/json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(mail.outbox), 0)
+        email = EmailOutbox.objects.get()
+        self.assertEqual(email.status, EmailOutbox.PENDING)
+        self.assertEqual(email.recipients, ["test@example.com"])
+        apply_async.assert_called_once_with(retry=False)
+
+        send_pending_emails.apply()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn("Your verification code is", mail.outbox[0].body)
+        self.assertEqual(EmailOutbox.objects.get().status, EmailOutbox.SENT)
+
+
+@override_settings(
+    EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend",
+    EMAIL_OUTBOX_MAX_ATTEMPTS=2,
+)
+class SendPendingEmailsTest(TestCase):
+    def test_sends_batches_over_one_connection(self):
+        for i in range(5):
+            queue_email("Hi", "Body", [f"user{i}@example.com"])
+
+        with mock.patch.object(EmailBackend, "open", autospec=True, return_value=True) as opened:
+            result = send_pending_emails.apply(kwargs={"batch_size": 2})
+
+        self.assertEqual(result.get(), 5)
+        self.assertEqual(opened.call_count, 1)
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertFalse(EmailOutbox.objects.exclude(status=EmailOutbox.SENT).exists())
+
+    def test_failed_email_is_retried_then_given_up(self):
+        email = queue_email("Hi", "Body", ["user@example.com"])
+
+        with mock.patch.object(EmailBackend, "send_messages", side_effect=OSError("boom")):
+            send_pending_emails.apply()
+        email.refresh_from_db()
+        self.assertEqual(email.status, EmailOutbox.PENDING)
+        self.assertEqual(email.attempts, 1)
+        self.assertGreater(email.next_attempt_at, now())
+
+        EmailOutbox.objects.filter(id=email.id).update(next_attempt_at=now())
+        with mock.patch.object(EmailBackend, "send_messages", side_effect=OSError("boom")):
+            send_pending_emails.apply()
+        email.refresh_from_db()
+        self.assertEqual(email.status, EmailOutbox.FAILED)
+        self.assertEqual(email.last_error, "boom")
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_expired_lease_is_reclaimed(self):
+        email = queue_email("Hi", "Body", ["user@example.com"])
+        EmailOutbox.objects.filter(id=email.id).update(
+            status=EmailOutbox.SENDING, next_attempt_at=now() - timedelta(seconds=1)
+        )
+        send_pending_emails.apply()
+        self.assertEqual(len(mail.outbox), 1)
@@ -0,0 +1,73 @@
+import time
+from types import SimpleNamespace
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from prometheus_client import REGISTRY
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from instaapp.metrics import record_queue_wait, record_task_duration, stamp_published_at
+
+User = get_user_model()
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+class MetricsMiddlewareTest(APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=User.objects.create_user(username="testuser", password="pass"))
+
+    def test_requests_are_labeled_by_route_and_status(self):
+        ok = sample("http_requests_total", route="user-search", method="GET", status="200")
+        observed = sample("http_request_duration_seconds_count", route="user-search", method="GET")
+        self.client.get(reverse("user-search"))
+        self.assertEqual(sample("http_requests_total", route="user-search", method="GET", status="200"), ok + 1)
+        self.assertEqual(
+            sample("http_request_duration_seconds_count", route="user-search", method="GET"), observed + 1
+        )
+        self.assertEqual(sample("http_requests_in_flight", route="user-search"), 0)
+
+    def test_unmatched_urls_share_one_label(self):
+        not_found = sample("http_requests_total", route="unmatched", method="GET", status="404")
+        self.client.get("/no/such/page/")
+        self.assertEqual(
+            sample("http_requests_total", route="unmatched", method="GET", status="404"), not_found + 1
+        )
+
+    def test_metrics_endpoint_serves_text_format(self):
+        self.client.get(reverse("user-search"))
+        response = self.client.get(reverse("metrics"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn(b'http_requests_total{method="GET",route="user-search",status="200"}', response.content)
+
+
+class CeleryTaskMetricsTest(APITestCase):
+    def run_task(self, published_at, eta=None):
+        headers = {}
+        stamp_published_at(headers=headers)
+        task = SimpleNamespace(
+            name="tests.sample_task",
+            request=SimpleNamespace(published_at=published_at or headers["published_at"], eta=eta),
+        )
+        record_queue_wait(task=task)
+        record_task_duration(task=task, state="SUCCESS")
+
+    def test_queue_wait_and_duration_are_recorded(self):
+        waited = sample("celery_task_queue_wait_seconds_sum", task="tests.sample_task")
+        ran = sample("celery_task_duration_seconds_count", task="tests.sample_task", state="SUCCESS")
+        self.run_task(time.time() - 3)
+        self.assertGreaterEqual(sample("celery_task_queue_wait_seconds_sum", task="tests.sample_task"), waited + 3)
+        self.assertEqual(
+            sample("celery_task_duration_seconds_count", task="tests.sample_task", state="SUCCESS"), ran + 1
+        )
+
+    def test_queue_wait_starts_at_eta(self):
+        waited = sample("celery_task_queue_wait_seconds_sum", task="tests.sample_task")
+        now = time.time()
+        eta = time.strftime("%Y-%m-%dT%H:%M:%S+00:00", time.gmtime(now - 1))
+        self.run_task(now - 3600, eta=eta)
+        self.assertLess(sample("celery_task_queue_wait_seconds_sum", task="tests.sample_task"), waited + 60)
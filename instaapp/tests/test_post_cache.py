@@ -0,0 +1,86 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from comments.models import Comment
+from hashtags.models import HashTag
+from likes.models import Like
+from posts.models import Post
+from profiles.models import Profile
+
+User = get_user_model()
+
+
+class PostDetailCacheTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username="author", password="pass")
+        self.viewer = User.objects.create_user(username="viewer", password="pass")
+        Profile.objects.create(user=self.author)
+        Profile.objects.create(user=self.viewer)
+        self.author.profile.followers.add(self.viewer)
+        self.post = Post.objects.create(profile=self.author.profile, title="hello")
+        self.tag = HashTag.objects.create(name="sun")
+        self.post.hashtags.add(self.tag)
+        self.url = reverse("post-detail", kwargs={"id": self.post.id})
+
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.viewer)
+
+    def get(self, user=None, params=None):
+        if user:
+            self.client.force_authenticate(user=user)
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.json()
+
+    def test_warm_read_only_queries_viewer_flags(self):
+        data = self.get()
+        self.assertEqual((data["title"], data["hashtag_list"], data["likes_count"]), ("hello", ["sun"], 0))
+        self.assertEqual((data["is_liked"], data["follows_author"], data["comments_count"]), (False, True, 0))
+        with CaptureQueriesContext(connection) as queries:
+            self.get()
+        self.assertEqual(len(queries), 1)
+
+    def test_viewer_fields_are_not_shared(self):
+        Like.objects.create(profile=self.viewer.profile, post=self.post)
+        self.assertTrue(self.get()["is_liked"])
+        author_view = self.get(user=self.author)
+        self.assertEqual((author_view["is_liked"], author_view["follows_author"]), (False, False))
+        self.assertEqual(author_view["likes_count"], 1)
+
+    def test_like_and_unlike_invalidate(self):
+        self.get()
+        self.client.post(reverse("like-post", kwargs={"post_id": self.post.id}))
+        self.assertEqual(self.get()["likes_count"], 1)
+        self.client.delete(reverse("like-post", kwargs={"post_id": self.post.id}))
+        self.assertEqual(self.get()["likes_count"], 0)
+
+    def test_edit_comment_and_hashtags_invalidate(self):
+        self.get()
+        self.client.force_authenticate(user=self.author)
+        self.client.patch(self.url, {"title": "edited"}, format="json")
+        self.assertEqual(self.get()["title"], "edited")
+
+        Comment.objects.create(user=self.viewer.profile, post=self.post, text="nice")
+        self.assertEqual(self.get()["comments_count"], 1)
+
+        self.post.hashtags.add(HashTag.objects.create(name="sea"))
+        self.assertEqual(sorted(self.get()["hashtag_list"]), ["sea", "sun"])
+        self.tag.name = "moon"
+        self.tag.save()
+        self.assertEqual(sorted(self.get()["hashtag_list"]), ["moon", "sea"])
+        self.tag.post_hashtag.clear()
+        self.assertEqual(self.get()["hashtag_list"], ["sea"])
+
+    def test_delete_invalidates(self):
+        self.get()
+        self.post.delete()
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_sparse_fields(self):
+        self.assertEqual(self.get(params={"fields": "title,is_liked"}), {"title": "hello", "is_liked": False})
@@ -0,0 +1,78 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from apis.profile_resolver import get_profile_reference, resolve_username
+from profiles.models import Profile
+
+User = get_user_model()
+
+
+class ProfileResolverTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username="author", password="pass")
+        self.viewer = User.objects.create_user(username="viewer", password="pass")
+        Profile.objects.create(user=self.author)
+        Profile.objects.create(user=self.viewer)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.viewer)
+
+    def test_resolves_from_cache(self):
+        self.assertEqual(resolve_username("author"), (self.author.profile.pk, self.author.pk))
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(resolve_username("author"), (self.author.profile.pk, self.author.pk))
+        self.assertEqual(len(queries), 0)
+
+    def test_reference_is_cached_with_the_avatars(self):
+        self.assertEqual(get_profile_reference("author"), {"id": self.author.profile.pk, "username": "author", "avatar": None})
+        profile = self.author.profile
+        profile.profile_picture = "media/avatar.jpg"
+        profile.picture_variants = {"source": "media/avatar.jpg", "sizes": {}, "avatars": {"40": "media/derivatives/avatar-40sq.webp"}}
+        profile.save(update_fields=["profile_picture", "picture_variants"])
+
+        self.assertEqual(get_profile_reference("author")["avatar"], {"40": "/media/derivatives/avatar-40sq.webp"})
+        with CaptureQueriesContext(connection) as queries:
+            get_profile_reference("author")
+        self.assertEqual(len(queries), 0)
+
+    def test_follow_skips_the_profile_lookup(self):
+        resolve_username("author")
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse("follow-user", kwargs={"user_name": "author"}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(self.author.profile.followers.filter(pk=self.viewer.pk).exists())
+        self.assertFalse(any("auth_user" in query["sql"] for query in queries))
+
+        response = self.client.post(reverse("follow-user", kwargs={"user_name": "viewer"}))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_follow_lists(self):
+        self.author.profile.followers.add(self.viewer)
+        followers = self.client.get(reverse("profile-follower-list", kwargs={"user_name": "author"}))
+        followings = self.client.get(reverse("profile-followings-list", kwargs={"user_name": "viewer"}))
+        self.assertEqual([profile["user"]["username"] for profile in followers.data["Followers"]], ["viewer"])
+        self.assertEqual([profile["user"]["username"] for profile in followings.data["Following"]], ["author"])
+
+    def test_rename_invalidates_old_name(self):
+        self.client.get(reverse("profile-detail", kwargs={"user_name": "viewer"}))
+        response = self.client.patch(
+            reverse("profile-detail", kwargs={"user_name": "viewer"}), {"username": "renamed"}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(resolve_username("viewer"))
+        self.assertEqual(resolve_username("renamed"), (self.viewer.profile.pk, self.viewer.pk))
+
+    def test_unknown_and_deleted_users(self):
+        self.assertIsNone(resolve_username("newcomer"))
+        newcomer = User.objects.create_user(username="newcomer", password="pass")
+        Profile.objects.create(user=newcomer)
+        self.assertEqual(resolve_username("newcomer"), (newcomer.profile.pk, newcomer.pk))
+
+        newcomer.delete()
+        response = self.client.get(reverse("profile-detail", kwargs={"user_name": "newcomer"}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,70 @@
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient, APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from profiles.models import Profile
+
+User = get_user_model()
+
+
+class ProfilingMiddlewareTest(APITestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+        settings_override = override_settings(PROFILING_DIR=directory.name, PROFILING_SAMPLE_RATE=0, PROFILING_KEEP=2)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.user = User.objects.create_user(username="testuser", password="pass")
+        Profile.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_unflagged_requests_are_not_profiled(self):
+        response = self.client.get(reverse("user-search"))
+        self.assertNotIn("X-Profile-Id", response)
+        self.assertEqual(list(self.directory.iterdir()), [])
+
+    def test_non_staff_flag_is_ignored(self):
+        self.client.force_authenticate(user=None)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(self.user).access_token}")
+        with mock.patch("instaapp.middleware.cProfile.Profile") as profile:
+            response = self.client.get(reverse("user-search"), HTTP_X_PROFILE="1")
+        profile.assert_not_called()
+        self.assertNotIn("X-Profile-Id", response)
+        self.assertEqual(list(self.directory.iterdir()), [])
+
+    def test_anonymous_flag_never_starts_the_profiler(self):
+        with mock.patch("instaapp.middleware.cProfile.Profile") as profile:
+            response = APIClient().get(reverse("user-search"), HTTP_X_PROFILE="1")
+        profile.assert_not_called()
+        self.assertNotIn("X-Profile-Id", response)
+        self.assertEqual(list(self.directory.iterdir()), [])
+
+    def test_staff_request_is_profiled_with_sql_log(self):
+        self.user.is_staff = True
+        self.user.save()
+        self.client.force_authenticate(user=None)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(self.user).access_token}")
+        response = self.client.get(reverse("user-search"), {"_profile": "1"})
+        profile_id = response["X-Profile-Id"]
+        self.assertIn("user-search", profile_id)
+        self.assertTrue((self.directory / f"{profile_id}.prof").exists())
+        report = (self.directory / f"{profile_id}.txt").read_text()
+        self.assertIn("-> 200", report)
+        self.assertIn('FROM "profiles_profile"', report)
+
+    def test_sampled_requests_are_saved_and_pruned(self):
+        with override_settings(PROFILING_SAMPLE_RATE=1):
+            for _ in range(3):
+                response = self.client.get(reverse("user-search"))
+        self.assertNotIn("X-Profile-Id", response)
+        self.assertEqual(len(list(self.directory.glob("*.prof"))), 2)
+        self.assertEqual(len(list(self.directory.glob("*.txt"))), 2)
@@ -0,0 +1,229 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apis.paginations import Pagination
+from apis.tokens import BloomRefreshToken, blacklist_index
+from apis.urls import urlpatterns
+from comments.models import Comment
+from hashtags.models import HashTag
+from likes.models import Like
+from posts.models import Post, Story
+from profiles.models import FollowSuggestion, Profile
+from uploads.models import Upload
+
+BASELINE_PATH = Path(__file__).with_name("query_counts.json")
+# Every list in the dataset (members, posts, comments, likes, page size) has this many entries.
+SIZES = (2, 6)
+PASSWORD = "pass"
+PASSWORD_HASH = make_password(PASSWORD)
+
+
+def build_dataset(size: int) -> dict:
+    """
+    Seeds a social graph in which every list an endpoint returns has `size` entries.
+
+    The viewer follows and is followed by `size` members, every post is liked
+    by every member, the viewer's post has a comment from every member and
+    every comment is liked by every member. `size` strangers are only
+    reachable through follow suggestions.
+    """
+    def create_user(username, **profile_fields):
+        user = User.objects.create(username=username, email=f"{username}@example.com", password=PASSWORD_HASH)
+        Profile.objects.create(user=user, email_verified=True, **profile_fields)
+        return user
+
+    viewer = create_user("viewer")
+    members = [create_user(f"member{i}") for i in range(size)]
+    strangers = [create_user(f"stranger{i}") for i in range(size)]
+    pending = create_user("pending", verification_code="123456")
+    pending.profile.email_verified = False
+    pending.profile.save()
+
+    viewer.profile.followers.add(*members)
+    for member in members:
+        member.profile.followers.add(viewer)
+    FollowSuggestion.objects.create(user=viewer, suggested_user_ids=[user.id for user in strangers + members])
+
+    common = HashTag.objects.create(name="common")
+    own_post = Post.objects.create(profile=viewer.profile, title="own")
+    posts = [Post.objects.create(profile=member.profile, title=member.username) for member in members]
+    for post in [own_post] + posts:
+        post.hashtags.add(common)
+        Like.objects.bulk_create(Like(profile=member.profile, post=post) for member in members)
+    Like.objects.create(profile=viewer.profile, post=own_post)
+
+    comments = [Comment.objects.create(user=member.profile, post=own_post, text="nice") for member in members]
+    own_comment = Comment.objects.create(user=viewer.profile, post=own_post, text="thanks")
+    for comment in comments + [own_comment]:
+        Like.objects.bulk_create(Like(profile=member.profile, comment=comment) for member in members)
+    Like.objects.create(profile=viewer.profile, comment=own_comment)
+
+    # bulk_create skips Story.save(), which would schedule the 24h deletion in Celery.
+    own_story, liked_story = Story.objects.bulk_create([
+        Story(user=viewer.profile, caption="own"), Story(user=members[0].profile, caption="liked"),
+    ])
+    Like.objects.bulk_create(Like(profile=member.profile, story=own_story) for member in members)
+    Like.objects.create(profile=viewer.profile, story=liked_story)
+
+    open_upload = Upload.objects.create(profile=viewer.profile, filename="clip.mp4", size=25, chunk_size=10)
+    received_upload = Upload.objects.create(
+        profile=viewer.profile, filename="clip.mp4", size=5, chunk_size=10, parts=["uploads/part"]
+    )
+
+    return {
+        "viewer": viewer, "member": members[0], "stranger": strangers[0], "pending": pending,
+        "own_post": own_post, "other_post": posts[0], "comment": comments[0], "own_comment": own_comment,
+        "own_story": own_story, "liked_story": liked_story,
+        "open_upload": open_upload, "received_upload": received_upload,
+    }
+
+
+# (method, url name, url kwargs, request body), each built from the dataset.
+REQUESTS = [
+    ("get", "users-list", lambda d: {}, None),
+    ("get", "user-search", lambda d: {}, lambda d: {"q": "member"}),
+    ("get", "follow-suggestions", lambda d: {}, None),
+    ("post", "register", lambda d: {}, lambda d: {
+        "username": "newcomer", "email": "newcomer@example.com", "password": "secret",
+    }),
+    ("post", "verify-email", lambda d: {}, lambda d: {"email": d["pending"].email, "code": "123456"}),
+    ("post", "login", lambda d: {}, lambda d: {"username": "viewer", "password": PASSWORD}),
+    ("post", "logout", lambda d: {}, lambda d: {"refresh_token": str(BloomRefreshToken.for_user(d["viewer"]))}),
+    ("get", "posts-create", lambda d: {}, None),
+    ("post", "posts-create", lambda d: {}, lambda d: {"title": "new", "hashtags": "common,fresh"}),
+    ("get", "post-detail", lambda d: {"id": d["own_post"].id}, None),
+    ("patch", "post-detail", lambda d: {"id": d["own_post"].id}, lambda d: {"title": "edited"}),
+    ("delete", "post-detail", lambda d: {"id": d["own_post"].id}, None),
+    ("get", "like-post", lambda d: {"post_id": d["own_post"].id}, None),
+    ("post", "like-post", lambda d: {"post_id": d["other_post"].id}, None),
+    ("delete", "like-post", lambda d: {"post_id": d["own_post"].id}, None),
+    ("get", "post-comments", lambda d: {"post_id": d["own_post"].id}, None),
+    ("post", "post-comments", lambda d: {"post_id": d["own_post"].id}, lambda d: {"text": "hello"}),
+    ("delete", "comment-delete", lambda d: {"comment_id": d["own_comment"].id}, None),
+    ("post", "like-comment", lambda d: {"comment_id": d["comment"].id}, None),
+    ("delete", "like-comment", lambda d: {"comment_id": d["own_comment"].id}, None),
+    ("get", "comments-list", lambda d: {}, None),
+    ("post", "story-list-create", lambda d: {}, lambda d: {"caption": "new"}),
+    ("get", "story-detail", lambda d: {"story_id": d["own_story"].id}, None),
+    ("patch", "story-detail", lambda d: {"story_id": d["own_story"].id}, lambda d: {"caption": "edited"}),
+    ("delete", "story-detail", lambda d: {"story_id": d["own_story"].id}, None),
+    ("post", "story-like", lambda d: {"story_id": d["own_story"].id}, None),
+    ("delete", "story-like", lambda d: {"story_id": d["liked_story"].id}, None),
+    ("post", "follow-user", lambda d: {"user_name": d["stranger"].username}, None),
+    ("post", "unfollow-user", lambda d: {"user_name": d["member"].username}, None),
+    ("get", "profile-detail", lambda d: {"user_name": "viewer"}, None),
+    ("patch", "profile-detail", lambda d: {"user_name": "viewer"}, lambda d: {"bio": "edited"}),
+    ("get", "profile-follower-list", lambda d: {"user_name": "viewer"}, None),
+    ("get", "profile-followings-list", lambda d: {"user_name": "viewer"}, None),
+    ("get", "hashtags-list", lambda d: {}, None),
+    ("get", "hashtags-posts", lambda d: {"hashtaq_name": "common"}, None),
+    ("post", "upload-create", lambda d: {}, lambda d: {"filename": "clip.mp4", "size": 25}),
+    ("get", "upload-detail", lambda d: {"upload_id": d["open_upload"].id}, None),
+    ("delete", "upload-detail", lambda d: {"upload_id": d["open_upload"].id}, None),
+    ("put", "upload-chunk", lambda d: {"upload_id": d["open_upload"].id, "index": 0}, lambda d: b"0123456789"),
+    ("post", "upload-finalize", lambda d: {"upload_id": d["received_upload"].id}, None),
+    ("get", "async-feed", lambda d: {}, None),
+    ("get", "async-post-detail", lambda d: {"id": d["own_post"].id}, None),
+    ("get", "async-story-tray", lambda d: {}, None),
+    ("get", "async-profile-detail", lambda d: {"user_name": "viewer"}, None),
+    ("get", "async-home", lambda d: {}, None),
+    ("post", "async-home-seen", lambda d: {}, None),
+]
+
+
+def format_table(counts: dict) -> str:
+    width = max(len(key) for key in counts)
+    header = f"{'route'.ljust(width)}  " + "  ".join(f"size={size}".rjust(7) for size in SIZES)
+    rows = [
+        f"{key.ljust(width)}  " + "  ".join(str(by_size[size]).rjust(7) for size in SIZES)
+        for key, by_size in counts.items()
+    ]
+    return "\n".join([header, "-" * len(header)] + rows)
+
+
+class QueryCountRegressionTest(TestCase):
+    """
+    Pins the number of SQL queries of every route in `apis/urls.py`.
+
+    Each request runs against a fresh dataset at every size in `SIZES`
+    (including the page size of paginated lists); the count must be the same
+    at each size, so it does not grow with the data, and must match the
+    committed baseline in `query_counts.json`. After an intended change,
+    regenerate the baseline with:
+
+        UPDATE_QUERY_COUNTS=1 python manage.py test tests.test_query_counts
+    """
+
+    def setUp(self):
+        # Chunk uploads write to storage.
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        media = override_settings(MEDIA_ROOT=media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+
+    def measure(self, method: str, name: str, kwargs, body, size: int) -> int:
+        with transaction.atomic():
+            data = build_dataset(size)
+            client = APIClient()
+            if name.startswith("async-"):
+                # Async views authenticate the JWT themselves; the user lookup is part of the count.
+                client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(data['viewer'])}")
+            else:
+                client.force_authenticate(user=User.objects.get(pk=data["viewer"].pk))
+            url = reverse(name, kwargs=kwargs(data))
+            payload = body(data) if body else None
+            cache.clear()
+            blacklist_index.reset()
+            with mock.patch.object(Pagination, "page_size", size), \
+                    mock.patch("posts.tasks.delete_story_after_24_hours.apply_async"), \
+                    CaptureQueriesContext(connection) as queries:
+                if method == "get":
+                    response = client.get(url, payload)
+                elif isinstance(payload, bytes):
+                    response = getattr(client, method)(
+                        url, payload, content_type="application/octet-stream",
+                        HTTP_X_CHUNK_SHA256=hashlib.sha256(payload).hexdigest(),
+                    )
+                else:
+                    response = getattr(client, method)(url, payload, format="json")
+            self.assertLess(response.status_code, 400, f"{method.upper()} {name}: {response.content[:200]}")
+            transaction.set_rollback(True)
+        return len(queries)
+
+    def test_every_route_is_covered(self):
+        covered = {name for _, name, _, _ in REQUESTS}
+        self.assertEqual({pattern.name for pattern in urlpatterns} - covered, set())
+
+    def test_query_counts_match_baseline(self):
+        counts = {
+            f"{method.upper()} {name}": {size: self.measure(method, name, kwargs, body, size) for size in SIZES}
+            for method, name, kwargs, body in REQUESTS
+        }
+        table = format_table(counts)
+        if os.environ.get("UPDATE_QUERY_COUNTS"):
+            BASELINE_PATH.write_text(json.dumps({key: by_size[SIZES[0]] for key, by_size in counts.items()}, indent=2) + "\n")
+            print(f"\n{table}\nWrote {BASELINE_PATH}")
+
+        growing = [key for key, by_size in counts.items() if len(set(by_size.values())) > 1]
+        self.assertEqual(growing, [], f"Query count grows with list size:\n{table}")
+
+        baseline = json.loads(BASELINE_PATH.read_text())
+        changed = {key: (baseline.get(key), by_size[SIZES[0]]) for key, by_size in counts.items()
+                   if baseline.get(key) != by_size[SIZES[0]]}
+        self.assertEqual(changed, {}, f"Query counts differ from {BASELINE_PATH.name} (baseline, now):\n{table}")
@@ -0,0 +1,57 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from prometheus_client import REGISTRY
+from rest_framework.test import APIClient, APITestCase
+
+from instaapp.middleware import fingerprint_sql
+from profiles.models import Profile
+from profiles.serializers import ProfileSerializer
+
+User = get_user_model()
+
+
+class FingerprintSQLTest(APITestCase):
+    def test_literals_and_in_lists_are_collapsed(self):
+        first = fingerprint_sql("SELECT * FROM t WHERE id IN (%s, %s, %s) AND name = 'a'  LIMIT 21")
+        second = fingerprint_sql("SELECT * FROM t WHERE id IN (%s) AND name = 'bob' LIMIT 5")
+        self.assertEqual(first, second)
+        self.assertEqual(first, "SELECT * FROM t WHERE id IN (...) AND name = ? LIMIT ?")
+
+
+@override_settings(DEBUG=True, SQL_N_PLUS_ONE_THRESHOLD=5)
+class QueryInstrumentationMiddlewareTest(APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="testuser", password="pass")
+        for i in range(8):
+            Profile.objects.create(user=User.objects.create_user(username=f"user{i}", password="pass"))
+        self.client.force_authenticate(user=self.user)
+        # Simulate a serializer regression that loads each profile's relations one by one.
+        eager_loading = mock.patch.object(ProfileSerializer, "setup_eager_loading", staticmethod(lambda queryset, request=None: queryset))
+        eager_loading.start()
+        self.addCleanup(eager_loading.stop)
+
+    def sample(self, name):
+        return REGISTRY.get_sample_value(name, {"route": "user-search"}) or 0
+
+    def test_headers_and_n_plus_one_detection(self):
+        requests, n_plus_one = self.sample("db_queries_per_request_count"), self.sample("db_n_plus_one_total")
+        response = self.client.get(reverse("user-search"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertGreater(int(response["X-DB-Query-Count"]), 8)
+        self.assertIn("X-DB-Time-Ms", response)
+        self.assertIn("8x", response["X-DB-N-Plus-One"])
+
+        self.assertEqual(self.sample("db_queries_per_request_count"), requests + 1)
+        self.assertEqual(self.sample("db_n_plus_one_total"), n_plus_one + 1)
+
+    @override_settings(DEBUG=False)
+    def test_no_headers_outside_debug(self):
+        requests = self.sample("db_queries_per_request_count")
+        response = self.client.get(reverse("user-search"))
+        self.assertNotIn("X-DB-Query-Count", response)
+        self.assertEqual(self.sample("db_queries_per_request_count"), requests + 1)
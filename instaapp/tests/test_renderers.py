@@ -0,0 +1,76 @@
+import json
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import msgpack
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils.translation import gettext_lazy
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient, APITestCase
+
+from apis.renderers import MessagePackRenderer, ORJSONRenderer
+from posts.models import Post
+from posts.serializers import PostSerializer
+from profiles.models import Profile
+
+User = get_user_model()
+
+
+class ORJSONRendererTest(APITestCase):
+    def test_matches_drf_json_renderer_on_serializer_output(self):
+        user = User.objects.create_user(username="author", password="pass")
+        Profile.objects.create(user=user)
+        Post.objects.create(profile=user.profile, title="café  ")
+        data = PostSerializer(PostSerializer.setup_eager_loading(Post.objects.all()), many=True).data
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_handles_types_json_cannot(self):
+        data = {
+            "at": datetime(2025, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+            "price": Decimal("1.50"),
+            "label": gettext_lazy("Not found."),
+            1: "int key",
+        }
+        self.assertEqual(json.loads(ORJSONRenderer().render(data)), {
+            "at": "2025-01-02T03:04:05Z", "price": 1.5, "label": "Not found.", "1": "int key",
+        })
+
+    def test_indent_and_empty_body(self):
+        self.assertEqual(ORJSONRenderer().render({"a": 1}, "application/json; indent=4"), b'{\n  "a": 1\n}')
+        self.assertEqual(ORJSONRenderer().render(None), b"")
+
+
+class MessagePackNegotiationTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="viewer", password="pass")
+        Profile.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_renders_msgpack_when_accepted(self):
+        response = self.client.get(
+            reverse("profile-detail", kwargs={"user_name": "viewer"}), HTTP_ACCEPT="application/msgpack"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "application/msgpack")
+        self.assertEqual(msgpack.unpackb(response.content)["user"]["username"], "viewer")
+
+    def test_json_stays_the_default(self):
+        response = self.client.get(reverse("profile-detail", kwargs={"user_name": "viewer"}))
+        self.assertEqual(response["Content-Type"], "application/json")
+
+    def test_parses_msgpack_body(self):
+        response = self.client.post(
+            reverse("posts-create"), MessagePackRenderer().render({"title": "packed"}),
+            content_type="application/msgpack",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(Post.objects.filter(title="packed").exists())
+
+    def test_malformed_msgpack_is_a_bad_request(self):
+        response = self.client.post(reverse("posts-create"), b"\xc1", content_type="application/msgpack")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
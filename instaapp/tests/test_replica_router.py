@@ -0,0 +1,72 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connections
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from instaapp.routers import ReplicaRouter, _read_from_replica
+from profiles.models import Profile
+
+User = get_user_model()
+
+
+@override_settings(DATABASE_REPLICA_ALIAS="replica")
+class ReplicaRoutingTest(TransactionTestCase):
+    databases = {"default", "replica"}
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="reader", password="pass")
+        self.author = User.objects.create_user(username="author", password="pass")
+        Profile.objects.create(user=self.user)
+        Profile.objects.create(user=self.author)
+        self.client = self.client_for(self.user)
+
+    def client_for(self, user):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(user).access_token}")
+        return client
+
+    def request(self, client, method, url):
+        with CaptureQueriesContext(connections["default"]) as primary, \
+                CaptureQueriesContext(connections["replica"]) as replica:
+            response = getattr(client, method)(url)
+        return response, len(primary), len(replica)
+
+    def test_router_decisions(self):
+        router = ReplicaRouter()
+        self.assertEqual(router.db_for_read(Profile), "default")
+        token = _read_from_replica.set(True)
+        try:
+            self.assertEqual(router.db_for_read(Profile), "replica")
+            self.assertEqual(router.db_for_write(Profile), "default")
+            self.assertEqual(router.db_for_read(Profile), "default")
+        finally:
+            _read_from_replica.reset(token)
+        self.assertFalse(router.allow_migrate("replica", "profiles"))
+
+    def test_safe_requests_read_from_replica(self):
+        url = reverse("profile-detail", kwargs={"user_name": "author"})
+        response, primary, replica = self.request(self.client, "get", url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(primary, 0)
+        self.assertGreater(replica, 0)
+
+    def test_client_is_pinned_to_primary_after_write(self):
+        follow_url = reverse("follow-user", kwargs={"user_name": "author"})
+        response, primary, replica = self.request(self.client, "post", follow_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(replica, 0)
+
+        url = reverse("profile-followings-list", kwargs={"user_name": "reader"})
+        response, primary, replica = self.request(self.client, "get", url)
+        self.assertEqual(replica, 0)
+        self.assertEqual(len(response.data["Following"]), 1)
+
+        response, primary, replica = self.request(self.client_for(self.author), "get", url)
+        self.assertEqual(primary, 0)
+        self.assertGreater(replica, 0)
@@ -0,0 +1,56 @@
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+
+from instaapp import schema
+
+
+class CachedSchemaTest(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.dir = Path(directory.name)
+        settings = override_settings(SCHEMA_DIR=self.dir)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        version = mock.patch.object(schema, "code_version", return_value="abc123")
+        version.start()
+        self.addCleanup(version.stop)
+        schema.load_schema.cache_clear()
+        self.addCleanup(schema.load_schema.cache_clear)
+
+    def test_command_writes_once_per_version(self):
+        call_command("generate_openapi_schema", stdout=mock.MagicMock())
+        self.assertEqual(sorted(path.name for path in self.dir.iterdir()), ["openapi-abc123.json", "openapi-abc123.yaml"])
+        with mock.patch("utils.schema_generator.LazySchemaGenerator.get_schema") as get_schema:
+            call_command("generate_openapi_schema", stdout=mock.MagicMock())
+        get_schema.assert_not_called()
+
+    def test_new_version_replaces_old_files(self):
+        schema.generate_schema_files()
+        schema.code_version.return_value = "def456"
+        schema.generate_schema_files()
+        self.assertEqual(sorted(path.name for path in self.dir.iterdir()), ["openapi-def456.json", "openapi-def456.yaml"])
+
+    def test_served_from_file_with_etag_and_cache_control(self):
+        response = self.client.get(reverse("schema-json"))
+        self.assertEqual(response.status_code, 200)
+        # Overrides deferred by utils.lazy_schema are part of the spec.
+        self.assertIn("Get post details by ID", response.content.decode())
+        self.assertIn("public", response["Cache-Control"])
+        self.assertIn("max-age=", response["Cache-Control"])
+        self.assertTrue((self.dir / "openapi-abc123.json").exists())
+
+        with mock.patch("utils.schema_generator.LazySchemaGenerator.get_schema") as get_schema:
+            cached = self.client.get(reverse("schema-json"), HTTP_IF_NONE_MATCH=response["ETag"])
+        get_schema.assert_not_called()
+        self.assertEqual(cached.status_code, 304)
+
+    def test_yaml(self):
+        response = self.client.get(reverse("schema-yaml"))
+        self.assertEqual(response["Content-Type"], "application/yaml")
+        self.assertIn(b"swagger:", response.content)
@@ -0,0 +1,40 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.models import F
+from django.test import TestCase
+
+from apis.seeding import SocialGraphSeeder, _copy_buffer
+from likes.models import Like
+from posts.models import Post
+from profiles.models import Profile
+
+User = get_user_model()
+
+
+class SocialGraphSeederTest(TestCase):
+    def test_seeds_every_table_consistently(self):
+        counts = SocialGraphSeeder(users=50, posts_per_user=3, hashtags=20, batch_size=64, seed=1).run()
+        self.assertEqual(User.objects.filter(username__startswith="seed_").count(), 50)
+        self.assertEqual(Profile.objects.count(), 50)
+        self.assertEqual(counts["posts_post"], Post.objects.count())
+        self.assertEqual(counts["likes_like"], Like.objects.count())
+        self.assertFalse(Profile.objects.filter(followers=F("user")).exists())
+        self.assertTrue(User.objects.get(username="seed_0").check_password("seed-password"))
+
+    def test_same_seed_gives_same_graph(self):
+        first = SocialGraphSeeder(users=300, seed=7).follow_edges()
+        second = SocialGraphSeeder(users=300, seed=7).follow_edges()
+        other = SocialGraphSeeder(users=300, seed=8).follow_edges()
+        self.assertEqual(first[0].tolist(), second[0].tolist())
+        self.assertEqual(first[1].tolist(), second[1].tolist())
+        self.assertNotEqual(first[1].tolist(), other[1].tolist())
+        self.assertFalse((first[0] == first[1]).any())
+
+    def test_copy_rows_write_json_fields_as_plain_json(self):
+        fields = [field for field in Post._meta.concrete_fields if not field.primary_key]
+        columns = [field.column for field in fields]
+        posts = [Post(profile_id=1), Post(profile_id=1, image_variants={"error": "bad\tfile"})]
+        rows = [line.split("\t") for line in _copy_buffer(posts, fields, connection).read().splitlines()]
+        index = columns.index("image_variants")
+        self.assertEqual(rows[0][index], "{}")
+        self.assertEqual(rows[1][index], '{"error": "bad\\\\tfile"}')
@@ -0,0 +1,81 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient, APITestCase
+
+from hashtags.models import HashTag
+from posts.models import Post, Story
+from profiles.models import Profile
+
+User = get_user_model()
+
+
+class SparseFieldsetsTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.viewer = User.objects.create_user(username="viewer", password="pass")
+        self.author = User.objects.create_user(username="author", password="pass")
+        Profile.objects.create(user=self.viewer)
+        Profile.objects.create(user=self.author)
+        self.author.profile.followers.add(self.viewer)
+        self.post = Post.objects.create(profile=self.author.profile, title="hello", content="long text")
+        self.post.hashtags.add(HashTag.objects.create(name="tag"))
+        self.story = Story.objects.bulk_create([Story(user=self.author.profile, caption="today")])[0]
+
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.viewer)
+
+    def get(self, url, params=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.json(), len(queries)
+
+    def test_feed_returns_only_requested_fields_with_fewer_queries(self):
+        full, full_queries = self.get(reverse("posts-create"))
+        sparse, sparse_queries = self.get(reverse("posts-create"), {"fields": "id,title"})
+        self.assertIn("likes_count", full["results"][0])
+        self.assertEqual(sparse["results"], [{"id": self.post.id, "title": "hello"}])
+        self.assertLess(sparse_queries, full_queries)
+
+    def test_sparse_queryset_defers_unrequested_columns(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse("posts-create"), {"fields": "title"})
+        post_query = next(query["sql"] for query in queries if query["sql"].startswith('SELECT "posts_post"'))
+        self.assertNotIn('"content"', post_query)
+        self.assertNotIn("COUNT", post_query)
+
+    def test_exclude_and_unknown_names(self):
+        data, _ = self.get(
+            reverse("profile-detail", kwargs={"user_name": "author"}), {"exclude": "followers,nonsense"}
+        )
+        self.assertNotIn("followers", data)
+        self.assertEqual(data["followers_count"], 1)
+        self.assertEqual(data["user"]["username"], "author")
+
+    def test_only_unknown_fields_return_every_field(self):
+        full, _ = self.get(reverse("posts-create"))
+        data, _ = self.get(reverse("posts-create"), {"fields": "bogus"})
+        self.assertIn("likes_count", data["results"][0])
+        self.assertEqual(data, full)
+
+    def test_profile_list_without_relations_skips_prefetches(self):
+        _, full_queries = self.get(reverse("profile-follower-list", kwargs={"user_name": "author"}))
+        data, sparse_queries = self.get(
+            reverse("profile-follower-list", kwargs={"user_name": "author"}), {"fields": "bio"}
+        )
+        self.assertEqual(data["Followers"], [{"bio": None}])
+        self.assertLess(sparse_queries, full_queries)
+
+    def test_story_fields(self):
+        data, _ = self.get(reverse("story-detail", kwargs={"story_id": self.story.id}), {"fields": "caption,is_liked"})
+        self.assertEqual(data, {"caption": "today", "is_liked": False})
+
+    def test_write_requests_return_every_field(self):
+        self.client.force_authenticate(user=self.author)
+        response = self.client.patch(
+            reverse("post-detail", kwargs={"id": self.post.id}) + "?fields=id", {"title": "edited"}, format="json"
+        )
+        self.assertIn("likes_count", response.json()["post"])
@@ -0,0 +1,50 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import OperationalError
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apis.posts_controls import CommentListAPIView, PostListCreateAPIView
+from instaapp.middleware import StatementTimeoutMiddleware, _StatementDeadline, is_statement_timeout
+
+User = get_user_model()
+
+
+class QueryCanceled(Exception):
+    pgcode = "57014"
+
+
+def statement_timeout_error():
+    try:
+        raise OperationalError("canceling statement due to statement timeout") from QueryCanceled()
+    except OperationalError as exc:
+        return exc
+
+
+@override_settings(DEFAULT_STATEMENT_TIMEOUT=5000, STATEMENT_TIMEOUT_RETRY_AFTER=7)
+class StatementTimeoutMiddlewareTest(TestCase):
+    def setUp(self):
+        self.middleware = StatementTimeoutMiddleware(lambda request: None)
+        self.request = RequestFactory().get("/")
+        self.request.statement_deadline = _StatementDeadline()
+
+    def test_view_attribute_overrides_default(self):
+        self.middleware.process_view(self.request, CommentListAPIView.as_view(), (), {})
+        self.assertEqual(self.request.statement_deadline.timeout, 2000)
+        self.middleware.process_view(self.request, PostListCreateAPIView.as_view(), (), {})
+        self.assertEqual(self.request.statement_deadline.timeout, 5000)
+
+    def test_only_statement_timeouts_are_mapped(self):
+        self.assertTrue(is_statement_timeout(statement_timeout_error()))
+        self.assertFalse(is_statement_timeout(OperationalError("connection refused")))
+        self.assertIsNone(self.middleware.process_exception(self.request, ValueError()))
+
+    def test_timeout_returns_503_with_retry_after(self):
+        client = APIClient()
+        client.force_authenticate(user=User.objects.create_user(username="testuser", password="pass"))
+        with mock.patch("apis.posts_controls.CommentSerializer", side_effect=statement_timeout_error()):
+            response = client.get(reverse("comments-list"))
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], "7")
@@ -0,0 +1,62 @@
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from profiles.models import Profile, FollowSuggestion
+from profiles.suggestions import FollowGraph, friends_of_friends, rebuild_follow_suggestions
+
+User = get_user_model()
+
+
+class FollowGraphTest(TestCase):
+    def test_from_edges_builds_csr(self):
+        graph = FollowGraph.from_edges([10, 10, 20, 10, 30], [20, 30, 30, 20, 30])
+        self.assertEqual(graph.user_ids.tolist(), [10, 20, 30])
+        self.assertEqual(graph.indptr.tolist(), [0, 2, 3, 3])
+        self.assertEqual(graph.indices.tolist(), [1, 2, 2])
+
+    def test_friends_of_friends_scores_mutual_follows(self):
+        # 1 follows 2 and 3; both follow 4, only 3 follows 5; 1 already follows 2.
+        graph = FollowGraph.from_edges([1, 1, 2, 3, 3, 2], [2, 3, 4, 4, 5, 1])
+        results = {user_id: (ids, scores) for user_id, ids, scores in friends_of_friends(graph)}
+        self.assertEqual(results[1], ([4, 5], [2, 1]))
+        self.assertNotIn(1, results[2][0])
+
+    def test_limit_and_blocks(self):
+        rng = np.random.default_rng(0)
+        graph = FollowGraph.from_edges(rng.integers(0, 200, 3000), rng.integers(0, 200, 3000))
+        whole = list(friends_of_friends(graph, limit=5))
+        blocked = list(friends_of_friends(graph, limit=5, block_size=7))
+        self.assertEqual(whole, blocked)
+        self.assertTrue(all(len(ids) <= 5 for _, ids, _ in whole))
+
+
+class FollowSuggestionsAPIViewTest(APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.users = [User.objects.create_user(username=f"user{i}", password="pass") for i in range(4)]
+        self.profiles = [Profile.objects.create(user=user) for user in self.users]
+        me, friend_a, friend_b, stranger = self.users
+        self.profiles[1].followers.add(me)
+        self.profiles[2].followers.add(me)
+        self.profiles[3].followers.add(friend_a, friend_b)
+
+    def test_rebuild_and_read_suggestions(self):
+        self.assertGreater(rebuild_follow_suggestions(limit=10), 0)
+        suggestion = FollowSuggestion.objects.get(user=self.users[0])
+        self.assertEqual(suggestion.suggested_user_ids, [self.users[3].id])
+        self.assertEqual(suggestion.scores, [2])
+
+        self.client.force_authenticate(user=self.users[0])
+        response = self.client.get(reverse("follow-suggestions"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item["user"]["username"] for item in response.data], ["user3"])
+
+    def test_no_suggestions(self):
+        self.client.force_authenticate(user=self.users[3])
+        response = self.client.get(reverse("follow-suggestions"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, [])
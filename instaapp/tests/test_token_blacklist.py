@@ -0,0 +1,90 @@
+from datetime import timedelta
+from uuid import uuid4
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils.timezone import now
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from apis.tasks import prune_expired_tokens
+from apis.tokens import WATERMARK_KEY, BloomRefreshToken, blacklist_index
+from utils.bloom_filter import BloomFilter
+
+User = get_user_model()
+
+
+class BloomFilterTest(TestCase):
+    def test_no_false_negatives_and_low_false_positive_rate(self):
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        added = [uuid4().hex for _ in range(1000)]
+        for item in added:
+            bloom.add(item)
+        self.assertTrue(all(item in bloom for item in added))
+        false_positives = sum(uuid4().hex in bloom for _ in range(10000))
+        self.assertLess(false_positives, 300)
+        self.assertFalse(bloom.is_full())
+
+
+@override_settings(TOKEN_BLACKLIST_SYNC_INTERVAL=3600)
+class BloomRefreshTokenTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        blacklist_index.reset()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="testuser", password="testpass123")
+
+    def test_rotated_refresh_token_is_rejected(self):
+        refresh = str(BloomRefreshToken.for_user(self.user))
+        response = self.client.post(reverse("token_refresh"), {"refresh": refresh}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("refresh", response.data)
+
+        response = self.client.post(reverse("token_refresh"), {"refresh": refresh}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_unknown_token_skips_blacklist_query(self):
+        BloomRefreshToken.for_user(self.user).blacklist()
+        token = str(BloomRefreshToken.for_user(self.user))
+        with self.assertNumQueries(0):
+            BloomRefreshToken(token)
+
+    def blacklist_elsewhere(self, token) -> BlacklistedToken:
+        """Blacklists `token` the way another process would, without touching this process's index."""
+        return BlacklistedToken.objects.create(token=OutstandingToken.objects.get(jti=token["jti"]))
+
+    def test_blacklist_from_another_process_is_picked_up(self):
+        token = BloomRefreshToken.for_user(self.user)
+        BloomRefreshToken(str(token))
+        blacklisted = self.blacklist_elsewhere(token)
+        # Not seen yet: the sync interval has not passed and the watermark has not moved.
+        BloomRefreshToken(str(token))
+
+        cache.set(WATERMARK_KEY, blacklisted.id, timeout=None)
+        with self.assertRaises(TokenError):
+            BloomRefreshToken(str(token))
+
+    def test_blacklist_without_watermark_is_picked_up_after_the_sync_interval(self):
+        token = BloomRefreshToken.for_user(self.user)
+        BloomRefreshToken(str(token))
+        self.blacklist_elsewhere(token)
+        with override_settings(TOKEN_BLACKLIST_SYNC_INTERVAL=0), self.assertRaises(TokenError):
+            BloomRefreshToken(str(token))
+
+
+class PruneExpiredTokensTest(TestCase):
+    def test_prunes_only_expired_tokens_in_batches(self):
+        user = User.objects.create_user(username="testuser", password="testpass123")
+        for days in (-3, -2, -1, 1):
+            outstanding = OutstandingToken.objects.create(
+                user=user, jti=uuid4().hex, token="token", expires_at=now() + timedelta(days=days)
+            )
+            BlacklistedToken.objects.create(token=outstanding)
+
+        self.assertEqual(prune_expired_tokens(batch_size=2), 3)
+        self.assertEqual(OutstandingToken.objects.count(), 1)
+        self.assertEqual(BlacklistedToken.objects.count(), 1)
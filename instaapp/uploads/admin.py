@@ -0,0 +1,5 @@
+from django.contrib import admin
+from .models import Upload
+# Register your models here.
+
+admin.site.register(Upload)
\ No newline at end of file
@@ -0,0 +1,37 @@
+# Generated by Django 5.1.7 on 2026-10-19 09:35
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('profiles', '0004_profile_picture_variants'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Upload',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('filename', models.CharField(max_length=255)),
+                ('size', models.PositiveBigIntegerField()),
+                ('chunk_size', models.PositiveIntegerField()),
+                ('sha256', models.CharField(blank=True, max_length=64)),
+                ('parts', models.JSONField(blank=True, default=list)),
+                ('status', models.CharField(choices=[('open', 'Open'), ('assembling', 'Assembling'), ('complete', 'Complete'), ('failed', 'Failed')], default='open', max_length=10)),
+                ('error', models.TextField(blank=True)),
+                ('file', models.FileField(blank=True, null=True, upload_to='media/')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='uploads', to='profiles.profile')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'updated_at'], name='uploads_upl_status_c00931_idx')],
+            },
+        ),
+    ]
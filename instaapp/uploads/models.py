@@ -0,0 +1,75 @@
+import math
+import uuid
+
+from django.db import models
+
+from profiles.models import Profile
+
+
+class Upload(models.Model):
+    """
+    Model representing a resumable upload of a large file, such as a post or
+    story video, sent in ordered chunks.
+
+    Each chunk is written to storage as its own part while it is received, so a
+    dropped connection only costs the chunk in flight. Once every chunk is in,
+    the `assemble_upload` Celery task joins the parts into `file`, which can
+    then be attached to one post or story.
+
+    **Fields:**
+    - `id`: Random identifier of the upload, used in its URLs.
+    - `profile`: The profile uploading the file.
+    - `filename`: The name of the file on the client.
+    - `size`: The size of the whole file in bytes.
+    - `chunk_size`: The size of every chunk but the last one.
+    - `sha256`: Optional hex SHA-256 of the whole file, checked on assembly.
+    - `parts`: Storage names of the chunks received so far, in order.
+    - `status`: Upload state (open, assembling, complete or failed).
+    - `error`: Why the assembly failed.
+    - `file`: The assembled file.
+    - `created_at`: Timestamp when the upload was started.
+    - `updated_at`: Timestamp of the last change.
+    """
+    OPEN = "open"
+    ASSEMBLING = "assembling"
+    COMPLETE = "complete"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (OPEN, "Open"),
+        (ASSEMBLING, "Assembling"),
+        (COMPLETE, "Complete"),
+        (FAILED, "Failed"),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    profile = models.ForeignKey(Profile, related_name="uploads", on_delete=models.CASCADE)
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()
+    chunk_size = models.PositiveIntegerField()
+    sha256 = models.CharField(max_length=64, blank=True)
+    parts = models.JSONField(default=list, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=OPEN)
+    error = models.TextField(blank=True)
+    file = models.FileField(upload_to="media/", null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "updated_at"])]
+
+    def __str__(self) -> str:
+        return f"{self.filename} ({self.status}, {len(self.parts)}/{self.total_chunks})"
+
+    @property
+    def total_chunks(self) -> int:
+        """The number of chunks the file is sent in."""
+        return math.ceil(self.size / self.chunk_size)
+
+    @property
+    def next_chunk(self) -> int:
+        """The index of the chunk the upload expects next."""
+        return len(self.parts)
+
+    def chunk_length(self, index: int) -> int:
+        """The exact size in bytes of chunk `index`."""
+        return min(self.chunk_size, self.size - index * self.chunk_size)
@@ -0,0 +1,57 @@
+import re
+
+from django.conf import settings
+from rest_framework import serializers
+
+from .models import Upload
+
+
+class UploadSerializer(serializers.ModelSerializer):
+    """
+    Serializer for starting an upload and reporting its progress.
+
+    **Fields:**
+    - `id`: The upload ID, used in the chunk and finalize URLs.
+    - `filename`: The name of the file on the client.
+    - `size`: The size of the whole file in bytes (at most `UPLOAD_MAX_SIZE`).
+    - `sha256`: Optional hex SHA-256 of the whole file, checked on assembly.
+    - `chunk_size`: The size of every chunk but the last one, chosen by the server.
+    - `total_chunks`: The number of chunks to send.
+    - `next_chunk`: The index of the chunk to send next, where a resumed upload continues.
+    - `status`: Upload state (open, assembling, complete or failed).
+    - `error`: Why the assembly failed.
+    - `created_at`: Timestamp when the upload was started.
+    """
+    total_chunks = serializers.IntegerField(read_only=True)
+    next_chunk = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Upload
+        fields = [
+            "id",
+            "filename",
+            "size",
+            "sha256",
+            "chunk_size",
+            "total_chunks",
+            "next_chunk",
+            "status",
+            "error",
+            "created_at"
+        ]
+        read_only_fields = ["id", "chunk_size", "status", "error", "created_at"]
+
+    def validate_size(self, value):
+        if not 0 < value <= settings.UPLOAD_MAX_SIZE:
+            raise serializers.ValidationError(f"The size must be between 1 and {settings.UPLOAD_MAX_SIZE} bytes.")
+        return value
+
+    def validate_sha256(self, value):
+        if value and not re.fullmatch(r"[0-9a-fA-F]{64}", value):
+            raise serializers.ValidationError("Expected a hex SHA-256 digest.")
+        return value.lower()
+
+    def create(self, validated_data):
+        """Starts an upload for the current user with the configured chunk size."""
+        profile = self.context["request"].user.profile
+        return Upload.objects.create(profile=profile, chunk_size=settings.UPLOAD_CHUNK_SIZE, **validated_data)
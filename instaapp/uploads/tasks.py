@@ -0,0 +1,102 @@
+import logging
+from datetime import timedelta
+
+from celery import shared_task
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils.timezone import now
+
+from uploads.models import Upload
+from utils.chunked_files import ConcatenatedReader, HashingReader, save_stream
+
+logger = logging.getLogger(__name__)
+
+
+def _delete_files(names):
+    for name in names:
+        default_storage.delete(name)
+
+
+def queue_assembly(upload: Upload):
+    """Assembles `upload` in a worker once the transaction commits."""
+    # retry=False: if the broker is down, `sweep_uploads` starts the assembly instead.
+    transaction.on_commit(lambda: assemble_upload.apply_async([str(upload.pk)], retry=False), robust=True)
+
+
+@shared_task
+def assemble_upload(upload_id: str):
+    """
+    A Celery task that joins the parts of a finished upload into its file.
+
+    The parts are streamed from storage one after the other, so memory use does
+    not depend on the size of the file, and the SHA-256 the client announced
+    (if any) is checked on the way. On success the upload becomes `complete`
+    and its parts are deleted; a size or checksum mismatch makes it `failed`.
+
+    Args:
+        upload_id (str): The ID of an upload in the `assembling` state.
+    """
+    upload = Upload.objects.filter(pk=upload_id, status=Upload.ASSEMBLING).first()
+    if upload is None:
+        return
+
+    reader = ConcatenatedReader(upload.parts)
+    # One byte over the size, so an assembly that is too long is noticed.
+    hashing = HashingReader(reader, upload.size + 1)
+    try:
+        # The field's `upload_to` and the storage's file name rules, as for a regular upload.
+        name = save_stream(Upload.file.field.generate_filename(upload, upload.filename), hashing)
+    finally:
+        reader.close()
+
+    error = ""
+    if hashing.size != upload.size:
+        error = f"Expected {upload.size} bytes, assembled {hashing.size}."
+    elif upload.sha256 and hashing.hexdigest() != upload.sha256.lower():
+        error = "The SHA-256 of the assembled file does not match."
+
+    fields = {"status": Upload.FAILED, "error": error} if error else {"status": Upload.COMPLETE, "file": name}
+    updated = Upload.objects.filter(pk=upload.pk, status=Upload.ASSEMBLING).update(
+        parts=[], updated_at=now(), **fields
+    )
+    if error or not updated:
+        # A failed file, or one another run of the task stored first.
+        default_storage.delete(name)
+    if error:
+        logger.warning("Upload %s failed: %s", upload.pk, error)
+    if updated:
+        _delete_files(upload.parts)
+
+
+@shared_task
+def sweep_uploads() -> int:
+    """
+    A Celery task that restarts assemblies that never finished (e.g. while the
+    broker was down) and deletes uploads, with their parts and files, that were
+    not finished or not attached within `UPLOAD_EXPIRY_HOURS`. Scheduled by
+    celery-beat (see `CELERY_BEAT_SCHEDULE`).
+
+    Returns:
+        int: The number of uploads deleted.
+    """
+    current_time = now()
+    stuck = Upload.objects.filter(
+        status=Upload.ASSEMBLING,
+        updated_at__lt=current_time - timedelta(minutes=settings.UPLOAD_ASSEMBLY_TIMEOUT_MINUTES),
+    )
+    for upload_id in stuck.values_list("pk", flat=True):
+        assemble_upload(str(upload_id))
+
+    expired = Upload.objects.filter(
+        status__in=[Upload.OPEN, Upload.COMPLETE, Upload.FAILED],
+        updated_at__lt=current_time - timedelta(hours=settings.UPLOAD_EXPIRY_HOURS),
+    )
+    deleted = 0
+    for upload in expired:
+        _delete_files(upload.parts)
+        if upload.file:
+            default_storage.delete(upload.file.name)
+        upload.delete()
+        deleted += 1
+    return deleted
@@ -0,0 +1,47 @@
+import math
+from hashlib import blake2b
+
+
+class BloomFilter:
+    """
+    A fixed-size Bloom filter for strings.
+
+    Membership tests never give false negatives; false positives happen with
+    roughly `error_rate` probability as long as no more than `capacity` items
+    were added. Positions are derived from one 128-bit BLAKE2b digest using
+    double hashing.
+
+    Attributes:
+        capacity (int): The number of items the filter was sized for.
+        error_rate (float): The target false positive rate at `capacity` items.
+        size (int): The number of bits in the filter.
+        hash_count (int): The number of bit positions set per item.
+        count (int): The number of items added so far.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        self.capacity = max(int(capacity), 1)
+        self.error_rate = error_rate
+        self.size = max(int(-self.capacity * math.log(error_rate) / math.log(2) ** 2), 8)
+        self.hash_count = max(int(round(self.size / self.capacity * math.log(2))), 1)
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str):
+        digest = blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return ((first + i * second) % self.size for i in range(self.hash_count))
+
+    def add(self, item: str):
+        """Adds an item to the filter."""
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+    def is_full(self) -> bool:
+        """Returns True once more items were added than the filter was sized for."""
+        return self.count > self.capacity
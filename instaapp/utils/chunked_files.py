@@ -0,0 +1,66 @@
+import hashlib
+
+from django.core.files import File
+from django.core.files.storage import default_storage
+
+
+class HashingReader:
+    """
+    Read-only file object over a stream that hashes (SHA-256) and counts
+    everything read through it, and stops after `limit` bytes.
+
+    Handing it to `Storage.save` (wrapped in a `File`) copies the stream to
+    storage in `File.DEFAULT_CHUNK_SIZE` blocks, so memory use does not grow
+    with the size of the data.
+    """
+
+    def __init__(self, stream, limit: int):
+        self.stream = stream
+        self.remaining = limit
+        self.size = 0
+        self.sha256 = hashlib.sha256()
+
+    def read(self, size: int = -1) -> bytes:
+        if self.remaining <= 0:
+            return b""
+        size = self.remaining if size is None or size < 0 else min(size, self.remaining)
+        data = self.stream.read(size)
+        self.remaining -= len(data)
+        self.size += len(data)
+        self.sha256.update(data)
+        return data
+
+    def hexdigest(self) -> str:
+        return self.sha256.hexdigest()
+
+
+class ConcatenatedReader:
+    """Read-only file object over several files in `default_storage`, one after the other."""
+
+    def __init__(self, names: list):
+        self.names = list(names)
+        self.current = None
+
+    def read(self, size: int = -1) -> bytes:
+        output = bytearray()
+        while size is None or size < 0 or len(output) < size:
+            if self.current is None:
+                if not self.names:
+                    break
+                self.current = default_storage.open(self.names.pop(0), "rb")
+            data = self.current.read(-1 if size is None or size < 0 else size - len(output))
+            if not data:
+                self.current.close()
+                self.current = None
+            output += data
+        return bytes(output)
+
+    def close(self):
+        if self.current is not None:
+            self.current.close()
+            self.current = None
+
+
+def save_stream(name: str, reader) -> str:
+    """Saves what `reader` returns to `default_storage` and returns the name used."""
+    return default_storage.save(name, File(reader, name=name))
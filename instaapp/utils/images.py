@@ -0,0 +1,161 @@
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+from rest_framework import serializers
+
+EXTENSIONS = {"WEBP": "webp", "JPEG": "jpg"}
+
+
+def _encode(image: Image.Image, fmt: str, icc_profile) -> bytes:
+    """Encodes `image` without its EXIF data, keeping only the color profile."""
+    if fmt == "JPEG" and image.mode != "RGB":
+        image = image.convert("RGB")
+    elif fmt == "WEBP" and image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if "A" in image.getbands() or "transparency" in image.info else "RGB")
+    output = BytesIO()
+    options = {"quality": settings.IMAGE_DERIVATIVE_QUALITY}
+    if fmt == "JPEG":
+        options.update(optimize=True, progressive=True)
+    if icc_profile:
+        options["icc_profile"] = icc_profile
+    image.save(output, fmt, **options)
+    return output.getvalue()
+
+
+def _save(field_file, suffix: str, image: Image.Image, icc_profile) -> str:
+    fmt = settings.IMAGE_DERIVATIVE_FORMAT
+    directory, filename = os.path.split(field_file.name)
+    return default_storage.save(
+        os.path.join(directory, "derivatives", f"{os.path.splitext(filename)[0]}-{suffix}.{EXTENSIONS[fmt]}"),
+        ContentFile(_encode(image, fmt, icc_profile)),
+    )
+
+
+def build_derivatives(field_file, avatars: bool = False) -> dict:
+    """
+    Writes one resized copy of an uploaded image per size in
+    `IMAGE_DERIVATIVE_WIDTHS` next to the original, in
+    `IMAGE_DERIVATIVE_FORMAT`, and with `avatars` a square, center-cropped
+    copy per size in `AVATAR_SIZES`.
+
+    The EXIF orientation is applied to the pixels and the EXIF data dropped.
+    Images are never upscaled, and sizes that come out the same share one file.
+
+    Args:
+        field_file (FieldFile): The original image.
+        avatars (bool): Whether to also write the avatars of a profile picture.
+
+    Returns:
+        dict: `{"source": <original name>, "sizes": {size: {"name", "width", "height"}}}`,
+        plus `"avatars": {"<pixels>": <name>}` with `avatars`; the value stored
+        in the model's variants field.
+    """
+    with field_file.open("rb") as file, Image.open(file) as original:
+        icc_profile = original.info.get("icc_profile")
+        image = ImageOps.exif_transpose(original)
+        image.load()
+
+    sizes, written = {}, {}
+    for size, width in settings.IMAGE_DERIVATIVE_WIDTHS.items():
+        width = min(width, image.width)
+        if width not in written:
+            height = max(1, round(image.height * width / image.width))
+            resized = image if width == image.width else image.resize((width, height), Image.Resampling.LANCZOS)
+            written[width] = {"name": _save(field_file, f"{width}w", resized, icc_profile), "width": width, "height": height}
+        sizes[size] = written[width]
+    variants = {"source": field_file.name, "sizes": sizes}
+    if avatars:
+        squares = {}
+        for size in settings.AVATAR_SIZES:
+            side = min(size, image.width, image.height)
+            if side not in squares:
+                square = ImageOps.fit(image, (side, side), Image.Resampling.LANCZOS)
+                squares[side] = _save(field_file, f"{side}sq", square, icc_profile)
+            variants.setdefault("avatars", {})[str(size)] = squares[side]
+    return variants
+
+
+def delete_derivatives(variants: dict):
+    """Removes the files of a variants value returned by `build_derivatives`."""
+    variants = variants or {}
+    names = {variant["name"] for variant in variants.get("sizes", {}).values()}
+    for name in names | set(variants.get("avatars", {}).values()):
+        default_storage.delete(name)
+
+
+def image_variant(image, variants: dict, size: str) -> dict:
+    """
+    Returns `{"url", "width", "height"}` of `image` in `size`, a key of
+    `IMAGE_DERIVATIVE_WIDTHS`, or None when there is no image.
+
+    While derivatives are not generated yet (or are stale after the image was
+    replaced), the original file is returned without dimensions.
+    """
+    if not image:
+        return None
+    variants = variants or {}
+    variant = variants.get("sizes", {}).get(size) if variants.get("source") == image.name else None
+    if variant is None:
+        return {"url": image.url, "width": None, "height": None}
+    return {"url": default_storage.url(variant["name"]), "width": variant["width"], "height": variant["height"]}
+
+
+def avatar_urls(image, variants: dict) -> dict:
+    """
+    Returns the URL of each avatar of a profile picture keyed by its size, or
+    None while there is no picture or its avatars are not generated yet.
+    """
+    variants = variants or {}
+    if not image or variants.get("source") != image.name or not variants.get("avatars"):
+        return None
+    return {size: default_storage.url(name) for size, name in variants["avatars"].items()}
+
+
+class ImageVariantField(serializers.Field):
+    """
+    Read-only `image_variant` of a model's image in the size that suits the
+    view: `size` unless the serializer context has an `image_size`.
+
+    Args:
+        image_field (str): The model's `ImageField`.
+        variants_field (str): The model's JSON field filled by `build_derivatives`.
+        size (str): The default size, a key of `IMAGE_DERIVATIVE_WIDTHS`.
+    """
+
+    def __init__(self, image_field: str, variants_field: str, size: str, **kwargs):
+        self.image_field = image_field
+        self.variants_field = variants_field
+        self.size = size
+        # Read by `SparseFieldsetsMixin.sparse_queryset` to keep both columns loaded.
+        self.sources = (image_field, variants_field)
+        super().__init__(source="*", read_only=True, **kwargs)
+
+    def to_representation(self, instance):
+        variant = image_variant(
+            getattr(instance, self.image_field),
+            getattr(instance, self.variants_field),
+            self.context.get("image_size", self.size),
+        )
+        request = self.context.get("request")
+        # Absolute like DRF's `ImageField` when the request is known.
+        if variant is not None and request is not None:
+            variant["url"] = request.build_absolute_uri(variant["url"])
+        return variant
+
+
+class AvatarField(ImageVariantField):
+    """Read-only `avatar_urls` of a model's picture, absolute when the request is known."""
+
+    def __init__(self, image_field: str, variants_field: str, **kwargs):
+        super().__init__(image_field, variants_field, size=None, **kwargs)
+
+    def to_representation(self, instance):
+        urls = avatar_urls(getattr(instance, self.image_field), getattr(instance, self.variants_field))
+        request = self.context.get("request")
+        if urls is not None and request is not None:
+            urls = {size: request.build_absolute_uri(url) for size, url in urls.items()}
+        return urls
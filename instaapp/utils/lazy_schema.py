@@ -0,0 +1,74 @@
+import threading
+
+
+class _Deferred:
+    """An `openapi` attribute lookup or call recorded for later; see `resolve`."""
+
+    def __init__(self, path: tuple, args: tuple = None, kwargs: dict = None):
+        self.path = path
+        self.args = args
+        self.kwargs = kwargs
+
+    def __getattr__(self, name: str) -> "_Deferred":
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return _Deferred(self.path + (name,))
+
+    def __call__(self, *args, **kwargs) -> "_Deferred":
+        return _Deferred(self.path, args, kwargs)
+
+
+openapi = _Deferred(())
+"""
+Stand-in for `drf_yasg.openapi` in view modules: `openapi.Schema(...)`,
+`openapi.TYPE_STRING` and friends build nothing until `resolve` is called.
+"""
+
+
+def resolve(value):
+    """Replaces every `_Deferred` in `value` (recursively) with the real drf_yasg object."""
+    if isinstance(value, _Deferred):
+        from drf_yasg import openapi as real_openapi
+
+        target = real_openapi
+        for name in value.path:
+            target = getattr(target, name)
+        if value.args is None:
+            return target
+        return target(*resolve(value.args), **resolve(value.kwargs))
+    if isinstance(value, dict):
+        return {key: resolve(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return type(value)(resolve(item) for item in value)
+    return value
+
+
+_pending = []
+_lock = threading.Lock()
+
+
+def swagger_auto_schema(**kwargs):
+    """
+    Drop-in for `drf_yasg.utils.swagger_auto_schema` that neither imports
+    drf_yasg nor builds any schema object when the view module is imported.
+
+    The arguments are kept as given (use the `openapi` stand-in from this
+    module for schema objects) and handed to the real decorator by
+    `apply_swagger_auto_schemas`, which the schema generator calls first.
+    """
+    def decorator(view_method):
+        with _lock:
+            _pending.append((view_method, kwargs))
+        return view_method
+    return decorator
+
+
+def apply_swagger_auto_schemas():
+    """Runs the real `swagger_auto_schema` for every view decorated since the last call."""
+    from drf_yasg.utils import swagger_auto_schema as real_swagger_auto_schema
+
+    with _lock:
+        pending = _pending[:]
+        _pending.clear()
+    for view_method, kwargs in pending:
+        real_swagger_auto_schema(**resolve(kwargs))(view_method)
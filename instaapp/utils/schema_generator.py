@@ -0,0 +1,13 @@
+from drf_yasg.generators import OpenAPISchemaGenerator
+
+from utils.lazy_schema import apply_swagger_auto_schemas
+
+
+class LazySchemaGenerator(OpenAPISchemaGenerator):
+    """Applies the deferred `swagger_auto_schema` overrides before reading them from the views."""
+
+    def get_endpoints(self, request):
+        # Collecting the endpoints imports the URL conf and with it every view module.
+        endpoints = super().get_endpoints(request)
+        apply_swagger_auto_schemas()
+        return endpoints
@@ -1,5 +1,31 @@
-from django.core.mail import send_mail
 from django.conf import settings
+from django.db import transaction
+
+from mailing.models import EmailOutbox
+
+
+def _notify_mail_worker():
+    from mailing.tasks import send_pending_emails
+    # retry=False: if the broker is down, the periodic sweep delivers the email instead.
+    send_pending_emails.apply_async(retry=False)
+
+
+def queue_email(subject, message, recipient_list, from_email=None):
+    """
+    Queues a transactional email for asynchronous delivery.
+
+    Only an outbox row is written on the request path; a Celery worker is
+    notified once the surrounding transaction commits and sends the email.
+    """
+    email = EmailOutbox.objects.create(
+        subject=subject,
+        body=message,
+        from_email=from_email or "",
+        recipients=list(recipient_list),
+    )
+    transaction.on_commit(_notify_mail_worker, robust=True)
+    return email
+
 
 def send_verification_email(profile):
     verification_code = profile.generate_verification_code()
@@ -8,11 +34,10 @@ def send_verification_email(profile):
     from_email = settings.EMAIL_HOST_USER
     recipient_list = [profile.user.email]
 
-    send_mail(
+    queue_email(
         subject=subject,
         message=message,
         from_email=from_email,
         recipient_list=recipient_list,
-        fail_silently=False
     )
-    return verification_code  
\ No newline at end of file
+    return verification_code
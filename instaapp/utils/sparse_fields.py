@@ -0,0 +1,96 @@
+from functools import lru_cache
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import QuerySet
+from rest_framework.permissions import SAFE_METHODS
+
+
+def _names(value) -> set:
+    return {name.strip() for name in (value or "").split(",") if name.strip()}
+
+
+@lru_cache(maxsize=None)
+def _field_sources(serializer_class) -> dict:
+    """
+    Maps each readable field of a serializer class to the attributes it reads:
+    its source, or the `sources` of fields that read several model fields.
+    """
+    return {
+        name: getattr(field, "sources", (field.source,))
+        for name, field in serializer_class().fields.items() if not field.write_only
+    }
+
+
+class SparseFieldsetsMixin:
+    """
+    Lets clients pick the fields of a read serializer with the `fields` and
+    `exclude` query parameters, e.g. `?fields=id,title` or `?exclude=followers`.
+
+    Pass `fields=requested_fields(request)` to the serializer (or put the
+    request in its context) and the fields that were not asked for are removed
+    when it is built, so their `SerializerMethodField`s never run.
+    `setup_eager_loading` uses `requested_fields` to skip annotations and
+    prefetches nobody needs and `sparse_queryset` to load only the columns
+    behind the requested fields. Unknown names are ignored, and requests that
+    write data always get every field.
+    """
+    # Fields some views add next to the serializer output; `fields`/`exclude` can name them too.
+    extra_fields = ()
+
+    def __init__(self, *args, **kwargs):
+        requested = kwargs.pop("fields", None)
+        super().__init__(*args, **kwargs)
+        if requested is None:
+            requested = self.requested_fields(self.context.get("request"))
+        if requested is not None:
+            for name in set(self.fields) - requested:
+                self.fields.pop(name)
+
+    @classmethod
+    def requested_fields(cls, request) -> set:
+        """
+        Returns the names of the fields `request` asks for.
+
+        Args:
+            request (Request): The current request, if any.
+
+        Returns:
+            set: The requested field names, or None when every field is wanted.
+        """
+        if request is None or request.method not in SAFE_METHODS:
+            return None
+        params = getattr(request, "query_params", request.GET)
+        fields, exclude = _names(params.get("fields")), _names(params.get("exclude"))
+        available = set(_field_sources(cls)) | set(cls.extra_fields)
+        # Unknown names are ignored; if nothing known is left, every field is returned.
+        fields &= available
+        if not fields and not exclude:
+            return None
+        return (fields or available) - exclude
+
+    @classmethod
+    def sparse_queryset(cls, queryset: QuerySet, fields: set, always: tuple = ()) -> QuerySet:
+        """
+        Defers every column that no requested field reads.
+
+        Args:
+            queryset (QuerySet): A queryset of the serializer's model.
+            fields (set): The requested field names, None for all of them.
+            always (tuple): Model fields the caller reads itself.
+
+        Returns:
+            QuerySet: The queryset restricted with `only()`.
+        """
+        if fields is None:
+            return queryset
+        meta = queryset.model._meta
+        sources = _field_sources(cls)
+        columns = {meta.pk.name, *always}
+        for source in (source for name in fields for source in sources.get(name, ())):
+            try:
+                field = meta.get_field(source)
+            except FieldDoesNotExist:
+                continue
+            if field.concrete:
+                columns.add(field.name)
+        return queryset.only(*columns)